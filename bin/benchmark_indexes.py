@@ -0,0 +1,129 @@
+#!/bin/env python3
+"""Show the query plans of the hottest queries on a big seeded dataset.
+
+Run this against an empty database with the current schema, e.g.:
+
+    createdb pollbot_bench
+    ./main.py initdb  # with the database of the config pointing to pollbot_bench
+    python bin/benchmark_indexes.py postgresql://localhost/pollbot_bench --seed
+
+To compare the plans before and after a migration, run the script again after
+`alembic downgrade`/`alembic upgrade` without the `--seed` flag.
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine, text
+
+parser = argparse.ArgumentParser(description="Explain the hot queries of the bot.")
+parser.add_argument("url", type=str, help="The url of the benchmark database.")
+parser.add_argument("--seed", action="store_true", help="Seed the database first.")
+parser.add_argument("--users", type=int, default=200_000)
+parser.add_argument("--polls", type=int, default=100_000)
+parser.add_argument("--votes", type=int, default=3_000_000)
+parsed = parser.parse_args()
+
+engine = create_engine(parsed.url)
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO "user" (id, name, started, banned, broadcast_sent, admin,
+        european_date_format, notifications_enabled)
+    SELECT i, 'user ' || i, true, false, false, false, false, true
+    FROM generate_series(1, :users) AS i
+    """,
+    # A third of all polls is closed, 2% have a due date and 1% are scheduled for deletion
+    """
+    INSERT INTO poll (id, name, poll_type, anonymous, results_visible,
+        allow_new_options, allow_sharing, show_percentage, show_option_votes,
+        european_date_format, permanently_summarized, compact_buttons, summarize,
+        option_sorting, user_sorting, created, closed, in_settings, user_id,
+        due_date, next_notification, delete, created_at, updated_at)
+    SELECT i, 'poll ' || i, 'block_vote', false, true, false, true, true, true,
+        false, false, false, false, 'option_chrono', 'user_chrono', true,
+        i % 3 = 0, false, 1 + i % :users,
+        CASE WHEN i % 50 = 0 THEN now() + (i % 30) * interval '1 day' END,
+        CASE WHEN i % 50 = 0 THEN now() + (i % 30 - 7) * interval '1 day' END,
+        CASE WHEN i % 100 = 1 THEN 'DB_ONLY' END,
+        now() - i * interval '1 minute', now() - i * interval '1 minute'
+    FROM generate_series(1, :polls) AS i
+    """,
+    """
+    INSERT INTO option (id, poll_id, index, name, is_date)
+    SELECT (p - 1) * 4 + o, p, o, 'option ' || o, false
+    FROM generate_series(1, :polls) AS p, generate_series(1, 4) AS o
+    """,
+    # Votes are skewed towards the first polls
+    """
+    INSERT INTO vote (poll_id, option_id, user_id, vote_count, poll_type)
+    SELECT v.poll_id, (v.poll_id - 1) * 4 + 1 + i % 4, 1 + (i::bigint * 7919) % :users,
+        1, 'block_vote'
+    FROM generate_series(1, :votes) AS i,
+        LATERAL (
+            SELECT 1 + floor(:polls * power(random(), 3))::int AS poll_id
+            WHERE i IS NOT NULL
+        ) AS v
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO reference (poll_id, type, bot_inline_message_id)
+    SELECT 1 + i % :polls, 'inline', 'inline_' || i
+    FROM generate_series(1, :polls * 2) AS i
+    """,
+    """
+    INSERT INTO update (poll_id, next_update, count)
+    SELECT i, now() + (i % 600 - 300) * interval '1 second', 1
+    FROM generate_series(1, :polls, 20) AS i
+    """,
+]
+
+HOT_QUERIES = {
+    "Votes of a user on an option": """
+        SELECT * FROM vote WHERE option_id = 2 AND user_id = 8
+    """,
+    "Votes of a user in a poll": """
+        SELECT * FROM vote WHERE poll_id = 1 AND user_id = 8
+    """,
+    "Inline reference of a vote": """
+        SELECT * FROM reference WHERE bot_inline_message_id = 'inline_42' AND poll_id = 43
+    """,
+    "Due message updates": """
+        SELECT * FROM update WHERE next_update <= now()
+        ORDER BY next_update ASC LIMIT 50
+    """,
+    "Due notifications": """
+        SELECT * FROM poll
+        WHERE (next_notification <= now() OR due_date <= now()) AND closed IS false
+    """,
+    "Polls to delete": """
+        SELECT * FROM poll WHERE delete IS NOT NULL ORDER BY updated_at ASC LIMIT 20
+    """,
+    "Poll list of a user": """
+        SELECT * FROM poll
+        WHERE user_id = 42 AND closed IS false AND created IS true AND delete IS NULL
+        ORDER BY created_at DESC LIMIT 10
+    """,
+}
+
+
+if parsed.seed:
+    parameters = {
+        "users": parsed.users,
+        "polls": parsed.polls,
+        "votes": parsed.votes,
+    }
+    with engine.begin() as connection:
+        for statement in SEED_STATEMENTS:
+            start = time.time()
+            connection.execute(text(statement), parameters)
+            print(f"Seeded in {time.time() - start:.1f}s: {statement.split()[2]}")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE"))
+
+with engine.connect() as connection:
+    for name, query in HOT_QUERIES.items():
+        print(f"\n## {name}")
+        plan = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {query}"))
+        for row in plan:
+            print(row[0])
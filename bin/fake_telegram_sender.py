@@ -0,0 +1,64 @@
+#!/bin/env python3
+"""Send fake webhook updates to a locally running ingress.
+
+Start the ingress with `./main.py ingress` and run, e.g.:
+
+    python bin/fake_telegram_sender.py http://127.0.0.1:7000/pollbot --polls 10
+
+The updates are callback queries of random users on random polls.
+The bot will fail to answer them, but all of them are routed and handled by the workers.
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+
+from pollbot.enums import CallbackEntity, CallbackType
+from pollbot.telegram.callback_data import encode_callback
+
+parser = argparse.ArgumentParser(description="Send fake updates to the ingress.")
+parser.add_argument("url", type=str, help="The webhook url of the ingress.")
+parser.add_argument("--updates", type=int, default=10_000)
+parser.add_argument("--polls", type=int, default=100)
+parser.add_argument("--users", type=int, default=1000)
+parser.add_argument("--concurrency", type=int, default=20)
+parsed = parser.parse_args()
+
+
+def fake_update(update_id: int) -> dict:
+    """Create a click on the sync button of a shared poll."""
+    user_id = random.randint(1, parsed.users)
+    data = encode_callback(
+        CallbackType.update_shared,
+        CallbackEntity.poll,
+        random.randint(1, parsed.polls),
+    )
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user {user_id}"},
+            "chat_instance": "fake",
+            "inline_message_id": f"fake_{update_id}",
+            "data": data,
+        },
+    }
+
+
+def send(update_id: int) -> None:
+    body = json.dumps(fake_update(update_id)).encode()
+    request = Request(
+        parsed.url, data=body, headers={"Content-Type": "application/json"}
+    )
+    urlopen(request).read()
+
+
+start = time.time()
+with ThreadPoolExecutor(parsed.concurrency) as executor:
+    list(executor.map(send, range(1, parsed.updates + 1)))
+
+duration = time.time() - start
+print(f"Sent {parsed.updates} updates in {duration:.2f}s")
+print(f"{parsed.updates / duration:.0f} updates per second")
@@ -1,15 +1,23 @@
 #!/bin/env python
 """The main entry point for the ultimate pollbot."""
+import signal
+import threading
+import time
 from contextlib import contextmanager
 
 import typer
+from sqlalchemy import func
 from sqlalchemy_utils.functions import database_exists, create_database, drop_database
 
-from pollbot.db import engine, base
+from pollbot.db import engine, base, get_session
 from pollbot.models import *  # noqa
-from pollbot.pollbot import updater
+from pollbot.models import Poll
+from pollbot.poll import aggregates, partitioning
 from pollbot.config import config
 
+# The bot itself is only imported by the commands, that actually run it.
+# Maintenance commands and spawned worker processes thereby start much faster.
+
 cli = typer.Typer()
 
 
@@ -51,6 +59,10 @@ def initdb(exist_ok: bool = False, drop_existing: bool = False):
             con.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto;")
             pass
 
+        with wrap_echo("Installing pg_trgm extension"):
+            con.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            pass
+
     with wrap_echo("Creating metadata"):
         base.metadata.create_all()
         pass
@@ -59,9 +71,78 @@ def initdb(exist_ok: bool = False, drop_existing: bool = False):
 
 
 @cli.command()
-def run():
+def rebuild_aggregates(batch_size: int = 1000):
+    """Recalculate the vote aggregates of all polls from their votes.
+
+    The aggregates are maintained incrementally.
+    Use this, if they ever get out of sync.
+    """
+    session = get_session()
+    max_id = session.query(func.max(Poll.id)).scalar() or 0
+
+    with wrap_echo(f"Rebuilding vote aggregates of polls up to id {max_id}"):
+        # Commit every batch, to not lock all polls at once
+        for start in range(0, max_id + 1, batch_size):
+            aggregates.rebuild_aggregates(session, range(start, start + batch_size))
+            session.commit()
+
+    session.close()
+
+
+@cli.command()
+def partition_votes(batch_size: int = 10000, pause: float = 0.1):
+    """Copy all votes into the partitioned vote table and swap both tables.
+
+    Run this after migrating to revision e5d1f7a92c40. The bot can keep running.
+    The old table is kept as `vote_unpartitioned`.
+    """
+    session = get_session()
+    if partitioning.is_partitioned(session):
+        typer.echo("The vote table is already partitioned.")
+        return
+
+    with wrap_echo("Copying votes"):
+        last_id = 0
+        while last_id is not None:
+            last_id = partitioning.copy_vote_batch(session, last_id, batch_size)
+            # Commit every batch, to not lock all votes at once
+            session.commit()
+            time.sleep(pause)
+
+    with wrap_echo("Swapping vote tables"):
+        partitioning.swap_vote_tables(session)
+        session.commit()
+
+    session.close()
+
+
+@cli.command()
+def run(
+    runtime: str = typer.Option(
+        "threads", help="Either 'threads' or 'asyncio' (polling mode only)."
+    ),
+    jobs: bool = typer.Option(
+        True, help="Use --no-jobs, if the jobs are run by `main.py worker`."
+    ),
+):
     """Actually start the bot."""
-    if config["webhook"]["enabled"]:
+    from pollbot.pollbot import updater
+    from pollbot.telegram.callback_handler import callback_executor
+
+    if not jobs:
+        for job in updater.job_queue.jobs():
+            job.schedule_removal()
+
+    if runtime == "asyncio":
+        from pollbot.aio.runtime import run as run_asyncio
+
+        typer.echo("Starting the bot in polling mode with the asyncio runtime.")
+        run_asyncio(updater, jobs)
+        callback_executor.shutdown()
+    elif runtime != "threads":
+        typer.echo(f"Unknown runtime {runtime}")
+        raise typer.Exit(code=1)
+    elif config["webhook"]["enabled"]:
         typer.echo("Starting the bot in webhook mode.")
         domain = config["webhook"]["domain"]
         token = config["webhook"]["token"]
@@ -76,6 +157,63 @@ def run():
         typer.echo("Starting the bot in polling mode.")
         updater.start_polling()
         updater.idle()
+        callback_executor.shutdown()
+
+
+@cli.command()
+def worker():
+    """Only run the jobs.
+
+    Only one process runs the jobs at any time, the others are on standby.
+    """
+    from pollbot.helper.leader import job_leader
+    from pollbot.pollbot import updater
+
+    typer.echo("Starting the job runner.")
+    stopped = threading.Event()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(stop_signal, lambda *_: stopped.set())
+
+    updater.job_queue.start()
+    stopped.wait()
+    updater.job_queue.stop()
+    job_leader.release()
+
+
+@cli.command()
+def ingress(
+    processes: int = typer.Option(
+        config["webhook"]["worker_processes"], help="Number of worker processes."
+    ),
+):
+    """Start the bot in webhook mode with multiple worker processes.
+
+    Updates of the same poll are always handled by the same process.
+    """
+    from pollbot.ingress.runtime import run as run_ingress
+
+    typer.echo(f"Starting the webhook ingress with {processes} worker processes.")
+    run_ingress(processes)
+
+
+@cli.command()
+def profile_startup(
+    count: int = typer.Option(15, help="Number of modules to show."),
+):
+    """Show how long it takes to import the bot and which modules are the slowest."""
+    from pollbot.helper.profiling import profile_startup
+
+    profile = profile_startup()
+    typer.echo(f"Imported the bot in {profile.seconds:.3f}s")
+    typer.echo(f"Peak memory usage: {profile.max_rss / 1024:.1f} MiB")
+
+    typer.echo("\nSlowest packages:")
+    for package, microseconds in profile.packages(count):
+        typer.echo(f"{microseconds / 1000:10.1f}ms  {package}")
+
+    typer.echo("\nSlowest modules:")
+    for module in profile.slowest(count):
+        typer.echo(f"{module.own / 1000:10.1f}ms  {module.name}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""Add trigram indexes for the poll search
+
+Revision ID: 3d9e47b1a8c2
+Revises: f2b6d09a4c17
+Create Date: 2026-10-19 22:03:17.602184
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3d9e47b1a8c2"
+down_revision = "f2b6d09a4c17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_poll_name_trgm",
+            "poll",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_poll_description_trgm",
+            "poll",
+            ["description"],
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_poll_description_trgm", table_name="poll")
+    op.drop_index("ix_poll_name_trgm", table_name="poll")
@@ -0,0 +1,32 @@
+"""Add render versions to polls and options
+
+Revision ID: 5d2f8a61c0b3
+Revises: 0abcfa34e032
+Create Date: 2026-10-19 14:02:11.412310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d2f8a61c0b3"
+down_revision = "0abcfa34e032"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "poll",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "option",
+        sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_column("option", "version")
+    op.drop_column("poll", "version")
@@ -0,0 +1,33 @@
+"""Add daily rollup
+
+Revision ID: 6f0c2a9d4e18
+Revises: b81f4c6e2d95
+Create Date: 2026-10-19 23:59:41.180442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "6f0c2a9d4e18"
+down_revision = "b81f4c6e2d95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_rollup",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("users", sa.Integer(), nullable=False),
+        sa.Column("started_users", sa.Integer(), nullable=False),
+        sa.Column("voting_users", sa.Integer(), nullable=False),
+        sa.Column("owning_users", sa.Integer(), nullable=False),
+        sa.Column("votes", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("date"),
+    )
+
+
+def downgrade():
+    op.drop_table("daily_rollup")
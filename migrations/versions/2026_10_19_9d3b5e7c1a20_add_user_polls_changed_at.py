@@ -0,0 +1,24 @@
+"""Add user.polls_changed_at
+
+Revision ID: 9d3b5e7c1a20
+Revises: 6f0c2a9d4e18
+Create Date: 2026-10-20 00:12:05.613927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d3b5e7c1a20"
+down_revision = "6f0c2a9d4e18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("user", sa.Column("polls_changed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("user", "polls_changed_at")
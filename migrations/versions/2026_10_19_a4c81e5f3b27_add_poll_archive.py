@@ -0,0 +1,77 @@
+"""Add poll archive
+
+Revision ID: a4c81e5f3b27
+Revises: 3d9e47b1a8c2
+Create Date: 2026-10-19 23:12:08.447310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c81e5f3b27"
+down_revision = "3d9e47b1a8c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "poll",
+        sa.Column("archived", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.create_table(
+        "poll_archive",
+        sa.Column("poll_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("summarize", sa.Boolean(), nullable=False),
+        sa.Column("pages", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("votes", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("voter_ids", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.ForeignKeyConstraint(["poll_id"], ["poll.id"], ondelete="cascade"),
+        sa.PrimaryKeyConstraint("poll_id"),
+    )
+    op.create_index(
+        "ix_poll_archive_voter_ids",
+        "poll_archive",
+        ["voter_ids"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    # Move all archived votes back into the vote table
+    op.execute(
+        """
+        INSERT INTO vote (poll_id, option_id, user_id, vote_count, type, priority,
+            poll_type, created_at, updated_at)
+        SELECT archive.poll_id,
+            (archive.votes->'option_id'->>i)::integer,
+            (archive.votes->'user_id'->>i)::bigint,
+            (archive.votes->'vote_count'->>i)::integer,
+            archive.votes->'type'->>i,
+            (archive.votes->'priority'->>i)::integer,
+            poll.poll_type,
+            timestamp '1970-01-01' + (archive.votes->'updated_at'->>i)::integer * interval '1 second',
+            timestamp '1970-01-01' + (archive.votes->'updated_at'->>i)::integer * interval '1 second'
+        FROM poll_archive archive
+        JOIN poll ON poll.id = archive.poll_id
+        CROSS JOIN generate_series(0, jsonb_array_length(archive.votes->'user_id') - 1) AS i
+        WHERE EXISTS (
+            SELECT 1 FROM option WHERE option.id = (archive.votes->'option_id'->>i)::integer
+        )
+        AND EXISTS (
+            SELECT 1 FROM "user" WHERE "user".id = (archive.votes->'user_id'->>i)::bigint
+        )
+        ORDER BY archive.poll_id, i
+        """
+    )
+    op.drop_index("ix_poll_archive_voter_ids", table_name="poll_archive")
+    op.drop_table("poll_archive")
+    op.drop_column("poll", "archived")
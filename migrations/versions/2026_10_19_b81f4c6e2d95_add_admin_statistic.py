@@ -0,0 +1,45 @@
+"""Add admin statistic
+
+Revision ID: b81f4c6e2d95
+Revises: e5d1f7a92c40
+Create Date: 2026-10-19 23:59:02.613587
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "b81f4c6e2d95"
+down_revision = "e5d1f7a92c40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "admin_statistic",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("total_users", sa.Integer(), nullable=False),
+        sa.Column("started_users", sa.Integer(), nullable=False),
+        sa.Column("users_owning_polls", sa.Integer(), nullable=False),
+        sa.Column("users_with_votes", sa.Integer(), nullable=False),
+        sa.Column("highest_poll_id", sa.Integer(), nullable=False),
+        sa.Column("total_polls", sa.Integer(), nullable=False),
+        sa.Column("open_polls", sa.Integer(), nullable=False),
+        sa.Column("unfinished_polls", sa.Integer(), nullable=False),
+        sa.Column("closed_polls", sa.Integer(), nullable=False),
+        sa.Column("polls_to_be_deleted", sa.Integer(), nullable=False),
+        sa.Column(
+            "poll_types", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("admin_statistic")
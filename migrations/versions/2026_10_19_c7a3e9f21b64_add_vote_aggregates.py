@@ -0,0 +1,73 @@
+"""Add vote aggregates to polls and options
+
+Revision ID: c7a3e9f21b64
+Revises: 8e41c2b7d5a9
+Create Date: 2026-10-19 18:47:02.518836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c7a3e9f21b64"
+down_revision = "8e41c2b7d5a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column in ["voter_count", "vote_sum"]:
+        op.add_column(
+            "poll",
+            sa.Column(column, sa.Integer(), server_default="0", nullable=False),
+        )
+    for column in ["voter_count", "vote_sum", "yes_count", "maybe_count"]:
+        op.add_column(
+            "option",
+            sa.Column(column, sa.Integer(), server_default="0", nullable=False),
+        )
+
+    op.execute(
+        """
+        UPDATE option SET
+            voter_count = aggregates.voter_count,
+            vote_sum = aggregates.vote_sum,
+            yes_count = aggregates.yes_count,
+            maybe_count = aggregates.maybe_count
+        FROM (
+            SELECT
+                option_id,
+                count(*) AS voter_count,
+                coalesce(sum(vote_count), 0) AS vote_sum,
+                count(*) FILTER (WHERE type = 'yes') AS yes_count,
+                count(*) FILTER (WHERE type = 'maybe') AS maybe_count
+            FROM vote
+            GROUP BY option_id
+        ) AS aggregates
+        WHERE option.id = aggregates.option_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE poll SET
+            voter_count = aggregates.voter_count,
+            vote_sum = aggregates.vote_sum
+        FROM (
+            SELECT
+                poll_id,
+                count(DISTINCT user_id) AS voter_count,
+                coalesce(sum(vote_count), 0) AS vote_sum
+            FROM vote
+            GROUP BY poll_id
+        ) AS aggregates
+        WHERE poll.id = aggregates.poll_id
+        """
+    )
+
+
+def downgrade():
+    for column in ["voter_count", "vote_sum", "yes_count", "maybe_count"]:
+        op.drop_column("option", column)
+    for column in ["voter_count", "vote_sum"]:
+        op.drop_column("poll", column)
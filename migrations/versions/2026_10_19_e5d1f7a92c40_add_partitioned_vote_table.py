@@ -0,0 +1,118 @@
+"""Add partitioned vote table
+
+Revision ID: e5d1f7a92c40
+Revises: a4c81e5f3b27
+Create Date: 2026-10-19 23:48:31.902114
+
+The vote table is too big to be rewritten in a single migration.
+This only creates an empty partitioned copy, which is kept in sync by a trigger.
+The existing votes are then copied in the background via `main.py partition-votes`,
+which finally swaps both tables.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5d1f7a92c40"
+down_revision = "a4c81e5f3b27"
+branch_labels = None
+depends_on = None
+
+# The DDL is frozen here on purpose. Later changes of `pollbot.poll.partitioning`
+# or the vote model mustn't change what this migration does.
+VOTE_PARTITIONS = 16
+
+CREATE_PARTITIONED_TABLE = [
+    """
+    CREATE TABLE vote_partitioned (LIKE vote INCLUDING DEFAULTS)
+    PARTITION BY HASH (poll_id)
+    """,
+    *(
+        f"""
+        CREATE TABLE vote_partitioned_p{remainder} PARTITION OF vote_partitioned
+        FOR VALUES WITH (MODULUS {VOTE_PARTITIONS}, REMAINDER {remainder})
+        """
+        for remainder in range(VOTE_PARTITIONS)
+    ),
+    """
+    ALTER TABLE vote_partitioned
+    ADD CONSTRAINT vote_pkey_partitioned PRIMARY KEY (id, poll_id),
+    ADD CONSTRAINT one_vote_per_option_and_user_partitioned
+        UNIQUE (user_id, poll_id, option_id),
+    ADD CONSTRAINT vote_option_id_fkey
+        FOREIGN KEY (option_id) REFERENCES option (id) ON DELETE CASCADE,
+    ADD CONSTRAINT vote_poll_id_fkey
+        FOREIGN KEY (poll_id) REFERENCES poll (id) ON DELETE CASCADE,
+    ADD CONSTRAINT vote_user_id_fkey
+        FOREIGN KEY (user_id) REFERENCES "user" (id) ON DELETE CASCADE
+    """,
+    """
+    CREATE UNIQUE INDEX ix_unique_single_vote_partitioned
+    ON vote_partitioned (user_id, poll_id) WHERE poll_type = 'single_vote'
+    """,
+    """
+    CREATE UNIQUE INDEX ix_unique_priority_vote_partitioned
+    ON vote_partitioned (user_id, poll_id, priority) WHERE poll_type = 'priority'
+    """,
+    """
+    CREATE INDEX ix_vote_option_id_user_id_partitioned
+    ON vote_partitioned (option_id, user_id)
+    """,
+    """
+    CREATE INDEX ix_vote_poll_id_user_id_partitioned
+    ON vote_partitioned (poll_id, user_id)
+    """,
+    """
+    CREATE INDEX ix_vote_user_id_partitioned ON vote_partitioned (user_id)
+    """,
+]
+
+# Mirror every change of the old table, while the votes are being copied.
+CREATE_TRIGGER = [
+    """
+    CREATE FUNCTION sync_vote_partitioned() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM vote_partitioned
+            WHERE id = OLD.id AND poll_id = OLD.poll_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO vote_partitioned SELECT NEW.* ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER sync_vote_partitioned
+    AFTER INSERT OR UPDATE OR DELETE ON vote
+    FOR EACH ROW EXECUTE FUNCTION sync_vote_partitioned()
+    """,
+]
+
+
+def upgrade():
+    # Databases created by `initdb` are partitioned from the start.
+    partitioned = op.get_bind().execute(
+        sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'vote'::regclass")
+    )
+    if partitioned.scalar():
+        return
+
+    for statement in CREATE_PARTITIONED_TABLE + CREATE_TRIGGER:
+        op.execute(statement)
+
+
+def downgrade():
+    swapped = op.get_bind().execute(sa.text("SELECT to_regclass('vote_unpartitioned')"))
+    if swapped.scalar() is not None:
+        raise Exception(
+            "The vote table has already been swapped. "
+            "Swap it back by hand, before downgrading."
+        )
+
+    op.execute("DROP TRIGGER IF EXISTS sync_vote_partitioned ON vote")
+    op.execute("DROP FUNCTION IF EXISTS sync_vote_partitioned()")
+    op.execute("DROP TABLE IF EXISTS vote_partitioned")
@@ -0,0 +1,109 @@
+"""Add indexes for hot queries
+
+Revision ID: f2b6d09a4c17
+Revises: c7a3e9f21b64
+Create Date: 2026-10-19 21:12:40.103947
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2b6d09a4c17"
+down_revision = "c7a3e9f21b64"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The vote and poll tables are huge and busy.
+    # Build and drop all indexes without blocking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_vote_option_id_user_id",
+            "vote",
+            ["option_id", "user_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_vote_poll_id_user_id",
+            "vote",
+            ["poll_id", "user_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_reference_bot_inline_message_id_poll_id",
+            "reference",
+            ["bot_inline_message_id", "poll_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_poll_user_id_created_closed_created_at",
+            "poll",
+            ["user_id", "created", "closed", "created_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_update_next_update"),
+            "update",
+            ["next_update"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_poll_next_notification_open",
+            "poll",
+            ["next_notification"],
+            postgresql_where=sa.text("closed IS false"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_poll_due_date_open",
+            "poll",
+            ["due_date"],
+            postgresql_where=sa.text("closed IS false"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_poll_delete_updated_at",
+            "poll",
+            ["updated_at"],
+            postgresql_where=sa.text("delete IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+        # Those are covered by the new composite indexes
+        op.drop_index(
+            "ix_vote_option_id", table_name="vote", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_vote_poll_id", table_name="vote", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_poll_user_id", table_name="poll", postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_poll_user_id", "poll", ["user_id"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_vote_poll_id", "vote", ["poll_id"], postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_vote_option_id", "vote", ["option_id"], postgresql_concurrently=True
+        )
+
+        for name, table in [
+            ("ix_poll_delete_updated_at", "poll"),
+            ("ix_poll_due_date_open", "poll"),
+            ("ix_poll_next_notification_open", "poll"),
+            (op.f("ix_update_next_update"), "update"),
+            ("ix_poll_user_id_created_closed_created_at", "poll"),
+            ("ix_reference_bot_inline_message_id_poll_id", "reference"),
+            ("ix_vote_poll_id_user_id", "vote"),
+            ("ix_vote_option_id_user_id", "vote"),
+        ]:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,121 @@
+"""An asyncio-native client for the Telegram bot API.
+
+The client is based on tornado's http client, which already ships with
+python-telegram-bot. Any amount of requests can be in flight at once,
+without a thread or a pooled connection per request.
+
+Responses are handled exactly like python-telegram-bot does, so the existing
+exception handling for `BadRequest`, `RetryAfter` and so on keeps working.
+"""
+import json
+from typing import Any
+
+from telegram.error import (
+    BadRequest,
+    Conflict,
+    InvalidToken,
+    NetworkError,
+    TimedOut,
+    Unauthorized,
+)
+from telegram.utils.request import Request
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+from tornado.simple_httpclient import HTTPTimeoutError
+
+# Telegram answers long polling requests after this amount of seconds at the latest
+LONG_POLLING_TIMEOUT = 30
+
+DEFAULT_TIMEOUT = 20
+
+
+class AsyncTelegramClient:
+    """Send requests to the Telegram bot API without blocking."""
+
+    def __init__(
+        self, token: str, max_clients: int, base_url: str = "https://api.telegram.org"
+    ) -> None:
+        """Contructor.
+
+        Must be called inside the event loop, that's going to run the requests.
+        """
+        self.base_url = f"{base_url}/bot{token}"
+        self.http = AsyncHTTPClient(force_instance=True, max_clients=max_clients)
+
+    async def call(
+        self, method: str, request_timeout: float = DEFAULT_TIMEOUT, **params: Any
+    ) -> Any:
+        """Call a method of the bot API and return its result."""
+        params = {
+            key: to_json(value) for key, value in params.items() if value is not None
+        }
+        body = json.dumps(params).encode("utf-8")
+        data = await self.fetch(f"{self.base_url}/{method}", body, request_timeout)
+
+        return Request._parse(data)
+
+    async def fetch(self, url: str, body: bytes, timeout: float | None) -> bytes:
+        """Post a json body and return the raw response."""
+        request = HTTPRequest(
+            url,
+            method="POST",
+            body=body,
+            headers={"Content-Type": "application/json"},
+            request_timeout=timeout or DEFAULT_TIMEOUT,
+        )
+        # Unsuccessful status codes are handled below.
+        # Timeouts and connection errors are still raised.
+        try:
+            response = await self.http.fetch(request, raise_error=False)
+        except HTTPTimeoutError as error:
+            raise TimedOut() from error
+        except (HTTPClientError, OSError) as error:
+            raise NetworkError(f"Connection error {error}") from error
+
+        raise_for_status(response.code, response.body)
+
+        return response.body
+
+    async def get_updates(self, offset: int) -> list[dict]:
+        """Long poll for new updates."""
+        return await self.call(
+            "getUpdates",
+            request_timeout=LONG_POLLING_TIMEOUT + DEFAULT_TIMEOUT,
+            offset=offset,
+            timeout=LONG_POLLING_TIMEOUT,
+        )
+
+    def close(self) -> None:
+        """Close all connections."""
+        self.http.close()
+
+
+def to_json(value: Any) -> Any:
+    """Convert telegram objects, such as reply markups, to plain json values."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+
+    return value
+
+
+def raise_for_status(status: int, body: bytes) -> None:
+    """Raise the same exceptions as python-telegram-bot for unsuccessful requests."""
+    if 200 <= status <= 299:
+        return
+
+    try:
+        message = str(Request._parse(body))
+    except ValueError:
+        message = "Unknown HTTPError"
+
+    if status in (401, 403):
+        raise Unauthorized(message)
+    if status == 400:
+        raise BadRequest(message)
+    if status == 404:
+        raise InvalidToken()
+    if status == 409:
+        raise Conflict(message)
+    if status == 502:
+        raise NetworkError("Bad Gateway")
+
+    raise NetworkError(f"{message} ({status})")
@@ -0,0 +1,126 @@
+"""Jobs of the asyncio runtime."""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.scoping import scoped_session
+from telegram.error import RetryAfter, TelegramError
+
+from pollbot.aio.client import AsyncTelegramClient
+from pollbot.aio.session import async_job_wrapper, run_in_session
+from pollbot.models import Reference, Update
+from pollbot.poll.loading import RENDER
+from pollbot.poll.update import get_reference_message, handle_reference_error
+from pollbot.sentry import sentry
+
+UPDATE_BATCH_SIZE = 50
+
+
+class PreparedUpdate:
+    """The rendered messages of a scheduled update."""
+
+    def __init__(self, update_id: int, count: int, poll_id: int) -> None:
+        """Contructor."""
+        self.update_id = update_id
+        self.count = count
+        self.poll_id = poll_id
+        # Pairs of reference ids and the arguments of their `editMessageText` call
+        self.messages: list[tuple[int, dict]] = []
+
+
+@async_job_wrapper
+async def message_update_job(client: AsyncTelegramClient) -> None:
+    """Update all polls that are scheduled for an update.
+
+    The messages of a whole batch of polls are edited concurrently.
+    """
+    now = datetime.now()
+    while True:
+        prepared = await run_in_session(prepare_updates, now)
+        if not prepared:
+            return
+
+        requests = [
+            client.call("editMessageText", **message)
+            for update in prepared
+            for _, message in update.messages
+        ]
+        results = await asyncio.gather(*requests, return_exceptions=True)
+
+        await run_in_session(finish_updates, prepared, results, now)
+
+
+def prepare_updates(session: scoped_session, now: datetime) -> list[PreparedUpdate]:
+    """Render the messages of the next batch of due updates."""
+    updates = (
+        session.query(Update)
+        .filter(Update.next_update <= now)
+        .options(joinedload(Update.poll).options(*RENDER))
+        .order_by(Update.next_update.asc())
+        .limit(UPDATE_BATCH_SIZE)
+        .all()
+    )
+
+    prepared = []
+    for update in updates:
+        prepared_update = PreparedUpdate(update.id, update.count, update.poll_id)
+        for reference in update.poll.references:
+            message = get_reference_message(session, update.poll, reference)
+            if message is not None:
+                prepared_update.messages.append((reference.id, message))
+
+        prepared.append(prepared_update)
+
+    return prepared
+
+
+def finish_updates(
+    session: scoped_session,
+    prepared: list[PreparedUpdate],
+    results: list,
+    now: datetime,
+) -> None:
+    """Handle failed edits and remove all updates, that have been sent."""
+    results = iter(results)
+    for update in prepared:
+        retry_after = None
+        for reference_id, _ in update.messages:
+            result = next(results)
+            if isinstance(result, RetryAfter):
+                retry_after = max(retry_after or 0, int(result.retry_after) + 1)
+            elif isinstance(result, TelegramError):
+                handle_failed_edit(session, reference_id, result)
+            elif isinstance(result, Exception):
+                sentry.capture_job_exception(result)
+
+        if retry_after is not None:
+            # Schedule an update after the RetryAfter timeout + 1 second buffer
+            session.query(Update).filter(Update.id == update.update_id).update(
+                {"next_update": now + timedelta(seconds=retry_after)}
+            )
+            continue
+
+        # Votes, that came in while sending, already scheduled another update.
+        session.execute(
+            delete(Update)
+            .where(Update.id == update.update_id)
+            .where(Update.count == update.count)
+            .where(Update.next_update <= now)
+        )
+
+    session.commit()
+
+
+def handle_failed_edit(
+    session: scoped_session, reference_id: int, error: TelegramError
+) -> None:
+    """Handle the error of a single edit, just like the threaded runtime does."""
+    reference = session.query(Reference).get(reference_id)
+    if reference is None:
+        return
+
+    try:
+        handle_reference_error(session, reference.poll, reference, error)
+    except TelegramError as e:
+        sentry.capture_job_exception(e)
@@ -0,0 +1,39 @@
+"""Send the requests of the synchronous bot through the event loop."""
+import asyncio
+from typing import Any
+
+from telegram.utils.request import Request
+
+from pollbot.aio.client import AsyncTelegramClient
+
+
+class LoopRequest(Request):
+    """A request backend for `telegram.Bot`, that uses the async client.
+
+    The handlers keep using the normal synchronous bot. Their requests are run by
+    the event loop, which shares a single connection pool between all threads.
+    File uploads are rare and still use the original urllib3 backend.
+    """
+
+    __slots__ = ("client", "loop")
+
+    def __init__(
+        self, client: AsyncTelegramClient, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        """Contructor."""
+        super().__init__(con_pool_size=4)
+        self.client = client
+        self.loop = loop
+
+    def _request_wrapper(self, method: str, url: str, **kwargs: Any) -> bytes:
+        """Run json requests on the event loop and wait for the response."""
+        if "body" not in kwargs:
+            return super()._request_wrapper(method, url, **kwargs)
+
+        timeout = kwargs.get("timeout")
+        read_timeout = getattr(timeout, "read_timeout", None)
+        future = asyncio.run_coroutine_threadsafe(
+            self.client.fetch(url, kwargs["body"], read_timeout), self.loop
+        )
+
+        return future.result()
@@ -0,0 +1,101 @@
+"""The asyncio runtime of the bot.
+
+The threaded runtime of python-telegram-bot pins a thread for each running
+Telegram request. In this runtime, all Telegram requests are sent by the event loop:
+
+- Updates are fetched via long polling on the event loop.
+- The dispatcher and its handlers run as usual, but the requests of their bot
+    are sent by the event loop. They thereby share one connection pool.
+- The message update job edits all messages of a batch of polls concurrently.
+    Only the database work is done in threads.
+
+The handlers aren't async. Each of them still blocks its dispatcher thread,
+until the event loop has sent its requests. Only the connections are shared.
+This runtime only supports long polling. Use the ingress for webhooks.
+"""
+import asyncio
+import logging
+import threading
+
+from telegram import Update
+from telegram.error import NetworkError, TimedOut
+from telegram.ext import Updater
+
+from pollbot.aio.client import AsyncTelegramClient
+from pollbot.aio.jobs import message_update_job
+from pollbot.aio.request import LoopRequest
+from pollbot.aio.session import session_executor
+from pollbot.config import config
+
+# The threaded counterpart of the update job, which is replaced in this runtime
+THREADED_UPDATE_JOB = "Handle poll message update queue."
+
+MESSAGE_UPDATE_INTERVAL = 10
+
+
+def run(updater: Updater, jobs: bool = True) -> None:
+    """Run the bot until it's interrupted."""
+    if config["webhook"]["enabled"]:
+        # Fetching updates via long polling would delete the configured webhook
+        raise RuntimeError("The asyncio runtime doesn't support webhooks.")
+
+    try:
+        asyncio.run(serve(updater, jobs))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve(updater: Updater, jobs: bool) -> None:
+    """Start all components and fetch updates until cancelled."""
+    client = AsyncTelegramClient(
+        config["telegram"]["api_key"], config["telegram"]["max_connections"]
+    )
+    dispatcher = updater.dispatcher
+    # The handlers keep using the existing bot. Only its requests are sent differently.
+    dispatcher.bot._request = LoopRequest(client, asyncio.get_running_loop())
+
+    for job in updater.job_queue.get_jobs_by_name(THREADED_UPDATE_JOB):
+        job.schedule_removal()
+
+    dispatcher_thread = threading.Thread(
+        target=dispatcher.start, name="dispatcher", daemon=True
+    )
+    dispatcher_thread.start()
+    updater.job_queue.start()
+
+    update_job = None
+    if jobs:
+        update_job = asyncio.create_task(run_message_updates(client))
+    try:
+        await client.call("deleteWebhook")
+        await poll_updates(client, dispatcher)
+    finally:
+        if update_job is not None:
+            update_job.cancel()
+        updater.job_queue.stop()
+        dispatcher.stop()
+        session_executor.shutdown(wait=True)
+        client.close()
+
+
+async def poll_updates(client: AsyncTelegramClient, dispatcher) -> None:
+    """Fetch updates via long polling and pass them to the dispatcher."""
+    offset = 0
+    while True:
+        try:
+            updates = await client.get_updates(offset)
+        except (TimedOut, NetworkError) as e:
+            logging.warning(f"Failed to fetch updates: {e}")
+            await asyncio.sleep(1)
+            continue
+
+        for data in updates:
+            offset = data["update_id"] + 1
+            dispatcher.update_queue.put(Update.de_json(data, dispatcher.bot))
+
+
+async def run_message_updates(client: AsyncTelegramClient) -> None:
+    """Run the message update job in a fixed interval."""
+    while True:
+        await message_update_job(client)
+        await asyncio.sleep(MESSAGE_UPDATE_INTERVAL)
@@ -0,0 +1,68 @@
+"""Session helper for coroutines.
+
+The database is still accessed synchronously. All database work is offloaded
+to a thread pool, which is as big as the connection pool. A thread is thereby
+only blocked while it's actually talking to the database, never while waiting
+for Telegram.
+"""
+import asyncio
+import traceback
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Any, TypeVar
+
+from pollbot.config import config
+from pollbot.db import get_session
+from pollbot.helper.leader import job_leader
+from pollbot.sentry import ignore_job_exception, sentry
+
+T = TypeVar("T")
+
+session_executor = ThreadPoolExecutor(
+    max_workers=config["database"]["connection_count"],
+    thread_name_prefix="session",
+)
+
+
+async def run_in_session(func: Callable[..., T], *args: Any) -> T:
+    """Run a function with a new session in the session thread pool.
+
+    The session is committed, if the function succeeds and rolled back otherwise.
+    """
+
+    def run() -> T:
+        session = get_session()
+        try:
+            result = func(session, *args)
+            session.commit()
+
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    return await asyncio.get_running_loop().run_in_executor(session_executor, run)
+
+
+def async_job_wrapper(func: Callable[..., Awaitable[Any]]):
+    """The counterpart of `job_wrapper` for coroutines."""
+
+    @wraps(func)
+    async def wrapper(*args: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(session_executor, job_leader.is_leader):
+                return
+
+            await func(*args)
+        except Exception as e:
+            if not ignore_job_exception(e):
+                if config["logging"]["debug"]:
+                    traceback.print_exc()
+
+                sentry.capture_exception(tags={"handler": "job"})
+
+    return wrapper
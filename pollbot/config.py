@@ -10,16 +10,28 @@ default_config = {
         "bot_name": "your_bot_@_username",
         "api_key": "your_telegram_api_key",
         "worker_count": 20,
+        # Threads for callback queries. Callbacks of the same user or poll run in order.
+        "callback_worker_count": 20,
+        # Concurrent requests to Telegram in the asyncio runtime
+        "max_connections": 1000,
         "admin": "nukesor",
         "allow_private_vote": False,
         "max_user_votes_per_day": 200,
         "max_inline_shares": 20,
+        # Seconds Telegram may cache the inline search results of a user
+        "inline_cache_time": 5,
         "max_polls_per_user": 200,
+        # Days after which the votes of closed polls are moved to an archive
+        "archive_after_days": 30,
     },
     "database": {
         "sql_uri": "postgresql://pollbot:localhost/pollbot",
         "connection_count": 20,
         "overflow_count": 10,
+        # Optional read replica for listings, searches and statistics
+        "replica_uri": "",
+        # Seconds the replica may lag behind, before the primary is used instead
+        "max_replica_lag": 2,
     },
     "logging": {
         "sentry_enabled": False,
@@ -33,6 +45,15 @@ default_config = {
         "token": "pollbot",
         "cert_path": "/path/to/cert.pem",
         "port": 7000,
+        # Processes of the webhook ingress (`main.py ingress`)
+        "worker_processes": 4,
+    },
+    "cache": {
+        # Either "memory" (per process) or "postgres" (shared between processes)
+        "backend": "memory",
+        "max_size": 5000,
+        # Seconds until entries of the postgres backend are purged
+        "max_age": 3600,
     },
 }
 
@@ -48,6 +69,7 @@ else:
 
     # Set default values for any missing keys in the loaded config
     for key, category in default_config.items():
+        config.setdefault(key, {})
         for option, value in category.items():
             if option not in config[key]:
                 config[key][option] = value
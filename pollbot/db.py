@@ -1,7 +1,18 @@
-"""Helper class to get a database engine and to get a session."""
+"""Helper class to get a database engine and to get a session.
+
+Read-only code paths can use an optional read replica via `read_session`.
+The replica is only used, while its replication lag is below `max_replica_lag`.
+"""
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
 from typing import cast
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
@@ -15,8 +26,105 @@ engine = create_engine(
 )
 base = declarative_base(bind=engine)
 
+# Zero, if the replica has replayed everything it received.
+# Otherwise the seconds since the last replayed transaction.
+# NULL, if the database isn't a streaming replica.
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaMonitor:
+    """Track up to which point in time the replica is up to date.
+
+    The lag is checked at most once per `check_interval` seconds.
+    """
+
+    def __init__(self, engine: Engine, max_lag: float, check_interval: float = 1):
+        """Contructor."""
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.checked_at = 0.0
+        # The time up to which all transactions have been replayed
+        self.replayed_until = 0.0
+        self.lock = Lock()
+
+    def is_fresh(self, changed_at: float | None = None) -> bool:
+        """Check, whether the replica is up to date.
+
+        If `changed_at` is given, the replica must contain all changes up to then.
+        """
+        now = time.time()
+        if now - self.checked_at >= self.check_interval:
+            self.check(now)
+
+        threshold = now - self.max_lag
+        if changed_at is not None:
+            threshold = max(threshold, changed_at)
+
+        return self.replayed_until >= threshold
+
+    def check(self, now: float) -> None:
+        """Query the current lag of the replica."""
+        with self.lock:
+            # Another thread might have checked in the meantime
+            if now - self.checked_at < self.check_interval:
+                return
+            self.checked_at = now
+
+            try:
+                with self.engine.connect() as connection:
+                    lag = connection.execute(REPLICA_LAG_QUERY).scalar()
+            except DBAPIError as e:
+                # The replica will be considered outdated after `max_lag` seconds
+                logging.warning(f"Failed to check the replica: {e}")
+                return
+
+            self.replayed_until = now - float(lag or 0)
+
+
+replica_engine = None
+replica_monitor = None
+if config["database"]["replica_uri"]:
+    replica_engine = create_engine(
+        config["database"]["replica_uri"],
+        pool_size=config["database"]["connection_count"],
+        max_overflow=config["database"]["overflow_count"],
+        echo=False,
+    )
+    replica_monitor = ReplicaMonitor(
+        replica_engine, config["database"]["max_replica_lag"]
+    )
+
 
 def get_session(connection: None = None) -> Session:
     """Get a new db session."""
     session = scoped_session(sessionmaker(bind=engine))
     return cast(Session, session)
+
+
+@contextmanager
+def read_session(
+    session: Session, changed_at: float | None = None
+) -> Iterator[Session]:
+    """Get a session for read-only queries.
+
+    This is a session of the read replica, if it's configured and up to date.
+    Otherwise the given session of the primary is used.
+    Objects of a replica session must not be used after leaving the context.
+    """
+    if replica_monitor is None or not replica_monitor.is_fresh(changed_at):
+        yield session
+        return
+
+    replica_session = Session(bind=replica_monitor.engine)
+    try:
+        yield replica_session
+    finally:
+        replica_session.close()
@@ -1,86 +1,51 @@
-from pollbot.models import Poll, User
+from pollbot.enums import PollType
+from pollbot.helper.stats import refresh_admin_statistic
+from pollbot.models import AdminStatistic
 
+POLL_TYPE_NAMES = {
+    PollType.single_vote.name: "Single",
+    PollType.doodle.name: "Doodle",
+    PollType.count_vote.name: "Count",
+    PollType.priority.name: "Priority",
+    PollType.block_vote.name: "Block",
+    PollType.limited_vote.name: "Limited",
+    PollType.cumulative_vote.name: "Cumulative",
+}
 
-def stats(session):
-    """Get user stats."""
-    # User stats
-    total_users = session.query(User.id).count()
-    users_owning_polls = (
-        session.query(User)
-        .join(User.polls)
-        .filter(Poll.created.is_(True))
-        .group_by(User)
-        .count()
-    )
-    users_with_votes = session.query(User).join(User.votes).group_by(User).count()
-    users_started = session.query(User).filter(User.started.is_(True)).count()
-
-    # Polls
-    highest_id = session.query(Poll.id).order_by(Poll.id.desc()).first()[0]
-    total_polls = session.query(Poll).filter(Poll.delete.is_(None)).count()
-    created_polls = (
-        session.query(Poll)
-        .filter(Poll.closed.is_(False))
-        .filter(Poll.created.is_(True))
-        .filter(Poll.delete.is_(None))
-        .count()
-    )
-    unfinished_polls = (
-        session.query(Poll)
-        .filter(Poll.closed.is_(False))
-        .filter(Poll.created.is_(False))
-        .filter(Poll.delete.is_(None))
-        .count()
-    )
-
-    closed_polls = (
-        session.query(Poll)
-        .filter(Poll.closed.is_(True))
-        .filter(Poll.delete.is_(None))
-        .count()
-    )
-
-    # Poll types
-    single = session.query(Poll).filter(Poll.poll_type == "single_vote").count()
-    doodle = session.query(Poll).filter(Poll.poll_type == "doodle").count()
-    count = session.query(Poll).filter(Poll.poll_type == "count_vote").count()
-    priority = session.query(Poll).filter(Poll.poll_type == "priority").count()
-    block = session.query(Poll).filter(Poll.poll_type == "block_vote").count()
-    limited = session.query(Poll).filter(Poll.poll_type == "limited_vote").count()
-    cumulative = session.query(Poll).filter(Poll.poll_type == "cumulative_vote").count()
-    to_be_deleted = session.query(Poll).filter(Poll.delete.isnot(None)).count()
 
-    single_percent = single / total_polls * 100
-    doodle_percent = doodle / total_polls * 100
-    count_percent = count / total_polls * 100
-    priority_percent = priority / total_polls * 100
-    block_percent = block / total_polls * 100
-    limited_percent = limited / total_polls * 100
-    cumulative_percent = cumulative / total_polls * 100
-
-    message = f"""Users:
-    Total: {total_users}
-    Started: {users_started}
-    Owning polls: {users_owning_polls}
-    Voted: {users_with_votes}
+def stats(session):
+    """Get user stats from the latest snapshot."""
+    statistic = session.query(AdminStatistic).get(1)
+    # Only happens once, before the job ran for the first time.
+    if statistic is None:
+        refresh_admin_statistic(session)
+        session.commit()
+        statistic = session.query(AdminStatistic).get(1)
+
+    total_polls = statistic.total_polls or 1
+    types = ""
+    for poll_type, name in POLL_TYPE_NAMES.items():
+        count = statistic.poll_types.get(poll_type, 0)
+        types += f"\n    {name}: {count} ({count / total_polls * 100:.2f}%)"
+
+    message = f"""Snapshot from {statistic.created_at:%Y-%m-%d %H:%M}
+
+Users:
+    Total: {statistic.total_users}
+    Started: {statistic.started_users}
+    Owning polls: {statistic.users_owning_polls}
+    Voted: {statistic.users_with_votes}
 
 Polls:
-    Highest ID: {highest_id}
-    Total: {total_polls}
-    Open: {created_polls}
-    Unfinished: {unfinished_polls}
-    Closed: {closed_polls}
-    Deleted: {highest_id - total_polls}
-    To be deleted: {to_be_deleted}
-
-Types:
-    Single:  {single} ({single_percent:.2f}%)
-    Doodle: {doodle} ({doodle_percent:.2f}%)
-    Count: {count} ({count_percent:.2f}%)
-    Priority: {priority} ({priority_percent:.2f}%)
-    Block: {block} ({block_percent:.2f}%)
-    Limited: {limited} ({limited_percent:.2f}%)
-    Cumulative: {cumulative} ({cumulative_percent:.2f}%)
+    Highest ID: {statistic.highest_poll_id}
+    Total: {statistic.total_polls}
+    Open: {statistic.open_polls}
+    Unfinished: {statistic.unfinished_polls}
+    Closed: {statistic.closed_polls}
+    Deleted: {statistic.highest_poll_id - statistic.total_polls}
+    To be deleted: {statistic.polls_to_be_deleted}
+
+Types:{types}
 """
 
     return message
@@ -1,13 +1,19 @@
 """Display helper for misc stuff."""
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm.scoping import scoped_session
 from telegram.inline.inlinekeyboardmarkup import InlineKeyboardMarkup
 
+from pollbot.db import read_session
 from pollbot.i18n import i18n
 from pollbot.models import Poll
 from pollbot.models.user import User
+from pollbot.poll.loading import LIST_VIEW
+from pollbot.poll.search import get_last_poll_change
 from pollbot.telegram.keyboard.management import get_poll_list_keyboard
 from pollbot.telegram.keyboard.misc import get_help_keyboard
 
+POLL_LIST_PAGE_SIZE = 10
+
 
 def get_help_text_and_keyboard(
     user: User, current_category: str
@@ -29,33 +35,64 @@ def get_help_text_and_keyboard(
 
 
 def get_poll_list(
-    session: scoped_session, user: User, offset: int, closed: bool = False
+    session: scoped_session,
+    user: User,
+    cursor: Poll | None = None,
+    forward: bool = True,
+    closed: bool = False,
 ) -> tuple[str, InlineKeyboardMarkup] | tuple[str, None]:
-    """Get the a list of polls for the user."""
-    polls = (
-        session.query(Poll)
-        .filter(Poll.user == user)
-        .filter(Poll.created.is_(True))
-        .filter(Poll.closed.is_(closed))
-        .filter(Poll.delete.is_(None))
-        .offset(offset)
-        .limit(10)
-        .all()
-    )
-    poll_count = (
-        session.query(Poll)
-        .filter(Poll.user == user)
-        .filter(Poll.created.is_(True))
-        .filter(Poll.closed.is_(closed))
-        .count()
-    )
-
-    if len(polls) == 0 and closed:
-        return i18n.t("list.no_closed_polls", locale=user.locale), None
-    elif len(polls) == 0:
-        return i18n.t("list.no_polls", locale=user.locale), None
-
-    text = i18n.t("list.polls", locale=user.locale)
-    keyboard = get_poll_list_keyboard(polls, closed, offset, poll_count)
+    """Get a page of polls for the user, starting with the newest poll.
 
-    return text, keyboard
+    The page starts after (or ends before, if not `forward`) the cursor poll.
+    Cursors of other users are ignored and start on the first page.
+    The amount of remaining polls is counted by a window function in the same query.
+    The list is read from the read replica, if it is available.
+    """
+    if cursor is not None and cursor.user_id != user.id:
+        cursor = None
+
+    with read_session(session, get_last_poll_change(user)) as reader:
+        keyset = tuple_(Poll.created_at, Poll.id)
+        query = (
+            reader.query(Poll, func.count().over())
+            .options(*LIST_VIEW)
+            .filter(Poll.user_id == user.id)
+            .filter(Poll.created.is_(True))
+            .filter(Poll.closed.is_(closed))
+            .filter(Poll.delete.is_(None))
+        )
+
+        if cursor is not None:
+            values = tuple_(cursor.created_at, cursor.id)
+            query = query.filter(keyset < values if forward else keyset > values)
+
+        if forward:
+            query = query.order_by(Poll.created_at.desc(), Poll.id.desc())
+        else:
+            query = query.order_by(Poll.created_at.asc(), Poll.id.asc())
+
+        rows = query.limit(POLL_LIST_PAGE_SIZE).all()
+
+        # The polls around the cursor are gone. Start from the beginning.
+        if len(rows) == 0 and cursor is not None:
+            return get_poll_list(session, user, closed=closed)
+
+        if len(rows) == 0 and closed:
+            return i18n.t("list.no_closed_polls", locale=user.locale), None
+        elif len(rows) == 0:
+            return i18n.t("list.no_polls", locale=user.locale), None
+
+        polls = [poll for poll, _ in rows]
+        has_more = rows[0][1] > len(polls)
+        if forward:
+            has_previous = cursor is not None
+            has_next = has_more
+        else:
+            polls.reverse()
+            has_previous = has_more
+            has_next = True
+
+        text = i18n.t("list.polls", locale=user.locale)
+        keyboard = get_poll_list_keyboard(polls, closed, has_previous, has_next)
+
+        return text, keyboard
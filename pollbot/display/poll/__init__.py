@@ -1,7 +1,6 @@
 """Get the text describing the current state of the poll."""
 from sqlalchemy.orm.scoping import scoped_session
 
-from pollbot.models import Option, User, Vote
 from pollbot.models.poll import Poll
 from pollbot.poll.helper import poll_has_limited_votes
 
@@ -15,17 +14,18 @@ class Context:
 
     def __init__(self, session: scoped_session, poll: Poll) -> None:
         """Contructor."""
-        self.total_user_count = (
-            session.query(User.id)
-            .join(Vote)
-            .join(Option)
-            .filter(Option.poll == poll)
-            .group_by(User.id)
-            .count()
-        )
+        self.total_user_count = poll.voter_count
 
         # Flags
         self.anonymous = poll.anonymous
         self.show_results = poll.should_show_result()
         self.show_percentage = poll.show_percentage
         self.limited_votes = poll_has_limited_votes(poll)
+
+        # Tallies of priority polls, that have results to show
+        self.priority_result = None
+        if poll.is_priority() and self.show_results and self.total_user_count > 0:
+            # numpy is only loaded, once a priority poll is rendered
+            from pollbot.poll.ranking import get_priority_result
+
+            self.priority_result = get_priority_result(session, poll)
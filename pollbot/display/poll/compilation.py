@@ -1,15 +1,29 @@
+from itertools import chain
+
 from sqlalchemy.orm.scoping import scoped_session
 from telegram.inline.inlinekeyboardmarkup import InlineKeyboardMarkup
 
 from pollbot.display.poll import Context
+from pollbot.enums import RenderLevel
 from pollbot.i18n import i18n
 from pollbot.models.poll import Poll
 from pollbot.models.user import User
+from pollbot.poll.archive import get_archive
+from pollbot.poll.option import get_sorted_options
 from pollbot.telegram.keyboard.vote import get_vote_keyboard
 
-from .option import get_option_information
+from .option import get_option_information, get_option_lines, shows_voters
+from .priority_vote_results import get_priority_result_lines
+from .render_cache import get_render_key, render_cache
 from .vote import get_remaining_votes_lines, get_vote_information_line
 
+MAX_TEXT_LENGTH = 4000
+# Every line is counted with its line break, but the last line doesn't have one.
+TEXT_BUDGET = MAX_TEXT_LENGTH + 1
+# Each voter of an option takes at least this many characters,
+# e.g. `[a](tg://user?id=1)` and a separator
+MIN_VOTE_LINE_LENGTH = 20
+
 
 def get_poll_text_and_vote_keyboard(
     session: scoped_session,
@@ -23,7 +37,17 @@ def get_poll_text_and_vote_keyboard(
         poll,
     )
 
+    # Priority vote keyboards are different for each user
+    user_id = None
+    if poll.is_priority() and user is not None:
+        user_id = user.id
+    key = get_render_key(poll, f"keyboard:{user_id}:{show_back}")
+    data = render_cache.get(session, key)
+    if data is not None:
+        return text, InlineKeyboardMarkup.de_json(data, None)
+
     keyboard = get_vote_keyboard(poll, user, show_back, summary=summarize)
+    render_cache.set(session, key, keyboard.to_dict())
 
     return text, keyboard
 
@@ -37,41 +61,151 @@ def get_poll_text(session: scoped_session, poll: Poll) -> str:
 def get_poll_text_and_summarize(
     session: scoped_session, poll: Poll
 ) -> tuple[str, bool]:
-    """Get the poll text and vote keyboard."""
-    summarize = poll.permanently_summarized or poll.summarize
+    """Get the poll text and whether it has been summarized."""
+    # Flush pending changes, otherwise the poll's version might be outdated.
+    session.flush()
 
-    # Always summarize
-    if summarize:
-        lines = compile_poll_text(session, poll, summarize=summarize)
-        text = "\n".join(lines)
+    archive = get_archive(session, poll)
+    if archive is not None:
+        return archive.text, archive.summarize
 
-    else:
-        # We don't know if we should summarize yet.
-        # Don't use the summarized version.
-        lines = compile_poll_text(session, poll)
-        text = "\n".join(lines)
+    key = get_render_key(poll, "text")
+    data = render_cache.get(session, key)
+    if data is not None:
+        return data["text"], data["summarize"]
+
+    lines, level = render_poll_text_within_budget(session, poll)
+
+    # The poll got too long. Keep it summarized from now on.
+    # The flag changes the render version and the rendering itself.
+    # Otherwise the text would be cached for a version, that's already outdated.
+    if (
+        level in [RenderLevel.shortened, RenderLevel.too_long]
+        and not poll.permanently_summarized
+    ):
+        poll.permanently_summarized = True
+        session.flush()
+        key = get_render_key(poll, "text")
+        lines, level = render_poll_text_within_budget(session, poll)
 
-        # If the text is too long, summarize it.
-        if len(text) > 4000:
-            poll.permanently_summarize = True
-            lines = compile_poll_text(session, poll, summarize=summarize)
-            text = "\n".join(lines)
+    text = "\n".join(lines)
+    summarize = level != RenderLevel.full
 
     # The text is still too long after summarization
     # Print a debug text
-    if len(text) > 4000:
+    if level == RenderLevel.too_long:
         text = i18n.t("misc.too_long", locale=poll.locale)
-        poll.permanently_summarized = True
+
+    render_cache.set(session, key, {"text": text, "summarize": summarize})
 
     return text, summarize
 
 
+def render_poll_text_within_budget(
+    session: scoped_session, poll: Poll
+) -> tuple[list[str], RenderLevel]:
+    """Render the poll text, summarizing as many options as necessary to fit.
+
+    The options are rendered with all of their voters, until the text would get
+    too long. All following options are then summarized. Options, that can't
+    possibly fit, are summarized without rendering all of their voters first.
+    """
+    context = Context(session, poll)
+    options = get_sorted_options(poll, context.total_user_count)
+    header = get_header_lines(poll, context)
+
+    # The lines of the options, that are shown with all voters
+    full_options: list[list[str]] = []
+    if not (poll.summarize or poll.permanently_summarized):
+        footer = get_footer_lines(session, poll, context, remaining_votes=True)
+        remaining = TEXT_BUDGET - get_length(header) - get_length(footer)
+        for index, option in enumerate(options):
+            if (
+                shows_voters(poll, option, context)
+                and option.voter_count * MIN_VOTE_LINE_LENGTH > remaining
+            ):
+                break
+
+            lines = get_option_lines(session, poll, option, index, context, False)
+            remaining -= get_length(lines)
+            if remaining < 0:
+                break
+            full_options.append(lines)
+        else:
+            return header + list(chain(*full_options)) + footer, RenderLevel.full
+
+        level = RenderLevel.shortened
+    else:
+        level = RenderLevel.summarized
+
+    # Summarize all options after the last one, that still fits.
+    footer = get_footer_lines(session, poll, context, remaining_votes=False)
+    summarized_options = [
+        get_option_lines(session, poll, option, index, context, True)
+        for index, option in enumerate(options)
+    ]
+    cut = len(full_options)
+    remaining = (
+        TEXT_BUDGET
+        - get_length(header)
+        - get_length(footer)
+        - sum(get_length(lines) for lines in full_options)
+        - sum(get_length(lines) for lines in summarized_options[cut:])
+    )
+    while remaining < 0 and cut > 0:
+        cut -= 1
+        remaining += get_length(full_options[cut])
+        remaining -= get_length(summarized_options[cut])
+
+    if remaining < 0:
+        return [], RenderLevel.too_long
+
+    lines = header
+    lines += chain(*full_options[:cut], *summarized_options[cut:])
+    lines += footer
+
+    return lines, level
+
+
+def get_length(lines: list[str]) -> int:
+    """The length of some lines of a text, including their line breaks."""
+    return sum(len(line) for line in lines) + len(lines)
+
+
 def compile_poll_text(
     session: scoped_session, poll: Poll, summarize: bool = False
 ) -> list[str]:
-    """Create the text of the poll."""
+    """Create the text of the poll.
+
+    The text is cached by the render version of the poll.
+    """
+    # Flush pending changes, otherwise the poll's version might be outdated.
+    session.flush()
+
+    key = get_render_key(poll, f"lines:{summarize}")
+    lines = render_cache.get(session, key)
+    if lines is None:
+        lines = render_poll_text(session, poll, summarize)
+        render_cache.set(session, key, lines)
+
+    return list(lines)
+
+
+def render_poll_text(
+    session: scoped_session, poll: Poll, summarize: bool = False
+) -> list[str]:
+    """Actually render the text of the poll."""
     context = Context(session, poll)
 
+    lines = get_header_lines(poll, context)
+    lines += get_option_information(session, poll, context, summarize)
+    lines += get_footer_lines(session, poll, context, remaining_votes=not summarize)
+
+    return lines
+
+
+def get_header_lines(poll: Poll, context: Context) -> list[str]:
+    """Get the name, description and anonymity information of the poll."""
     # Name and description
     lines = []
     lines.append(f"✉️ *{poll.name}*")
@@ -89,8 +223,14 @@ def compile_poll_text(
         not_visible = i18n.t("poll.results_not_visible", locale=poll.locale)
         lines.append(f"_{not_visible}_")
 
-    lines += get_option_information(session, poll, context, summarize)
-    lines.append("")
+    return lines
+
+
+def get_footer_lines(
+    session: scoped_session, poll: Poll, context: Context, remaining_votes: bool
+) -> list[str]:
+    """Get the vote information, due date and state of the poll."""
+    lines = [""]
 
     if context.limited_votes:
         lines.append(
@@ -102,14 +242,16 @@ def compile_poll_text(
     if information_line is not None:
         lines.append(information_line)
 
+    if context.priority_result is not None:
+        lines += get_priority_result_lines(poll, context)
+
     if (
         context.show_results
         and not context.anonymous
         and context.limited_votes
-        and not summarize
+        and remaining_votes
     ):
-        remaining_votes = get_remaining_votes_lines(session, poll)
-        lines += remaining_votes
+        lines += get_remaining_votes_lines(session, poll)
 
     if poll.due_date is not None:
         lines.append(
@@ -12,9 +12,11 @@ from pollbot.exceptions import RollbackException
 from pollbot.i18n import i18n
 from pollbot.models import Option, Poll
 from pollbot.poll.helper import poll_allows_cumulative_votes
+from pollbot.poll.loading import load_option_votes
 from pollbot.poll.option import calculate_percentage, get_sorted_options
 from pollbot.telegram.keyboard.creation import get_options_entered_keyboard
 
+from .snapshot import get_snapshot, option_snapshots, set_snapshot
 from .vote import get_doodle_vote_lines, get_vote_lines
 
 
@@ -55,30 +57,94 @@ def get_option_information(
 
     # All options with their respective people percentage
     for index, option in enumerate(options):
-        lines.append("")
-        lines.append(get_option_line(session, option, index))
-        if option.description is not None:
-            lines.append(f"┆ _{option.description}_")
-
-        if context.show_results and context.show_percentage:
-            lines.append(get_percentage_line(option, context))
-
-        # Add the names of the voters to the respective options
-        if (
-            context.show_results
-            and not context.anonymous
-            and len(option.votes) > 0
-            and not poll.is_priority()
-        ):
-            # Sort the votes accordingly to the poll's settings
-            if poll.poll_type == PollType.doodle.name:
-                lines += get_doodle_vote_lines(poll, option, summarize)
-            else:
-                lines += get_vote_lines(poll, option, summarize)
+        lines += get_option_lines(session, poll, option, index, context, summarize)
 
     return lines
 
 
+def get_option_lines(
+    session: scoped_session,
+    poll: Poll,
+    option: Option,
+    index: int,
+    context: Context,
+    summarize: bool,
+) -> list[str]:
+    """Get all lines of a single option."""
+    lines = [""]
+    lines.append(get_option_line(session, option, index))
+    if option.description is not None:
+        lines.append(f"┆ _{option.description}_")
+
+    if context.show_results and context.show_percentage:
+        lines.append(get_percentage_line(option, context))
+
+    # Add the names of the voters to the respective options
+    if shows_voters(poll, option, context):
+        lines += get_option_vote_lines(session, poll, option, summarize)
+
+    return lines
+
+
+def shows_voters(poll: Poll, option: Option, context: Context) -> bool:
+    """Check whether the names of the voters are listed below an option."""
+    return (
+        context.show_results
+        and not context.anonymous
+        and option.voter_count > 0
+        and not poll.is_priority()
+    )
+
+
+def get_option_vote_lines(
+    session: scoped_session, poll: Poll, option: Option, summarize: bool
+) -> list[str]:
+    """Get the vote lines of an option.
+
+    The lines are cached by the render version of the option.
+    Thereby only the lines of options, whose votes changed, have to be rebuilt.
+    """
+    key = get_option_snapshot_key(poll, option, summarize)
+    lines = get_snapshot(session, option_snapshots, key)
+    if lines is None:
+        # The lines of the other options are most likely missing as well.
+        # Load the votes of all of them at once, instead of one query per option.
+        missing = [
+            other
+            for other in poll.options
+            if other is not option
+            and other.voter_count > 0
+            and get_snapshot(
+                session,
+                option_snapshots,
+                get_option_snapshot_key(poll, other, summarize),
+            )
+            is None
+        ]
+        load_option_votes(session, [option, *missing])
+        # Sort the votes accordingly to the poll's settings
+        if poll.poll_type == PollType.doodle.name:
+            lines = get_doodle_vote_lines(poll, option, summarize)
+        else:
+            lines = get_vote_lines(poll, option, summarize)
+        lines = tuple(lines)
+        set_snapshot(session, option_snapshots, key, lines)
+
+    return list(lines)
+
+
+def get_option_snapshot_key(poll: Poll, option: Option, summarize: bool) -> tuple:
+    """The key of the cached vote lines of an option."""
+    return (
+        option.id,
+        option.version,
+        poll.poll_type,
+        poll.user_sorting,
+        poll.locale,
+        summarize,
+    )
+
+
 def get_option_line(session: scoped_session, option: Option, index: int) -> str:
     """Get the line with vote count for this option."""
     # Special formating for polls with European date format
@@ -90,15 +156,15 @@ def get_option_line(session: scoped_session, option: Option, index: int) -> str:
         prefix = f"{indices[index]}) "
 
     if (
-        len(option.votes) > 0
+        option.voter_count > 0
         and option.poll.should_show_result()
         and option.poll.show_option_votes
         and not option.poll.is_priority()
     ):
         if poll_allows_cumulative_votes(option.poll):
-            vote_count = sum([vote.vote_count for vote in option.votes])
+            vote_count = option.vote_sum
         else:
-            vote_count = len(option.votes)
+            vote_count = option.voter_count
         return f"┌ {prefix}*{option_name}* ({vote_count} votes)"
     else:
         return f"┌ {prefix}*{option_name}*"
@@ -108,7 +174,7 @@ def get_percentage_line(option: Option, context: Context) -> str:
     """Get the percentage line for each option."""
 
     poll = option.poll
-    if len(option.votes) == 0 or poll.anonymous or poll.is_priority():
+    if option.voter_count == 0 or poll.anonymous or poll.is_priority():
         line = "└ "
     else:
         line = "│ "
@@ -120,8 +186,9 @@ def get_percentage_line(option: Option, context: Context) -> str:
         line += (10 - filled_slots) * "▭"
         line += f" ({round(percentage)}%)"
     else:
-        option_count = len(poll.options)
-        points = sum([option_count - vote.priority for vote in option.votes])
+        points = 0
+        if context.priority_result is not None:
+            points = context.priority_result.points.get(option.id, 0)
         line += f" {points} Points"
 
     return "".join(line)
@@ -0,0 +1,143 @@
+"""Render cache for poll texts, vote keyboards and summarization decisions.
+
+All entries are keyed by the poll's id and render version.
+Entries thereby never have to be invalidated, they simply aren't requested anymore.
+
+There are two backends:
+- `memory` keeps the entries in an LRU cache of the current process.
+- `postgres` stores the entries in an unlogged table, which is shared by all processes.
+    This way replicas share the work of rendering a viral poll.
+    The table is always accessed via the primary engine in its own short transactions.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.config import config
+from pollbot.db import engine as primary_engine
+from pollbot.display.poll.snapshot import get_snapshot, set_snapshot
+from pollbot.helper.cache import LRUCache
+from pollbot.models import Poll, RenderCacheEntry
+
+
+def get_render_key(poll: Poll, variant: str) -> str:
+    """Get the cache key for a specific rendering of a poll.
+
+    Make sure, that there are no pending changes for this poll.
+    Otherwise the poll's version might be outdated.
+    """
+    return f"{poll.id}:{poll.version}:{variant}"
+
+
+class MemoryRenderCache:
+    """Keep rendered polls in an in-process LRU cache."""
+
+    def __init__(self, max_size: int) -> None:
+        """Contructor."""
+        self.cache = LRUCache(max_size)
+
+    def get(self, session: scoped_session, key: str) -> Any:
+        """Get a cached entry."""
+        return get_snapshot(session, self.cache, key)
+
+    def set(self, session: scoped_session, key: str, value: Any) -> None:
+        """Cache an entry."""
+        set_snapshot(session, self.cache, key, value)
+
+    def purge(self, session: scoped_session) -> None:
+        """Nothing to do, the LRU cache evicts old entries by itself."""
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.cache.clear()
+
+
+class PostgresRenderStore:
+    """Access the unlogged cache table in short transactions of its own.
+
+    The primary engine is used, since unlogged tables aren't replicated.
+    Failing cache operations are logged and treated like a cache miss.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        """Contructor."""
+        self.engine = engine
+
+    def get(self, key: str) -> Any:
+        """Get a cached entry."""
+        try:
+            with self.engine.connect() as connection:
+                return connection.execute(
+                    select(RenderCacheEntry.value).where(RenderCacheEntry.key == key)
+                ).scalar()
+        except SQLAlchemyError as e:
+            logging.warning(f"Failed to read the render cache: {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Cache an entry. Another process might have been faster, which is fine."""
+        statement = (
+            insert(RenderCacheEntry.__table__)
+            .values(key=key, value=value)
+            .on_conflict_do_nothing(index_elements=["key"])
+        )
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(statement)
+        except SQLAlchemyError as e:
+            logging.warning(f"Failed to write the render cache: {e}")
+
+
+class PostgresRenderCache:
+    """Share rendered polls between processes via an unlogged table.
+
+    The table isn't accessed through the session of the render, which might belong
+    to a read replica. A failing cache write can't abort the caller's transaction either.
+    Entries of transactions, that increased any version, are written after the commit.
+    """
+
+    def __init__(self, max_age: int, engine: Engine = primary_engine) -> None:
+        """Contructor."""
+        self.max_age = max_age
+        self.store = PostgresRenderStore(engine)
+
+    def get(self, session: scoped_session, key: str) -> Any:
+        """Get a cached entry."""
+        return get_snapshot(session, self.store, key)
+
+    def set(self, session: scoped_session, key: str, value: Any) -> None:
+        """Cache an entry, or remember it until the transaction has been committed."""
+        set_snapshot(session, self.store, key, value)
+
+    def purge(self, session: scoped_session) -> None:
+        """Remove all entries that are older than `max_age` seconds."""
+        threshold = datetime.now() - timedelta(seconds=self.max_age)
+        with self.store.engine.begin() as connection:
+            connection.execute(
+                delete(RenderCacheEntry.__table__).where(
+                    RenderCacheEntry.created_at < threshold
+                )
+            )
+
+    def clear(self) -> None:
+        """Nothing to do, entries of old versions are purged by the cleanup job."""
+
+
+def get_render_cache() -> MemoryRenderCache | PostgresRenderCache:
+    """Create the render cache backend, that's configured in the config."""
+    backend = config["cache"]["backend"]
+    if backend == "memory":
+        return MemoryRenderCache(config["cache"]["max_size"])
+    elif backend == "postgres":
+        return PostgresRenderCache(config["cache"]["max_age"])
+
+    raise Exception(f"Unknown render cache backend: {backend}")
+
+
+render_cache = get_render_cache()
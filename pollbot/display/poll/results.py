@@ -0,0 +1,392 @@
+"""Paginated results of a poll.
+
+Huge polls can have tens of thousands of votes, which is way too much for
+a single message. The results are thereby shown page by page.
+
+A page is rendered by walking through all options and their votes in display order.
+The votes are streamed from a server-side cursor, so only a single page is
+held in memory, no matter how big the poll is.
+The position in this walk is described by a keyset cursor
+`(option id, vote id, user id, doodle answer)`. The votes are compared by
+the sort values in the cursor, so the cursor stays valid, even if its vote
+has been removed in the meantime. A vote id of `0` points to the header of the option.
+
+The pages of archived polls are stored in their archive.
+Those pages are addressed by their index instead, e.g. `(2, 0)`.
+"""
+from collections.abc import Iterator
+
+from sqlalchemy import case, literal, select, tuple_
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.display.poll import Context
+from pollbot.enums import PollType, UserSorting, VoteResultType
+from pollbot.i18n import i18n
+from pollbot.models import Option, Poll, PollArchive, User, Vote
+from pollbot.poll.archive import get_archive
+from pollbot.poll.helper import poll_allows_cumulative_votes
+from pollbot.poll.option import get_sorted_options
+
+from .compilation import get_footer_lines, get_header_lines
+from .option import get_option_line, get_percentage_line
+
+# Leave some space for the header and footer of the poll
+PAGE_CHARACTERS = 3000
+
+# The amount of votes that are fetched from the database at once
+STREAM_BATCH_SIZE = 200
+
+# Doodle votes are grouped by their answer in this order
+DOODLE_ANSWER_ORDER = {
+    VoteResultType.yes.name: 0,
+    VoteResultType.maybe.name: 1,
+    VoteResultType.no.name: 2,
+}
+
+
+class ResultsPage:
+    """A single page of poll results."""
+
+    def __init__(
+        self,
+        lines: list[str],
+        first_cursor: tuple[int, ...] | None,
+        last_cursor: tuple[int, ...] | None,
+        has_previous: bool,
+        has_next: bool,
+    ) -> None:
+        """Contructor."""
+        self.lines = lines
+        self.first_cursor = first_cursor
+        self.last_cursor = last_cursor
+        self.has_previous = has_previous
+        self.has_next = has_next
+
+
+def get_results_page(
+    session: scoped_session,
+    poll: Poll,
+    cursor: tuple[int, ...] | None = None,
+    forward: bool = True,
+) -> ResultsPage:
+    """Render the page after (or before, if not `forward`) the cursor.
+
+    Without a cursor, the first page is rendered.
+    """
+    archive = get_archive(session, poll)
+    if archive is not None:
+        return get_archived_results_page(archive, cursor, forward)
+
+    context = Context(session, poll)
+    options = get_sorted_options(poll, context.total_user_count)
+
+    # The option of the cursor has been removed, start from the beginning
+    if cursor is not None and cursor[0] not in [option.id for option in options]:
+        cursor = None
+        forward = True
+    show_votes = (
+        context.show_results and not context.anonymous and not poll.is_priority()
+    )
+
+    entries = iterate_entries(session, poll, options, cursor, forward, show_votes)
+
+    page = []
+    characters = 0
+    has_more = False
+    for entry in entries:
+        lines = get_entry_lines(poll, options, context, *entry)
+        entry_characters = sum(len(line) + 1 for line in lines)
+        # Always show at least a single entry
+        if page and characters + entry_characters > PAGE_CHARACTERS:
+            has_more = True
+            break
+
+        page.append((get_cursor(entry), lines))
+        characters += entry_characters
+
+    # Close the server-side cursor
+    entries.close()
+
+    if not forward:
+        page.reverse()
+
+    if forward:
+        has_previous = cursor is not None
+        has_next = has_more
+    else:
+        has_previous = has_more
+        has_next = True
+
+    lines = []
+    if not has_previous:
+        lines += get_header_lines(poll, context)
+    for _, entry_lines in page:
+        lines += entry_lines
+    if not has_next:
+        lines += get_footer_lines(session, poll, context, remaining_votes=False)
+
+    first_cursor = page[0][0] if page else None
+    last_cursor = page[-1][0] if page else None
+
+    return ResultsPage(lines, first_cursor, last_cursor, has_previous, has_next)
+
+
+def get_all_results_pages(session: scoped_session, poll: Poll) -> list[list[str]]:
+    """Render the lines of all result pages, e.g. for the archive."""
+    page = get_results_page(session, poll)
+    pages = [page.lines]
+    while page.has_next:
+        page = get_results_page(session, poll, page.last_cursor)
+        pages.append(page.lines)
+
+    return pages
+
+
+def get_archived_results_page(
+    archive: PollArchive,
+    cursor: tuple[int, ...] | None,
+    forward: bool,
+) -> ResultsPage:
+    """Get the page after (or before) the cursor from the archive.
+
+    Cursors of messages, that have been sent before the poll was archived,
+    start from the first page.
+    """
+    index = 0
+    if cursor is not None:
+        index = cursor[0] + 1 if forward else cursor[0] - 1
+        if cursor[1] != 0 or not 0 <= index < len(archive.pages):
+            index = 0
+
+    cursor = (index, 0)
+    has_next = index < len(archive.pages) - 1
+    return ResultsPage(archive.pages[index], cursor, cursor, index > 0, has_next)
+
+
+def get_cursor(entry: tuple[Option, Vote | None, bool, bool]) -> tuple[int, ...]:
+    """Get the keyset cursor of an entry."""
+    option, vote, _, _ = entry
+    if vote is None:
+        return (option.id, 0)
+
+    return (option.id, vote.id, vote.user_id, get_doodle_answer(vote))
+
+
+def get_doodle_answer(vote: Vote) -> int:
+    """Get the position of the vote's answer in the doodle display order."""
+    return DOODLE_ANSWER_ORDER.get(vote.type, len(DOODLE_ANSWER_ORDER))
+
+
+def get_entry_lines(
+    poll: Poll,
+    options: list[Option],
+    context: Context,
+    option: Option,
+    vote: Vote | None,
+    is_last: bool,
+    starts_answer: bool,
+) -> list[str]:
+    """Get the lines of a single option header or vote.
+
+    Doodle votes are grouped by their answer, just like in the poll itself.
+    """
+    if vote is None:
+        lines = ["", get_option_line(None, option, options.index(option))]
+        if option.description is not None:
+            lines.append(f"┆ _{option.description}_")
+        if context.show_results and context.show_percentage:
+            lines.append(get_percentage_line(option, context))
+
+        return lines
+
+    user_mention = f"[{vote.user.name}](tg://user?id={vote.user.id})"
+    if poll.poll_type == PollType.doodle.name:
+        lines = []
+        if starts_answer:
+            lines.append(i18n.t(f"poll.doodle.{vote.type}", locale=poll.locale))
+        lines.append(f"└ {user_mention}" if is_last else f"┆ {user_mention}")
+
+        return lines
+
+    line = f"└ {user_mention}" if is_last else f"├ {user_mention}"
+    if poll_allows_cumulative_votes(poll):
+        line += f" ({vote.vote_count} votes)"
+
+    return [line]
+
+
+def iterate_entries(
+    session: scoped_session,
+    poll: Poll,
+    options: list[Option],
+    cursor: tuple[int, ...] | None,
+    forward: bool,
+    show_votes: bool,
+) -> Iterator[tuple[Option, Vote | None, bool, bool]]:
+    """Walk through option headers and votes, starting at the cursor (exclusive).
+
+    Yields tuples of `(option, vote, is_last_vote_of_option, starts_doodle_answer)`.
+    The vote is `None` for option headers.
+    """
+    start = 0
+    cursor_values = None
+    if cursor is not None:
+        positions = [option.id for option in options]
+        start = positions.index(cursor[0])
+        if cursor[1] != 0:
+            cursor_values = get_cursor_sort_values(session, poll, cursor)
+
+    if forward:
+        for position in range(start, len(options)):
+            option = options[position]
+            at_cursor = cursor is not None and position == start
+            if not at_cursor:
+                yield option, None, False, False
+
+            if not show_votes:
+                continue
+
+            after = cursor_values if at_cursor else None
+            answer = cursor[3] if at_cursor and len(cursor) > 3 else None
+            # Look ahead a single vote, to know whether a vote is the last one
+            previous = None
+            starts_answer = False
+            for vote in stream_votes(session, poll, option, after, forward=True):
+                if previous is not None:
+                    yield option, previous, False, starts_answer
+                starts_answer = get_doodle_answer(vote) != answer
+                answer = get_doodle_answer(vote)
+                previous = vote
+            if previous is not None:
+                yield option, previous, True, starts_answer
+
+    elif cursor is not None:
+        for position in range(start, -1, -1):
+            option = options[position]
+            at_cursor = position == start
+            # Nothing of this option comes before its header
+            if at_cursor and cursor[1] == 0:
+                continue
+
+            if show_votes:
+                before = cursor_values if at_cursor else None
+                # The last vote of the cursor's option comes after the cursor
+                is_last = not at_cursor
+                # Look ahead a single vote, to know whether a vote starts an answer
+                previous = None
+                previous_is_last = False
+                for vote in stream_votes(session, poll, option, before, forward=False):
+                    if previous is not None:
+                        starts_answer = get_doodle_answer(vote) != get_doodle_answer(
+                            previous
+                        )
+                        yield option, previous, previous_is_last, starts_answer
+                    previous, previous_is_last = vote, is_last
+                    is_last = False
+                if previous is not None:
+                    yield option, previous, previous_is_last, True
+
+            yield option, None, False, False
+
+
+def get_cursor_sort_values(
+    session: scoped_session, poll: Poll, cursor: tuple[int, ...]
+) -> list | None:
+    """Get the values of the sort keys at the position of a vote cursor.
+
+    If the voter of the cursor is gone, their name is unknown. Only the doodle answer
+    is returned then, the page continues at the start of the cursor's answer.
+    """
+    if len(cursor) < 4:
+        # Cursors of old messages only contain the vote id
+        vote = session.query(Vote).get(cursor[1])
+        if vote is None:
+            return None
+
+        return get_vote_sort_values(poll, vote)
+
+    _, vote_id, user_id, answer = cursor
+    values = []
+    if poll.poll_type == PollType.doodle.name:
+        values.append(answer)
+
+    if poll.user_sorting == UserSorting.name.name:
+        name = session.execute(select(User.name).where(User.id == user_id)).scalar()
+        if name is None:
+            return values or None
+        values.append(name)
+    values.append(vote_id)
+
+    return values
+
+
+def get_vote_sort_keys(poll: Poll) -> list:
+    """Get the columns, by which the votes of an option are displayed."""
+    keys = []
+    if poll.poll_type == PollType.doodle.name:
+        # Group doodle votes by their answer
+        keys.append(
+            case(DOODLE_ANSWER_ORDER, value=Vote.type, else_=len(DOODLE_ANSWER_ORDER))
+        )
+
+    if poll.user_sorting == UserSorting.name.name:
+        keys.append(User.name)
+    keys.append(Vote.id)
+
+    return keys
+
+
+def get_vote_sort_values(poll: Poll, vote: Vote) -> list:
+    """Get the values of the sort keys for a single vote."""
+    values = []
+    if poll.poll_type == PollType.doodle.name:
+        values.append(DOODLE_ANSWER_ORDER.get(vote.type, len(DOODLE_ANSWER_ORDER)))
+
+    if poll.user_sorting == UserSorting.name.name:
+        values.append(vote.user.name)
+    values.append(vote.id)
+
+    return values
+
+
+def stream_votes(
+    session: scoped_session,
+    poll: Poll,
+    option: Option,
+    cursor_values: list | None,
+    forward: bool,
+) -> Iterator[Vote]:
+    """Stream the votes of an option in display order from a server-side cursor.
+
+    Only votes after (or before) the given sort values are streamed.
+    If only some of the leading sort values are given, votes with equal values
+    are streamed as well.
+    """
+    keys = get_vote_sort_keys(poll)
+    statement = (
+        select(Vote)
+        .join(Vote.user)
+        .options(contains_eager(Vote.user))
+        .where(Vote.poll_id == option.poll_id)
+        .where(Vote.option_id == option.id)
+    )
+
+    if cursor_values is not None:
+        keyset = tuple_(*keys[: len(cursor_values)])
+        values = tuple_(*[literal(value) for value in cursor_values])
+        if len(cursor_values) < len(keys):
+            condition = keyset >= values if forward else keyset <= values
+        else:
+            condition = keyset > values if forward else keyset < values
+        statement = statement.where(condition)
+
+    if not forward:
+        keys = [key.desc() for key in keys]
+
+    statement = statement.order_by(*keys).execution_options(yield_per=STREAM_BATCH_SIZE)
+    result = session.execute(statement)
+    try:
+        yield from result.scalars()
+    finally:
+        result.close()
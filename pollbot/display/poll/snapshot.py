@@ -0,0 +1,57 @@
+"""In-process cache for rendered poll snapshots.
+
+Snapshots are keyed by the render versions of polls and options.
+A new vote thereby only invalidates the snapshots of the whole poll and
+the vote lines of the option that has been voted on.
+
+Snapshots that are rendered in a transaction, which increased any version,
+are only published after a successful commit.
+Otherwise a rolled back transaction could leave wrong snapshots in the cache.
+"""
+from collections.abc import Hashable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from pollbot.helper.cache import LRUCache
+
+# The vote lines of a single option
+option_snapshots = LRUCache(max_size=50000)
+
+
+def get_snapshot(session: Session, cache: LRUCache, key: Hashable) -> Any:
+    """Get a snapshot, including snapshots that haven't been published yet."""
+    pending = session.info.get("pending_snapshots")
+    if pending is not None and (id(cache), key) in pending:
+        return pending[(id(cache), key)][1]
+
+    return cache.get(key)
+
+
+def set_snapshot(session: Session, cache: LRUCache, key: Hashable, value: Any) -> None:
+    """Store a snapshot, or remember it until the transaction has been committed."""
+    if session.info.get("render_versions_changed"):
+        pending = session.info.setdefault("pending_snapshots", {})
+        pending[(id(cache), key)] = (cache, value)
+    else:
+        cache.set(key, value)
+
+
+def clear_snapshots() -> None:
+    """Remove all snapshots."""
+    option_snapshots.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def publish_snapshots(session: Session) -> None:
+    """The versions of the snapshots are now visible for everybody."""
+    pending = session.info.pop("pending_snapshots", {})
+    for (_, key), (cache, value) in pending.items():
+        cache.set(key, value)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_snapshots(session: Session, _) -> None:
+    """The versions of the snapshots have never existed."""
+    session.info.pop("pending_snapshots", None)
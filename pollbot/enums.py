@@ -136,6 +136,7 @@ class CallbackType(Enum):
     external_cancel = 104
 
     show_option_name = 110
+    show_results_page = 111
 
     switch_help = 120
 
@@ -192,6 +193,15 @@ class CallbackType(Enum):
     pick_due_date = 510
 
 
+@unique
+class CallbackEntity(Enum):
+    """The type of entity, that's referenced by the payload of a callback."""
+
+    none = "n"
+    poll = "p"
+    option = "o"
+
+
 @unique
 class CallbackResult(Enum):
     """A class representing callback results."""
@@ -238,3 +248,17 @@ class DatepickerContext(Enum):
     external_add_option = 2
 
     due_date = 10
+
+
+@unique
+class RenderLevel(Enum):
+    """How much a poll text had to be shortened to fit into a single message."""
+
+    # All voters are listed
+    full = 0
+    # All options are summarized, since the poll is configured that way
+    summarized = 1
+    # Options were summarized, from the first one on that didn't fit anymore
+    shortened = 2
+    # Even the summarized text doesn't fit
+    too_long = 3
@@ -0,0 +1,58 @@
+"""A small thread-safe in-process cache."""
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from threading import Lock
+from typing import Any
+
+
+class LRUCache:
+    """Least recently used cache with an optional time to live for entries.
+
+    The bot handles updates in multiple threads, which is why every access
+    is guarded by a lock.
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None) -> None:
+        """Contructor."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        """Return the amount of cached entries."""
+        return len(self.entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an entry and mark it as recently used."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+
+            created_at, value = entry
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                del self.entries[key]
+                return default
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add an entry and evict the least recently used ones, if necessary."""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry, if it exists."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,98 @@
+"""A thread pool, that serializes tasks with the same key."""
+import logging
+from collections import deque
+from collections.abc import Callable, Hashable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Lock
+from typing import Any
+
+
+class KeyedTask:
+    """A task and the keys it has to hold while it's running."""
+
+    def __init__(
+        self, keys: tuple[Hashable, ...], func: Callable, args: tuple, kwargs: dict
+    ) -> None:
+        """Contructor."""
+        self.keys = keys
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+class KeyedExecutor:
+    """Run tasks on a thread pool, but never two tasks with a common key at once.
+
+    Tasks that share a key run strictly in the order they have been submitted.
+    Tasks without a common key run in parallel.
+
+    Each task waits in one queue per key and is started, once it's the first
+    task in all of them. Since tasks are enqueued atomically, the oldest pending
+    task is always first in all of its queues, so there are no deadlocks.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """Contructor."""
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="keyed"
+        )
+        self.queues: dict[Hashable, deque[KeyedTask]] = {}
+        self.lock = Lock()
+        self.idle = Condition(self.lock)
+
+    def submit(
+        self, keys: Iterable[Hashable], func: Callable, *args: Any, **kwargs: Any
+    ) -> None:
+        """Schedule a function call, after all earlier tasks with one of the keys."""
+        task = KeyedTask(tuple(dict.fromkeys(keys)), func, args, kwargs)
+        with self.lock:
+            for key in task.keys:
+                self.queues.setdefault(key, deque()).append(task)
+
+            runnable = self.is_runnable(task)
+
+        if runnable:
+            self.pool.submit(self.run, task)
+
+    def pending(self) -> int:
+        """Get the amount of keys with pending or running tasks."""
+        with self.lock:
+            return len(self.queues)
+
+    def shutdown(self) -> None:
+        """Wait for all pending tasks and stop the worker threads."""
+        with self.lock:
+            while self.queues:
+                self.idle.wait()
+
+        self.pool.shutdown(wait=True)
+
+    def is_runnable(self, task: KeyedTask) -> bool:
+        """Check whether a task is the first one in all of its queues.
+
+        Must be called while holding the lock.
+        """
+        return all(self.queues[key][0] is task for key in task.keys)
+
+    def run(self, task: KeyedTask) -> None:
+        """Run a task and start the tasks, that have been waiting for it."""
+        try:
+            task.func(*task.args, **task.kwargs)
+        except Exception:
+            logging.exception("Task of the keyed executor failed")
+        finally:
+            runnable = []
+            with self.lock:
+                for key in task.keys:
+                    queue = self.queues[key]
+                    queue.popleft()
+                    if not queue:
+                        del self.queues[key]
+                    elif self.is_runnable(queue[0]) and queue[0] not in runnable:
+                        runnable.append(queue[0])
+
+                if not self.queues:
+                    self.idle.notify_all()
+
+            for next_task in runnable:
+                self.pool.submit(self.run, next_task)
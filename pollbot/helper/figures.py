@@ -0,0 +1,51 @@
+"""Rendering of the admin plots.
+
+The plots are rendered in a separate process, which only imports this module.
+matplotlib, numpy and pandas are thereby never imported by the bot itself.
+"""
+import io
+import math
+
+
+def get_magnitude(value):
+    if value == 0:
+        return 0
+    return int(math.floor(math.log10(abs(value))))
+
+
+def render_plot(rows: list[tuple], value_column: str, kind: str) -> bytes:
+    """Plot rows of (type, date, value) with one graph per type as png."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import numpy as np
+    import pandas
+    from matplotlib import dates as mdates
+    from matplotlib import pyplot as plt
+
+    # Grid style
+    plt.style.use("seaborn-v0_8-whitegrid")
+
+    # Combine the results in a single dataframe and name the columns
+    dataframe = pandas.DataFrame(rows, columns=["type", "date", value_column])
+
+    months = mdates.MonthLocator()  # every month
+    months_fmt = mdates.DateFormatter("%Y-%m")
+
+    max_value = max((row[2] for row in rows), default=0)
+    magnitude = get_magnitude(max_value)
+
+    # Plot each result set
+    fig, ax = plt.subplots(figsize=(30, 15), dpi=120)
+    for key, group in dataframe.groupby("type"):
+        ax = group.plot(ax=ax, kind=kind, x="date", y=value_column, label=key)
+        ax.xaxis.set_major_locator(months)
+        ax.xaxis.set_major_formatter(months_fmt)
+        ax.yaxis.set_ticks(np.arange(0, max_value, math.pow(10, magnitude - 1)))
+
+    io_buffer = io.BytesIO()
+    fig.savefig(io_buffer, format="png")
+    plt.close(fig)
+
+    return io_buffer.getvalue()
@@ -0,0 +1,83 @@
+"""Leader election via Postgres advisory locks.
+
+The jobs must only run in a single process, even if multiple instances of the bot
+or dedicated job runners (`main.py worker`) are running at the same time.
+Only the process, that holds the advisory lock of the jobs, runs them.
+
+Session level advisory locks belong to a connection. The lock is thereby released
+as soon as the leader dies or loses its connection, and another process takes over
+on the next run of its jobs.
+"""
+import logging
+from threading import Lock
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from pollbot.db import engine
+
+# An arbitrary, but fixed id. It must not be used by any other advisory lock.
+JOB_LOCK_ID = 74_201_001
+
+
+class LeaderLock:
+    """A lock, that is held by a single process across all replicas."""
+
+    def __init__(self, engine: Engine, lock_id: int) -> None:
+        """Contructor."""
+        self.engine = engine
+        self.lock_id = lock_id
+        self.connection: Connection | None = None
+        self.lock = Lock()
+
+    def is_leader(self) -> bool:
+        """Check, whether this process holds the lock and try to acquire it otherwise."""
+        with self.lock:
+            try:
+                if self.connection is None:
+                    return self.acquire()
+
+                # The lock is only held as long as its connection is alive
+                self.connection.execute(text("SELECT 1"))
+                return True
+            except DBAPIError as e:
+                logging.warning(f"Lost advisory lock {self.lock_id}: {e}")
+                if self.connection is not None:
+                    self.connection.invalidate()
+                    self.connection.close()
+                    self.connection = None
+
+                return False
+
+    def acquire(self) -> bool:
+        """Try to acquire the lock without waiting."""
+        # The connection is kept open, so it must not idle in a transaction.
+        connection = self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+        ).scalar()
+        if not acquired:
+            connection.close()
+            return False
+
+        logging.info(f"Acquired advisory lock {self.lock_id}")
+        self.connection = connection
+        return True
+
+    def release(self) -> None:
+        """Release the lock, so another process can take over immediately."""
+        with self.lock:
+            if self.connection is None:
+                return
+
+            self.connection.execute(
+                text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id}
+            )
+            self.connection.close()
+            self.connection = None
+
+
+job_leader = LeaderLock(engine, JOB_LOCK_ID)
@@ -1,183 +1,100 @@
-"""Module responsibel for plotting statistics."""
-import io
-import math
+"""Module responsibel for plotting statistics.
 
-import matplotlib
-import numpy as np
-import pandas
-from matplotlib import dates as mdates
-from matplotlib import pyplot as plt
-from sqlalchemy import Date, Integer, cast, func
+The plots only read the small daily rollup and statistic tables.
+Rendering takes a few seconds of cpu time, which is why it happens in a separate
+process. Rendered plots are cached until the end of the day, since the rollups
+only change once per day.
+"""
+import io
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from threading import Lock
 
-from pollbot.models import DailyStatistic, User, Vote
+from sqlalchemy import func
 
-matplotlib.use("Agg")
+from pollbot.helper.figures import render_plot
+from pollbot.models import DailyRollup, DailyStatistic
+from pollbot.sentry import sentry
 
+# Plot name -> The day the plot has been rendered and the png
+plot_cache: dict[str, tuple[date, bytes]] = {}
 
-def send_plots(session, chat):
-    """Generate and send plots to the user."""
-    image = get_user_activity(session)
-    chat.send_document(image, caption="User statistics")
-    image.close()
-
-    image = get_vote_activity(session)
-    chat.send_document(image, caption="Vote statistics")
-    image.close()
-
-    image = get_new_activity(session)
-    chat.send_document(image, caption="New statistics")
-    image.close()
-
-
-def get_magnitude(value):
-    if value == 0:
-        return 0
-    return int(math.floor(math.log10(abs(value))))
-
-
-def image_from_figure(fig):
-    """Create a pillow image from a figure."""
-    io_buffer = io.BytesIO()
-    plt.savefig(io_buffer, format="png")
-    io_buffer.seek(0)
-    plt.close(fig)
-
-    return io_buffer
-
-
-def get_user_activity(session):
-    """Create a plot showing the inline usage statistics."""
-
-    def running_window(session, subquery):
-        # Create a running window which sums all users up to this point for the current millennium ;P
-        users = (
-            session.query(
-                subquery.c.creation_date,
-                cast(
-                    func.sum(subquery.c.count).over(
-                        partition_by=func.extract(
-                            "millennium", subquery.c.creation_date
-                        ),
-                        order_by=subquery.c.creation_date.asc(),
-                    ),
-                    Integer,
-                ).label("running_total"),
-            )
-            .order_by(subquery.c.creation_date)
-            .all()
-        )
+plot_pool: ProcessPoolExecutor | None = None
+plot_pool_lock = Lock()
 
-        return users
 
-    # Grid style
-    plt.style.use("seaborn-whitegrid")
+def get_plot_pool() -> ProcessPoolExecutor:
+    """Start the plotting process on first use."""
+    global plot_pool
+    with plot_pool_lock:
+        if plot_pool is None:
+            # Don't fork the threads and connections of the bot
+            plot_pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
 
-    creation_date = func.cast(User.created_at, Date).label("creation_date")
-    # Group the started users by date
-    started_users_subquery = (
-        session.query(creation_date, func.count(User.id).label("count"))
-        .filter(User.started.is_(True))
-        .group_by(creation_date)
-        .order_by(creation_date)
-        .subquery()
-    )
-    started_users = running_window(session, started_users_subquery)
-    started_users = [("started", q[0], q[1]) for q in started_users]
+    return plot_pool
 
-    # Group the started users by date
-    all_users_subquery = (
-        session.query(creation_date, func.count(User.id).label("count"))
-        .group_by(creation_date)
-        .order_by(creation_date)
-        .subquery()
-    )
-    all_users = running_window(session, all_users_subquery)
-    all_users = [("all", q[0], q[1]) for q in all_users]
 
-    # Group the started users by date
-    voting_users_subquery = (
-        session.query(creation_date, func.count(User.id).label("count"))
-        .filter(User.votes.any())
-        .group_by(creation_date)
-        .order_by(creation_date)
-        .subquery()
-    )
-    voting_users = running_window(session, voting_users_subquery)
-    voting_users = [("voted", q[0], q[1]) for q in voting_users]
+def send_plots(session, chat):
+    """Generate and send plots to the user.
+
+    Plots, that aren't cached, are sent once they have been rendered.
+    """
+    today = date.today()
+    for name, caption, get_rows, value_column, kind in PLOTS:
+        cached = plot_cache.get(name)
+        if cached is not None and cached[0] == today:
+            send_plot(chat, name, caption, cached[1])
+            continue
+
+        future = get_plot_pool().submit(
+            render_plot, get_rows(session), value_column, kind
+        )
+        future.add_done_callback(partial(finish_plot, chat, name, caption, today))
 
-    # Group the started users by date
-    owning_users_subquery = (
-        session.query(creation_date, func.count(User.id).label("count"))
-        .filter(User.polls.any())
-        .group_by(creation_date)
-        .order_by(creation_date)
-        .subquery()
-    )
-    owning_users = running_window(session, owning_users_subquery)
-    owning_users = [("currently owning poll", q[0], q[1]) for q in owning_users]
 
-    # Combine the results in a single dataframe and name the columns
-    user_statistics = started_users + all_users + voting_users + owning_users
-    dataframe = pandas.DataFrame(user_statistics, columns=["type", "date", "users"])
+def finish_plot(chat, name: str, caption: str, day: date, future: Future) -> None:
+    """Cache and send a plot, once it has been rendered."""
+    try:
+        image = future.result()
+        plot_cache[name] = (day, image)
+        send_plot(chat, name, caption, image)
+    except Exception as e:
+        sentry.capture_exception(tags={"handler": "plot"}, exception=e)
 
-    months = mdates.MonthLocator()  # every month
-    months_fmt = mdates.DateFormatter("%Y-%m")
 
-    max_value = all_users[len(all_users) - 1][2]
-    magnitude = get_magnitude(max_value)
+def send_plot(chat, name: str, caption: str, image: bytes) -> None:
+    document = io.BytesIO(image)
+    document.name = f"{name}.png"
+    chat.send_document(document, caption=caption)
 
-    # Plot each result set
-    fig, ax = plt.subplots(figsize=(30, 15), dpi=120)
-    for key, group in dataframe.groupby(["type"]):
-        ax = group.plot(ax=ax, kind="line", x="date", y="users", label=key)
-        ax.xaxis.set_major_locator(months)
-        ax.xaxis.set_major_formatter(months_fmt)
-        ax.yaxis.set_ticks(np.arange(0, max_value, math.pow(10, magnitude - 1)))
 
-    image = image_from_figure(fig)
-    image.name = "user_statistics.png"
+def get_user_activity(session) -> list[tuple]:
+    """Get the total amount of users per day."""
+    rows = []
+    for rollup in session.query(DailyRollup).order_by(DailyRollup.date):
+        rows.append(("all", rollup.date, rollup.users))
+        rows.append(("started", rollup.date, rollup.started_users))
+        rows.append(("voted", rollup.date, rollup.voting_users))
+        rows.append(("owning poll", rollup.date, rollup.owning_users))
 
-    return image
+    return rows
 
 
-def get_vote_activity(session):
-    """Create a plot showing the inline usage statistics."""
-    creation_date = func.date_trunc("day", Vote.created_at).label("creation_date")
-    votes = (
-        session.query(creation_date, func.count(Vote.id).label("count"))
-        .group_by(creation_date)
-        .order_by(creation_date)
-        .all()
+def get_vote_activity(session) -> list[tuple]:
+    """Get the amount of new votes per day."""
+    rollups = session.query(DailyRollup.date, DailyRollup.votes).order_by(
+        DailyRollup.date
     )
-    total_votes = [("Total votes", q[0], q[1]) for q in votes]
-
-    # Grid style
-    plt.style.use("seaborn-whitegrid")
 
-    # Combine the results in a single dataframe and name the columns
-    dataframe = pandas.DataFrame(total_votes, columns=["type", "date", "votes"])
+    return [("Total votes", day, votes) for day, votes in rollups]
 
-    months = mdates.MonthLocator()  # every month
-    months_fmt = mdates.DateFormatter("%Y-%m")
 
-    max_value = max([vote[2] for vote in total_votes])
-    magnitude = get_magnitude(max_value)
-
-    # Plot each result set
-    fig, ax = plt.subplots(figsize=(30, 15), dpi=120)
-    for key, group in dataframe.groupby(["type"]):
-        ax = group.plot(ax=ax, kind="bar", x="date", y="votes", label=key)
-        ax.xaxis.set_major_locator(months)
-        ax.xaxis.set_major_formatter(months_fmt)
-        ax.yaxis.set_ticks(np.arange(0, max_value, math.pow(10, magnitude - 1)))
-
-    image = image_from_figure(fig)
-    image.name = "vote_statistics.png"
-    return image
-
-
-def get_new_activity(session):
-    """Create a plot showing new users and polls per day."""
+def get_new_activity(session) -> list[tuple]:
+    """Get the weekly average of new users and polls per day."""
     creation_date = func.date_trunc("week", DailyStatistic.date).label("creation_date")
     stats = (
         session.query(
@@ -192,27 +109,12 @@ def get_new_activity(session):
     new_polls = [("New polls", stat[0], float(stat[1])) for stat in stats]
     new_users = [("New users", stat[0], float(stat[2])) for stat in stats]
 
-    # Grid style
-    plt.style.use("seaborn-whitegrid")
-
-    combined = new_polls + new_users
-    # Combine the results in a single dataframe and name the columns
-    dataframe = pandas.DataFrame(combined, columns=["type", "date", "count"])
-
-    months = mdates.MonthLocator()  # every month
-    months_fmt = mdates.DateFormatter("%Y-%m")
-
-    max_value = max([vote[2] for vote in combined])
-    magnitude = get_magnitude(max_value)
+    return new_polls + new_users
 
-    # Plot each result set
-    fig, ax = plt.subplots(figsize=(30, 15), dpi=120)
-    for key, group in dataframe.groupby(["type"]):
-        ax = group.plot(ax=ax, kind="line", x="date", y="count", label=key)
-        ax.xaxis.set_major_locator(months)
-        ax.xaxis.set_major_formatter(months_fmt)
-        ax.yaxis.set_ticks(np.arange(0, max_value, math.pow(10, magnitude - 1)))
 
-    image = image_from_figure(fig)
-    image.name = "new_statistics.png"
-    return image
+# Name, caption, data, value name and kind of each plot
+PLOTS = [
+    ("user_statistics", "User statistics", get_user_activity, "users", "line"),
+    ("vote_statistics", "Vote statistics", get_vote_activity, "votes", "bar"),
+    ("new_statistics", "New statistics", get_new_activity, "count", "line"),
+]
@@ -0,0 +1,102 @@
+"""Measure how long it takes to import the bot.
+
+The bot is imported in a fresh interpreter with `-X importtime`, which reports
+the import time of every single module.
+"""
+import subprocess
+import sys
+
+# Imports the bot and reports the total time and the peak memory usage afterwards
+STARTUP_SCRIPT = """
+import resource
+import time
+
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+class ImportTime:
+    """The import time of a single module in microseconds."""
+
+    def __init__(self, name: str, own: int, cumulative: int) -> None:
+        """Contructor."""
+        self.name = name
+        # Without and with the imports of the module
+        self.own = own
+        self.cumulative = cumulative
+
+
+class StartupProfile:
+    """The result of a startup profiling run."""
+
+    def __init__(self, seconds: float, max_rss: int, imports: list[ImportTime]) -> None:
+        """Contructor."""
+        self.seconds = seconds
+        # Peak resident memory in KiB
+        self.max_rss = max_rss
+        self.imports = imports
+
+    def slowest(self, count: int) -> list[ImportTime]:
+        """The modules with the highest import time, without their imports."""
+        return sorted(self.imports, key=lambda i: i.own, reverse=True)[:count]
+
+    def packages(self, count: int) -> list[tuple[str, int]]:
+        """The top level packages, that took the most time to import in total."""
+        totals: dict[str, int] = {}
+        for module in self.imports:
+            package = module.name.split(".")[0]
+            totals[package] = totals.get(package, 0) + module.own
+
+        return sorted(totals.items(), key=lambda total: total[1], reverse=True)[:count]
+
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """Parse the `-X importtime` output.
+
+    Each line looks like `import time:       123 |        456 |   package.module`.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if not own.strip().isdigit():
+            # The header line
+            continue
+
+        imports.append(ImportTime(name.strip(), int(own), int(cumulative)))
+
+    return imports
+
+
+def profile_startup(module: str = "pollbot.pollbot") -> StartupProfile:
+    """Import a module in a fresh interpreter and profile it."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            STARTUP_SCRIPT.format(module=module),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # The traceback is mixed with the import times, which are printed to stderr
+        errors = [
+            line
+            for line in result.stderr.splitlines()
+            if not line.startswith("import time:")
+        ]
+        raise Exception(f"Failed to import {module}:\n" + "\n".join(errors))
+
+    seconds, max_rss = result.stdout.split()[-2:]
+
+    return StartupProfile(
+        float(seconds), int(max_rss), parse_import_times(result.stderr)
+    )
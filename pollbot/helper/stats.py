@@ -1,8 +1,10 @@
 """Statistics handler."""
-from datetime import date
+from datetime import date, datetime, timedelta
 
+from sqlalchemy import Date, cast, distinct, func
 from sqlalchemy.orm.scoping import scoped_session
 
+from pollbot.db import read_session
 from pollbot.models.user import User
 
 
@@ -42,3 +44,137 @@ def increase_user_stat(session: scoped_session, user: User, name: str) -> None:
     session.query(UserStatistic).filter(UserStatistic.user == user).filter(
         UserStatistic.date == date.today()
     ).update({name: column + 1})
+
+
+def refresh_admin_statistic(session: scoped_session) -> None:
+    """Recalculate the admin statistics snapshot.
+
+    Every table is only scanned once. The poll counts are grouped by poll type,
+    with an additional rollup row for the totals.
+    The counts are taken from the read replica, if there is one.
+    """
+    from pollbot.models import AdminStatistic, Poll, Vote
+
+    with read_session(session) as reader:
+        users = reader.query(
+            func.count(User.id), func.count(User.id).filter(User.started.is_(True))
+        ).one()
+        users_with_votes = reader.query(func.count(distinct(Vote.user_id))).scalar()
+
+        existing = Poll.delete.is_(None)
+        polls = (
+            reader.query(
+                func.grouping(Poll.poll_type),
+                Poll.poll_type,
+                func.count(Poll.id),
+                func.count(distinct(Poll.user_id)).filter(Poll.created.is_(True)),
+                func.max(Poll.id),
+                func.count(Poll.id).filter(existing),
+                func.count(Poll.id).filter(
+                    existing, Poll.closed.is_(False), Poll.created.is_(True)
+                ),
+                func.count(Poll.id).filter(
+                    existing, Poll.closed.is_(False), Poll.created.is_(False)
+                ),
+                func.count(Poll.id).filter(existing, Poll.closed.is_(True)),
+            )
+            .group_by(func.rollup(Poll.poll_type))
+            .all()
+        )
+
+    statistic = session.query(AdminStatistic).get(1)
+    if statistic is None:
+        statistic = AdminStatistic(1)
+        session.add(statistic)
+
+    statistic.created_at = datetime.now()
+    statistic.total_users, statistic.started_users = users
+    statistic.users_with_votes = users_with_votes
+
+    statistic.poll_types = {}
+    for is_total, poll_type, count, *totals in polls:
+        if not is_total:
+            statistic.poll_types[poll_type] = count
+            continue
+
+        (
+            statistic.users_owning_polls,
+            highest_poll_id,
+            statistic.total_polls,
+            statistic.open_polls,
+            statistic.unfinished_polls,
+            statistic.closed_polls,
+        ) = totals
+        statistic.highest_poll_id = highest_poll_id or 0
+        statistic.polls_to_be_deleted = count - statistic.total_polls
+
+
+def rollup_daily_stats(session: scoped_session) -> None:
+    """Roll up all finished days, that haven't been rolled up yet.
+
+    The first run rolls up the whole history at once.
+    Users count as voting or owning polls, if they do so at the time of the rollup.
+    """
+    from pollbot.models import DailyRollup, Vote
+
+    today = date.today()
+    last = session.query(func.max(DailyRollup.date)).scalar()
+    if last is None:
+        first_user = session.query(func.min(User.created_at)).scalar()
+        if first_user is None:
+            return
+        last = first_user.date() - timedelta(days=1)
+        totals = [0, 0, 0, 0]
+    else:
+        rollup = session.query(DailyRollup).get(last)
+        totals = [
+            rollup.users,
+            rollup.started_users,
+            rollup.voting_users,
+            rollup.owning_users,
+        ]
+
+    start = last + timedelta(days=1)
+    if start >= today:
+        return
+
+    day = cast(User.created_at, Date)
+    new_users = (
+        session.query(
+            day,
+            func.count(User.id),
+            func.count(User.id).filter(User.started.is_(True)),
+            func.count(User.id).filter(User.votes.any()),
+            func.count(User.id).filter(User.polls.any()),
+        )
+        .filter(User.created_at >= start)
+        .filter(User.created_at < today)
+        .group_by(day)
+    )
+    new_users = {row[0]: row[1:] for row in new_users}
+
+    day = cast(Vote.created_at, Date)
+    votes = (
+        session.query(day, func.count(Vote.id))
+        .filter(Vote.created_at >= start)
+        .filter(Vote.created_at < today)
+        .group_by(day)
+    )
+    votes = dict(votes.all())
+
+    current = start
+    while current < today:
+        totals = [
+            total + new for total, new in zip(totals, new_users.get(current, (0,) * 4))
+        ]
+        rollup = DailyRollup(current)
+        (
+            rollup.users,
+            rollup.started_users,
+            rollup.voting_users,
+            rollup.owning_users,
+        ) = totals
+        rollup.votes = votes.get(current, 0)
+        session.add(rollup)
+
+        current += timedelta(days=1)
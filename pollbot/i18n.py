@@ -1,11 +1,43 @@
-"""Translation module."""
-import i18n
+"""Translation module.
 
-i18n.set("filename_format", "{locale}.{format}")
-i18n.set("skip_locale_root_data", True)
-i18n.set("locale", "English")
-i18n.set("fallback", "English")
-i18n.load_path.append("./i18n/")
+Translation files are compiled into flat lookup tables. Only the fallback
+locale is compiled on startup, all other locales on their first use.
+Each locale's table already contains the English fallback for missing keys,
+so a translation is a single dict lookup plus the placeholder substitution.
+
+The semantics match those of `python-i18n`, which was used previously:
+- Placeholders look like `%{name}` and unknown placeholders are left untouched.
+- Passing `count` picks the plural form of a translation, if it has any.
+- Unknown keys return the `default` keyword or the key itself.
+"""
+import os
+from pathlib import Path
+from string import Template
+from threading import Lock
+from typing import Any
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore
+
+# The translation files live next to the package, not in the working directory.
+# The location can be overwritten for deployments with a different layout.
+TRANSLATION_PATH = Path(
+    os.environ.get(
+        "POLLBOT_TRANSLATION_PATH",
+        Path(__file__).resolve().parent.parent / "i18n",
+    )
+)
+
+FALLBACK_LOCALE = "English"
+
+PLURAL_FORMS = {"zero", "one", "few", "many", "other"}
+
+# Counts up to this number use the `few` plural form
+PLURAL_FEW = 5
 
 #    "Persian",
 supported_languages = [
@@ -19,3 +51,124 @@ supported_languages = [
     "Spanish",
     "Turkish",
 ]
+
+
+class TranslationTemplate(Template):
+    """Translation with `%{name}` placeholders."""
+
+    delimiter = "%"
+
+
+class Catalog:
+    """Precompiled translations of all locales.
+
+    Only the fallback locale is compiled on startup.
+    Other locales are compiled, once they are used for the first time.
+    """
+
+    def __init__(self, path: Path, fallback: str = FALLBACK_LOCALE) -> None:
+        """Contructor."""
+        self.path = path
+        self.fallback = fallback
+        self.files = {file.stem: file for file in self.path.glob("*.yml")}
+        self.locales: dict[str, dict[str, Any]] = {}
+        self.lock = Lock()
+        self.compile()
+
+    def compile(self) -> None:
+        """Build the lookup table of the fallback locale."""
+        self.locales = {self.fallback: self.read(self.fallback)}
+
+    def read(self, locale: str) -> dict[str, Any]:
+        """Read and flatten the translation file of a locale."""
+        table: dict[str, Any] = {}
+        if locale not in self.files:
+            return table
+
+        with open(self.files[locale], encoding="utf-8") as file:
+            data = yaml.load(file, Loader=SafeLoader) or {}
+        flatten(data, "", table)
+
+        return table
+
+    def get_table(self, locale: str | None) -> dict[str, Any]:
+        """Get the lookup table of a locale and compile it, if necessary."""
+        table = self.locales.get(locale)  # type: ignore
+        if table is not None:
+            return table
+
+        if locale not in self.files:
+            return self.locales[self.fallback]
+
+        with self.lock:
+            if locale not in self.locales:
+                self.locales[locale] = {
+                    **self.locales[self.fallback],
+                    **self.read(locale),
+                }
+
+        return self.locales[locale]
+
+    def t(self, key: str, locale: str | None = None, **kwargs: Any) -> str:
+        """Translate a key into the given locale and fill in its placeholders."""
+        table = self.get_table(locale)
+        translation = table.get(key)
+        if translation is None:
+            return kwargs.get("default", key)
+
+        if isinstance(translation, dict):
+            if "count" not in kwargs:
+                # This is what python-i18n did in this case as well
+                return key
+            translation = pluralize(translation, kwargs["count"], key)
+
+        if isinstance(translation, str):
+            return translation
+
+        return translation.safe_substitute(kwargs)
+
+
+def flatten(data: dict, prefix: str, table: dict[str, Any]) -> None:
+    """Flatten nested translations into dotted keys and prepare their templates."""
+    for key, value in data.items():
+        key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if len(PLURAL_FORMS.intersection(value)) >= 2:
+                table[key] = {
+                    form: compile_template(text) for form, text in value.items()
+                }
+            else:
+                flatten(value, f"{key}.", table)
+        else:
+            table[key] = compile_template(value)
+
+
+def compile_template(value: Any) -> str | TranslationTemplate:
+    """Translations without placeholders don't need any formatting at all."""
+    text = "" if value is None else str(value)
+    if "%" not in text:
+        return text
+
+    template = TranslationTemplate(text)
+    # Escaped delimiters (`%%`) still need the substitution, even without placeholders
+    if not template.get_identifiers() and "%%" not in text:
+        return text
+
+    return template
+
+
+def pluralize(forms: dict, count: int, key: str) -> str | TranslationTemplate:
+    """Pick the plural form for a count."""
+    if count == 0:
+        if "zero" in forms:
+            return forms["zero"]
+    elif count == 1:
+        if "one" in forms:
+            return forms["one"]
+    elif count <= PLURAL_FEW and "few" in forms:
+        return forms["few"]
+
+    return forms.get("other", forms.get("many", key))
+
+
+i18n = Catalog(TRANSLATION_PATH)
@@ -0,0 +1,66 @@
+"""Assign webhook updates to worker processes.
+
+Updates are routed by poll, whenever the poll can be derived from the raw update.
+This includes votes, whose buttons carry the id of their poll. Votes, resets and
+option removals of a poll are thereby handled by the same process and serialized
+by its callback executor.
+Any other update is routed by its user.
+
+The updates of a single user can thereby be handled by different processes.
+Nothing relies on a process local state of a user: The search generation and the
+replica freshness of a user are stored in `User.polls_changed_at` and the
+render caches are keyed by the render versions in the database.
+Only vote buttons of old messages don't know their poll and are routed by user.
+"""
+import zlib
+
+from pollbot.enums import CallbackEntity
+from pollbot.telegram.callback_data import decode_callback, get_vote_poll_id
+
+
+def get_routing_key(data: dict) -> tuple[str, int] | None:
+    """Get the routing key of a raw update.
+
+    Returns `None`, if the update has neither a poll, nor a user.
+    """
+    query = data.get("callback_query")
+    if query is not None:
+        try:
+            callback = decode_callback(query.get("data", ""))
+            if callback.entity == CallbackEntity.poll:
+                return ("poll", callback.entity_id)
+
+            poll_id = get_vote_poll_id(callback)
+            if poll_id is not None:
+                return ("poll", poll_id)
+        except ValueError:
+            pass
+
+        return ("user", query["from"]["id"])
+
+    result = data.get("chosen_inline_result")
+    if result is not None:
+        # The result id is the poll id. Only error results use a random id.
+        try:
+            return ("poll", int(result["result_id"]))
+        except ValueError:
+            return ("user", result["from"]["id"])
+
+    for value in data.values():
+        if not isinstance(value, dict):
+            continue
+
+        user = value.get("from") or value.get("user")
+        if user is not None:
+            return ("user", user["id"])
+
+    return None
+
+
+def get_worker_index(key: tuple[str, int] | None, worker_count: int) -> int:
+    """Map a routing key onto one of the workers."""
+    if key is None:
+        return 0
+
+    kind, key_id = key
+    return zlib.crc32(f"{kind}:{key_id}".encode()) % worker_count
@@ -0,0 +1,88 @@
+"""The webhook ingress.
+
+The threaded webhook mode handles all updates in a single process and is thereby
+bound by a single GIL. The ingress accepts the webhook requests of Telegram once
+and passes the raw updates to a number of worker processes:
+
+- The ingress only parses the update to find its routing key (`ingress.routing`).
+- Each worker handles its updates in order with its own dispatcher (`ingress.worker`).
+
+The ingress listens on localhost, just like the normal webhook mode.
+TLS is expected to be terminated by a reverse proxy.
+"""
+import asyncio
+import logging
+import multiprocessing
+import signal
+
+from telegram import Bot
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import PeriodicCallback
+
+from pollbot.config import config
+from pollbot.ingress.server import UpdateRouter, make_application
+from pollbot.ingress.worker import run_worker
+
+# Milliseconds between checks, whether all workers are still alive
+WORKER_CHECK_INTERVAL = 1000
+
+
+def run(worker_count: int) -> None:
+    """Start the workers and accept updates until interrupted."""
+    context = multiprocessing.get_context("spawn")
+    queues = [context.Queue() for _ in range(worker_count)]
+    workers = [
+        context.Process(
+            target=run_worker, args=(index, queue, index == 0), name=f"worker_{index}"
+        )
+        for index, queue in enumerate(queues)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        asyncio.run(serve(UpdateRouter(queues), workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Workers handle all updates, that are still queued, before they stop.
+        for queue in queues:
+            queue.put(None)
+        for worker in workers:
+            worker.join()
+
+
+async def serve(router: UpdateRouter, workers: list) -> None:
+    """Accept webhook requests until terminated or until a worker dies."""
+    webhook = config["webhook"]
+    application = make_application(router, webhook["token"])
+    server = HTTPServer(application)
+    server.listen(webhook["port"], address="127.0.0.1")
+
+    # Only the workers need a dispatcher with all handlers and jobs
+    bot = Bot(config["telegram"]["api_key"])
+    cert = webhook["cert_path"]
+    if cert:
+        with open(cert, "rb") as certificate:
+            bot.set_webhook(
+                url=f"{webhook['domain']}{webhook['token']}", certificate=certificate
+            )
+    else:
+        bot.set_webhook(url=f"{webhook['domain']}{webhook['token']}")
+
+    stopped = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+
+    def check_workers() -> None:
+        for worker in workers:
+            if not worker.is_alive():
+                logging.error(f"{worker.name} exited with code {worker.exitcode}")
+                stopped.set()
+
+    checker = PeriodicCallback(check_workers, WORKER_CHECK_INTERVAL)
+    checker.start()
+    try:
+        await stopped.wait()
+    finally:
+        checker.stop()
+        server.stop()
@@ -0,0 +1,51 @@
+"""The web application of the webhook ingress."""
+import json
+import logging
+from multiprocessing.queues import Queue
+
+from tornado.web import Application, RequestHandler
+
+from pollbot.ingress.routing import get_routing_key, get_worker_index
+
+
+class UpdateRouter:
+    """Pass raw updates to the queue of their worker."""
+
+    def __init__(self, queues: list[Queue]) -> None:
+        """Contructor."""
+        self.queues = queues
+
+    def route(self, body: bytes) -> int:
+        """Route a raw update and return the index of its worker.
+
+        Raises a `ValueError` for malformed updates.
+        """
+        data = json.loads(body)
+        if not isinstance(data, dict):
+            raise ValueError("An update has to be an object")
+
+        index = get_worker_index(get_routing_key(data), len(self.queues))
+        self.queues[index].put(body)
+
+        return index
+
+
+class WebhookHandler(RequestHandler):
+    """Accept updates sent by Telegram."""
+
+    def initialize(self, router: UpdateRouter) -> None:
+        """Set the router of this handler."""
+        self.router = router
+
+    def post(self) -> None:
+        """Route the update. Telegram only needs to know, that it arrived."""
+        try:
+            self.router.route(self.request.body)
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Dropped malformed update: {e}")
+            self.set_status(400)
+
+
+def make_application(router: UpdateRouter, url_path: str) -> Application:
+    """Create the web application of the ingress."""
+    return Application([(f"/{url_path}", WebhookHandler, {"router": router})])
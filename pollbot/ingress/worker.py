@@ -0,0 +1,53 @@
+"""The worker processes of the webhook ingress.
+
+Each worker runs its own dispatcher with all handlers and its own database pool.
+Only the first worker runs the jobs, since they must not run more than once.
+"""
+import json
+import logging
+import signal
+import threading
+from multiprocessing.queues import Queue
+
+from telegram import Update
+from telegram.ext import Dispatcher
+
+
+def run_worker(index: int, updates: Queue, run_jobs: bool) -> None:
+    """Handle the updates of the ingress until it sends `None`."""
+    # The handlers are only needed in the workers
+    from pollbot.pollbot import updater
+    from pollbot.telegram.callback_handler import callback_executor
+
+    # The ingress stops the workers, once it has stopped accepting updates.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    dispatcher = updater.dispatcher
+    dispatcher_thread = threading.Thread(
+        target=dispatcher.start, name=f"dispatcher_{index}", daemon=True
+    )
+    dispatcher_thread.start()
+    if run_jobs:
+        updater.job_queue.start()
+
+    logging.info(f"Worker {index} started")
+    try:
+        forward_updates(updates, dispatcher)
+    finally:
+        if run_jobs:
+            updater.job_queue.stop()
+        dispatcher.stop()
+        dispatcher_thread.join()
+        callback_executor.shutdown()
+
+
+def forward_updates(updates: Queue, dispatcher: Dispatcher) -> None:
+    """Pass the raw updates of the ingress to the dispatcher in their order."""
+    while True:
+        body = updates.get()
+        if body is None:
+            return
+
+        data = json.loads(body)
+        dispatcher.update_queue.put(Update.de_json(data, dispatcher.bot))
@@ -1,9 +1,18 @@
+from pollbot.models.admin_statistic import AdminStatistic  # noqa
+from pollbot.models.daily_rollup import DailyRollup  # noqa
 from pollbot.models.daily_statistic import DailyStatistic  # noqa
 from pollbot.models.notification import Notification  # noqa
 from pollbot.models.option import Option  # noqa
 from pollbot.models.poll import Poll  # noqa
+from pollbot.models.poll_archive import PollArchive  # noqa
 from pollbot.models.reference import Reference  # noqa
+from pollbot.models.render_cache import RenderCacheEntry  # noqa
 from pollbot.models.update import Update  # noqa
 from pollbot.models.user import User  # noqa
 from pollbot.models.user_statistic import UserStatistic  # noqa
 from pollbot.models.vote import Vote  # noqa
+
+# Register the session events, that keep track of poll render versions and vote aggregates.
+# The versions have to be increased first, since this locks the poll rows.
+import pollbot.poll.versioning  # noqa
+import pollbot.poll.aggregates  # noqa
@@ -0,0 +1,39 @@
+"""The sqlalchemy model for the admin statistics snapshot."""
+from sqlalchemy import Column, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import DateTime, Integer
+
+from pollbot.db import base
+
+
+class AdminStatistic(base):
+    """A snapshot of bot-wide counts for the admin settings.
+
+    Counting everything is slow on a big database. The snapshot is refreshed
+    periodically by a job and there's only ever a single row.
+    """
+
+    __tablename__ = "admin_statistic"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    # Users
+    total_users = Column(Integer, nullable=False)
+    started_users = Column(Integer, nullable=False)
+    users_owning_polls = Column(Integer, nullable=False)
+    users_with_votes = Column(Integer, nullable=False)
+
+    # Polls
+    highest_poll_id = Column(Integer, nullable=False)
+    total_polls = Column(Integer, nullable=False)
+    open_polls = Column(Integer, nullable=False)
+    unfinished_polls = Column(Integer, nullable=False)
+    closed_polls = Column(Integer, nullable=False)
+    polls_to_be_deleted = Column(Integer, nullable=False)
+    # Poll type name -> amount of polls
+    poll_types = Column(JSONB, nullable=False)
+
+    def __init__(self, id: int) -> None:
+        """Contructor."""
+        self.id = id
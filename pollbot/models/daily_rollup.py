@@ -0,0 +1,30 @@
+"""The sqlalchemy model for the daily rollup of users and votes."""
+from sqlalchemy import Column, Date
+from sqlalchemy.types import Integer
+
+from pollbot.db import base
+
+
+class DailyRollup(base):
+    """Per-day numbers for the admin plots.
+
+    Each finished day is rolled up once by the daily stats job.
+    The plots thereby never have to scan the user and vote tables.
+    """
+
+    __tablename__ = "daily_rollup"
+
+    date = Column(Date, primary_key=True)
+
+    # Running totals of users, that were created up to this day
+    users = Column(Integer, nullable=False)
+    started_users = Column(Integer, nullable=False)
+    voting_users = Column(Integer, nullable=False)
+    owning_users = Column(Integer, nullable=False)
+
+    # Votes, that were created on this day
+    votes = Column(Integer, nullable=False)
+
+    def __init__(self, date):
+        """Contructor."""
+        self.date = date
@@ -25,6 +25,15 @@ class Option(base):
     name = Column(String, nullable=False)
     description = Column(String)
     is_date = Column(Boolean, nullable=False, default=False)
+    # Increased on every change of this option or its votes.
+    # See pollbot.poll.versioning
+    version = Column(Integer, nullable=False, server_default="0", default=0)
+
+    # Vote aggregates. See pollbot.poll.aggregates
+    voter_count = Column(Integer, nullable=False, server_default="0", default=0)
+    vote_sum = Column(Integer, nullable=False, server_default="0", default=0)
+    yes_count = Column(Integer, nullable=False, server_default="0", default=0)
+    maybe_count = Column(Integer, nullable=False, server_default="0", default=0)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
@@ -34,12 +43,11 @@ class Option(base):
     poll_id = Column(
         Integer, ForeignKey("poll.id", ondelete="cascade"), nullable=False, index=True
     )
-    poll = relationship("Poll", lazy="joined", back_populates="options")
+    poll = relationship("Poll", back_populates="options")
 
     # OneToMany
     votes = relationship(
         "Vote",
-        lazy="joined",
         passive_deletes="all",
         order_by="Vote.id",
         back_populates="option",
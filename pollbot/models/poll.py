@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 
-from sqlalchemy import Column, ForeignKey, func, text
+from sqlalchemy import Column, ForeignKey, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.scoping import scoped_session
@@ -72,12 +72,22 @@ class Poll(base):
         Boolean, nullable=False, server_default="False", default=False
     )
 
+    # Increased on every change that affects the rendered poll.
+    # See pollbot.poll.versioning
+    version = Column(Integer, nullable=False, server_default="0", default=0)
+
+    # Vote aggregates. See pollbot.poll.aggregates
+    voter_count = Column(Integer, nullable=False, server_default="0", default=0)
+    vote_sum = Column(Integer, nullable=False, server_default="0", default=0)
+
+    # The votes of archived polls are moved to their archive. See pollbot.poll.archive
+    archived = Column(Boolean, nullable=False, server_default="false", default=False)
+
     # ManyToOne
     user_id = Column(
         BigInteger,
         ForeignKey("user.id", ondelete="cascade", name="user"),
         nullable=False,
-        index=True,
     )
     user = relationship("User", foreign_keys="Poll.user_id")
 
@@ -85,18 +95,21 @@ class Poll(base):
     options = relationship(
         "Option",
         order_by="asc(Option.index)",
-        lazy="joined",
+        lazy="selectin",
         passive_deletes="all",
         back_populates="poll",
     )
     votes = relationship("Vote", passive_deletes="all", back_populates="poll")
-    references = relationship(
-        "Reference", lazy="joined", passive_deletes="all", back_populates="poll"
-    )
+    references = relationship("Reference", passive_deletes="all", back_populates="poll")
     notifications = relationship(
         "Notification", passive_deletes="all", back_populates="poll"
     )
 
+    # OneToOne
+    archive = relationship(
+        "PollArchive", uselist=False, passive_deletes="all", back_populates="poll"
+    )
+
     def __init__(self, user):
         """Create a new poll."""
         self.user = user
@@ -174,3 +187,48 @@ class Poll(base):
             self.next_notification = self.due_date - timedelta(hours=6)
         else:
             self.next_notification = self.due_date
+
+
+# The poll list of a user and the inline search.
+# Also used for all lookups by user, which makes a separate user index obsolete.
+Index(
+    "ix_poll_user_id_created_closed_created_at",
+    Poll.user_id,
+    Poll.created,
+    Poll.closed,
+    Poll.created_at,
+)
+
+# Open polls with pending notifications.
+Index(
+    "ix_poll_next_notification_open",
+    Poll.next_notification,
+    postgresql_where=Poll.closed.is_(False),
+)
+Index(
+    "ix_poll_due_date_open",
+    Poll.due_date,
+    postgresql_where=Poll.closed.is_(False),
+)
+
+# Polls that are scheduled for deletion. Those are deleted oldest first.
+Index(
+    "ix_poll_delete_updated_at",
+    Poll.updated_at,
+    postgresql_where=Poll.delete.isnot(None),
+)
+
+# Inline search for `ILIKE '%query%'` on the name and description.
+# Requires the `pg_trgm` extension.
+Index(
+    "ix_poll_name_trgm",
+    Poll.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index(
+    "ix_poll_description_trgm",
+    Poll.description,
+    postgresql_using="gin",
+    postgresql_ops={"description": "gin_trgm_ops"},
+)
@@ -0,0 +1,49 @@
+"""The sqlalchemy model for archived polls."""
+from sqlalchemy import Column, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.types import BigInteger, Boolean, DateTime, Integer, String
+
+from pollbot.db import base
+
+
+class PollArchive(base):
+    """The frozen state of a poll, that has been closed for a long time.
+
+    The votes of archived polls are removed from the vote table.
+    The aggregates stay on the poll and its options. See pollbot.poll.archive
+    """
+
+    __tablename__ = "poll_archive"
+
+    poll_id = Column(
+        Integer, ForeignKey("poll.id", ondelete="cascade"), primary_key=True
+    )
+    poll = relationship("Poll", back_populates="archive")
+
+    # The render version of the poll, when it has been archived
+    version = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    # The rendered poll text and all pages of its results
+    text = Column(String, nullable=False)
+    summarize = Column(Boolean, nullable=False)
+    pages = Column(JSONB, nullable=False)
+
+    # The votes, stored column-wise, e.g. {"user_id": [...], "option_id": [...]}
+    votes = Column(JSONB, nullable=False)
+    voter_ids = Column(ARRAY(BigInteger), nullable=False)
+
+    def __init__(self, poll, text, summarize, pages, votes, voter_ids):
+        """Create a new archive."""
+        self.poll = poll
+        self.version = poll.version
+        self.text = text
+        self.summarize = summarize
+        self.pages = pages
+        self.votes = votes
+        self.voter_ids = voter_ids
+
+
+# Find the archives a user voted in, e.g. when deleting the user.
+Index("ix_poll_archive_voter_ids", PollArchive.voter_ids, postgresql_using="gin")
@@ -122,3 +122,10 @@ Index(
     unique=True,
     postgresql_where=Reference.type == "inline",
 )
+
+# Lookup of inline messages, when a vote comes in from an inline message.
+Index(
+    "ix_reference_bot_inline_message_id_poll_id",
+    Reference.bot_inline_message_id,
+    Reference.poll_id,
+)
@@ -0,0 +1,22 @@
+"""The sqlalchemy model for shared render cache entries."""
+from typing import Any, ClassVar
+
+from sqlalchemy import Column, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import DateTime, String
+
+from pollbot.db import base
+
+
+class RenderCacheEntry(base):
+    """Rendered poll texts and keyboards, shared between all bot processes.
+
+    The table is unlogged, since its content can be rebuilt at any time.
+    """
+
+    __tablename__ = "render_cache"
+    __table_args__: ClassVar[dict[str, Any]] = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String, primary_key=True)
+    value = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -18,7 +18,7 @@ class Update(base):
     __mapper_args__: ClassVar[dict[str, Any]] = {"confirm_deleted_rows": False}
 
     id = Column(Integer, primary_key=True)
-    next_update = Column(DateTime, nullable=False)
+    next_update = Column(DateTime, nullable=False, index=True)
     count = Column(Integer, nullable=False)
 
     poll_id = Column(
@@ -22,6 +22,8 @@ class User(base):
     banned = Column(Boolean, nullable=False, default=False)
     broadcast_sent = Column(Boolean, nullable=False, default=False)
     last_update = Column(DateTime)
+    # The last change to the user's polls, that's visible in search results and lists
+    polls_changed_at = Column(DateTime)
 
     # Debug time j
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
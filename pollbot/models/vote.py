@@ -1,27 +1,48 @@
-"""The sqlalchemy model for a vote."""
+"""The sqlalchemy model for a vote.
+
+The vote table is by far the biggest table. It's partitioned by the hash of
+the poll id, since almost every query filters by poll. All votes of a poll live
+in the same partition, which keeps the indexes of each partition small and lets
+autovacuum work on one partition at a time.
+
+Postgres requires the partition key to be part of the primary key. The ids are
+still unique, which is why the mapper only uses the id as identity.
+"""
 from __future__ import annotations
 
 from typing import Any, ClassVar
 
-from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint, func
+from sqlalchemy import (
+    DDL,
+    Column,
+    ForeignKey,
+    Index,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    event,
+    func,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import BigInteger, DateTime, Integer, String
 
 from pollbot.db import base
 
+VOTE_PARTITIONS = 16
+
 
 class Vote(base):
     """The model for a Vote."""
 
     __tablename__ = "vote"
     __table_args__ = (
+        PrimaryKeyConstraint("id", "poll_id", name="vote_pkey"),
         UniqueConstraint(
             "user_id", "poll_id", "option_id", name="one_vote_per_option_and_user"
         ),
+        {"postgresql_partition_by": "HASH (poll_id)"},
     )
-    __mapper_args__: ClassVar[dict[str, Any]] = {"confirm_deleted_rows": False}
 
-    id = Column(Integer, primary_key=True)
+    id = Column(Integer, autoincrement=True)
     type = Column(String, nullable=True)
     priority = Column(Integer, nullable=True)
     poll_type = Column(String, nullable=True)
@@ -37,13 +58,10 @@ class Vote(base):
         Integer,
         ForeignKey("option.id", ondelete="cascade", name="vote_option_id_fkey"),
         nullable=False,
-        index=True,
     )
     option = relationship("Option", back_populates="votes")
 
-    poll_id = Column(
-        Integer, ForeignKey("poll.id", ondelete="cascade"), nullable=False, index=True
-    )
+    poll_id = Column(Integer, ForeignKey("poll.id", ondelete="cascade"), nullable=False)
     poll = relationship(
         "Poll",
         back_populates="votes",
@@ -59,6 +77,11 @@ class Vote(base):
         back_populates="votes",
     )
 
+    __mapper_args__: ClassVar[dict[str, Any]] = {
+        "confirm_deleted_rows": False,
+        "primary_key": [id],
+    }
+
     def __init__(self, user, option):
         """Create a new vote."""
         self.user = user
@@ -88,3 +111,23 @@ Index(
     unique=True,
     postgresql_where=Vote.poll_type == "priority",
 )
+
+# Votes of a user on a specific option (block, doodle, cumulative votes).
+# Also used for all lookups by option, which makes a separate option index obsolete.
+Index("ix_vote_option_id_user_id", Vote.option_id, Vote.user_id)
+
+# All votes of a user in a poll. Also used for all lookups by poll.
+Index("ix_vote_poll_id_user_id", Vote.poll_id, Vote.user_id)
+
+
+# Create the partitions together with the table.
+# Existing databases are converted by `main.py partition-votes`.
+for remainder in range(VOTE_PARTITIONS):
+    event.listen(
+        Vote.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE vote_p{remainder} PARTITION OF vote "
+            f"FOR VALUES WITH (MODULUS {VOTE_PARTITIONS}, REMAINDER {remainder})"
+        ),
+    )
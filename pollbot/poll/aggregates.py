@@ -0,0 +1,217 @@
+"""Denormalized vote aggregates of polls and options.
+
+Rendering a poll needs the amount of voters, the sum of all votes and
+the doodle score of each option. Those numbers are stored on the poll and option
+rows and are maintained incrementally in the same transaction as the vote changes.
+`rebuild_aggregates` recalculates them from scratch.
+
+The incremental update runs after the render versions have been increased.
+The version update locks the poll row, which serializes concurrent votes on the
+same poll. The distinct voter count of a poll is thereby always calculated on
+the latest committed state.
+"""
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import distinct, event, func, inspect, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from pollbot.enums import VoteResultType
+from pollbot.models import Option, Poll, Vote
+
+OPTION_AGGREGATES = ["voter_count", "vote_sum", "yes_count", "maybe_count"]
+POLL_AGGREGATES = ["voter_count", "vote_sum"]
+
+
+def rebuild_aggregates(session: Session, poll_ids: Iterable[int] | None = None) -> None:
+    """Recalculate all aggregates of some or all polls from their votes."""
+    option_votes = select(func.count(Vote.id)).where(Vote.option_id == Option.id)
+    vote_sum = select(func.coalesce(func.sum(Vote.vote_count), 0))
+    option_statement = update(Option.__table__).values(
+        voter_count=option_votes.scalar_subquery(),
+        vote_sum=vote_sum.where(Vote.option_id == Option.id).scalar_subquery(),
+        yes_count=option_votes.where(
+            Vote.type == VoteResultType.yes.name
+        ).scalar_subquery(),
+        maybe_count=option_votes.where(
+            Vote.type == VoteResultType.maybe.name
+        ).scalar_subquery(),
+    )
+
+    poll_statement = update(Poll.__table__).values(
+        voter_count=select(func.count(distinct(Vote.user_id)))
+        .where(Vote.poll_id == Poll.id)
+        .scalar_subquery(),
+        vote_sum=vote_sum.where(Vote.poll_id == Poll.id).scalar_subquery(),
+    )
+
+    # The votes of archived polls are gone, but their aggregates are final.
+    live_polls = select(Poll.id).where(Poll.archived.is_(False))
+    option_statement = option_statement.where(Option.poll_id.in_(live_polls))
+    poll_statement = poll_statement.where(Poll.archived.is_(False))
+
+    if poll_ids is not None:
+        poll_ids = list(poll_ids)
+        option_statement = option_statement.where(Option.poll_id.in_(poll_ids))
+        poll_statement = poll_statement.where(Poll.id.in_(poll_ids))
+
+    connection = session.connection()
+    connection.execute(option_statement)
+    connection.execute(poll_statement)
+
+    # Drop the outdated aggregates of all loaded instances
+    for instance in session.identity_map.values():
+        if isinstance(instance, Option):
+            if poll_ids is None or instance.poll_id in poll_ids:
+                session.expire(instance, OPTION_AGGREGATES)
+        elif isinstance(instance, Poll):
+            if poll_ids is None or instance.id in poll_ids:
+                session.expire(instance, POLL_AGGREGATES)
+
+
+def _vote_values(poll_id, option_id, user_id, vote_count, vote_type) -> dict[str, Any]:
+    """Collect all values of a vote that are relevant for aggregates."""
+    return {
+        "poll_id": poll_id,
+        "option_id": option_id,
+        "user_id": user_id,
+        "vote_count": vote_count or 0,
+        "type": vote_type,
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def remember_old_votes(session: Session, flush_context, instances) -> None:
+    """Remember the database state of all votes that are going to be changed."""
+    vote_ids = []
+    for instance in session.deleted:
+        if isinstance(instance, Vote):
+            vote_ids.append(instance.id)
+    for instance in session.dirty:
+        if isinstance(instance, Vote) and session.is_modified(instance):
+            vote_ids.append(instance.id)
+
+    if not vote_ids:
+        return
+
+    rows = session.connection().execute(
+        select(
+            Vote.id,
+            Vote.poll_id,
+            Vote.option_id,
+            Vote.user_id,
+            Vote.vote_count,
+            Vote.type,
+        ).where(Vote.id.in_(vote_ids))
+    )
+    old_votes = session.info.setdefault("old_votes", {})
+    for row in rows:
+        old_votes[row[0]] = _vote_values(*row[1:])
+
+
+@event.listens_for(Session, "after_flush")
+def update_aggregates_after_flush(session: Session, _) -> None:
+    """Apply the changes of this flush to the aggregates of polls and options."""
+    old_votes = session.info.pop("old_votes", {})
+    removed = list(old_votes.values())
+    added = []
+    rebuild_poll_ids = set()
+
+    for instance in session.new:
+        if isinstance(instance, Vote):
+            added.append(_instance_values(instance))
+    for instance in session.dirty:
+        if isinstance(instance, Vote) and instance.id in old_votes:
+            added.append(_instance_values(instance))
+    for instance in session.deleted:
+        # Votes of deleted options are removed by the database.
+        if isinstance(instance, Option):
+            rebuild_poll_ids.add(instance.poll_id)
+
+    if not removed and not added and not rebuild_poll_ids:
+        return
+
+    option_deltas = defaultdict(lambda: dict.fromkeys(OPTION_AGGREGATES, 0))
+    poll_deltas = defaultdict(lambda: dict.fromkeys(POLL_AGGREGATES, 0))
+    # The net change of votes for each voter in each poll
+    voter_deltas = defaultdict(int)
+
+    for values, sign in _with_sign(removed, added):
+        option_delta = option_deltas[values["option_id"]]
+        option_delta["voter_count"] += sign
+        option_delta["vote_sum"] += sign * values["vote_count"]
+        if values["type"] == VoteResultType.yes.name:
+            option_delta["yes_count"] += sign
+        elif values["type"] == VoteResultType.maybe.name:
+            option_delta["maybe_count"] += sign
+
+        poll_deltas[values["poll_id"]]["vote_sum"] += sign * values["vote_count"]
+        voter_deltas[(values["poll_id"], values["user_id"])] += sign
+
+    # Check whether voters started or stopped voting on a poll
+    voter_deltas = {key: delta for key, delta in voter_deltas.items() if delta != 0}
+    if voter_deltas:
+        vote_counts = dict.fromkeys(voter_deltas, 0)
+        rows = session.connection().execute(
+            select(Vote.poll_id, Vote.user_id, func.count(Vote.id))
+            .where(tuple_(Vote.poll_id, Vote.user_id).in_(list(voter_deltas)))
+            .group_by(Vote.poll_id, Vote.user_id)
+        )
+        for poll_id, user_id, count in rows:
+            vote_counts[(poll_id, user_id)] = count
+
+        for (poll_id, user_id), delta in voter_deltas.items():
+            after = vote_counts[(poll_id, user_id)]
+            before = after - delta
+            poll_deltas[poll_id]["voter_count"] += int(after > 0) - int(before > 0)
+
+    for option_id, deltas in sorted(option_deltas.items()):
+        _apply_deltas(session, Option, option_id, deltas)
+    for poll_id, deltas in sorted(poll_deltas.items()):
+        if poll_id not in rebuild_poll_ids:
+            _apply_deltas(session, Poll, poll_id, deltas)
+
+    if rebuild_poll_ids:
+        rebuild_aggregates(session, rebuild_poll_ids)
+
+
+def _with_sign(removed: list[dict], added: list[dict]):
+    """Iterate over all removed and added vote values with their sign."""
+    for values in removed:
+        yield values, -1
+    for values in added:
+        yield values, 1
+
+
+def _instance_values(vote: Vote) -> dict[str, Any]:
+    """Collect the current values of a vote instance."""
+    return _vote_values(
+        vote.poll_id, vote.option_id, vote.user_id, vote.vote_count, vote.type
+    )
+
+
+def _apply_deltas(session: Session, model: type, row_id: int, deltas: dict) -> None:
+    """Add the deltas to the aggregates of a single row."""
+    deltas = {key: delta for key, delta in deltas.items() if delta != 0}
+    if not deltas:
+        return
+
+    columns = [getattr(model, key) for key in deltas]
+    statement = (
+        update(model.__table__)
+        .where(model.id == row_id)
+        .values({key: getattr(model, key) + delta for key, delta in deltas.items()})
+        .returning(*columns)
+    )
+    row = session.connection().execute(statement).first()
+    if row is None:
+        return
+
+    # Update the loaded instance, to avoid a refresh on the next access
+    identity_key = inspect(model).identity_key_from_primary_key([row_id])
+    instance = session.identity_map.get(identity_key)
+    if instance is not None:
+        for key, value in zip(deltas, row):
+            set_committed_value(instance, key, value)
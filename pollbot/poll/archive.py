@@ -0,0 +1,209 @@
+"""Archive polls, that have been closed for a long time.
+
+Closed polls don't change anymore, but their votes used to stay in the vote table
+until the poll got deleted. Archived polls are frozen instead:
+
+- The vote aggregates stay on the poll and its options.
+- The poll text and all pages of its results are rendered once and stored in the archive.
+- The votes are stored column-wise in the archive and removed from the vote table.
+
+An archive is only valid for the render version of the poll, it has been created for.
+Every handler, that changes an archived poll (e.g. reopening it, adding an option,
+voting or changing its style), restores the votes with `restore_poll` beforehand.
+The poll is then rendered from its votes again.
+Rendering only reads archives and never restores them.
+
+Restored votes keep their ids and timestamps. Result cursors, the order of voters
+and the daily statistics thereby stay the same.
+
+Archives of polls, a deleted user voted in, are restored right away,
+since their texts contain the user's name. The votes of all those polls are
+restored with a single statement, before the user's votes are removed.
+The cleanup job archives those polls again later on.
+
+Renaming a voter only increases the versions of polls with votes in the vote table.
+Archived texts thereby keep the names of the voters at the time of archiving.
+
+Archiving and restoring doesn't touch `Poll.updated_at`, which decides
+when closed polls are finally deleted.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.models import Option, Poll, PollArchive, User, Vote
+
+VOTE_COLUMNS = [
+    "id",
+    "option_id",
+    "user_id",
+    "vote_count",
+    "type",
+    "priority",
+    "created_at",
+    "updated_at",
+]
+TIMESTAMP_COLUMNS = {"created_at", "updated_at"}
+
+# Timestamps are stored as microseconds since this date
+EPOCH = datetime(1970, 1, 1)
+
+# Votes of options or users, that have been deleted in the meantime, are dropped.
+RESTORE_VOTES = text(
+    """
+    INSERT INTO vote (id, poll_id, option_id, user_id, vote_count, type, priority,
+        poll_type, created_at, updated_at)
+    SELECT (archive.votes->'id'->>i)::integer,
+        archive.poll_id,
+        (archive.votes->'option_id'->>i)::integer,
+        (archive.votes->'user_id'->>i)::bigint,
+        (archive.votes->'vote_count'->>i)::integer,
+        archive.votes->'type'->>i,
+        (archive.votes->'priority'->>i)::integer,
+        poll.poll_type,
+        timestamp '1970-01-01' + (archive.votes->'created_at'->>i)::bigint * interval '1 microsecond',
+        timestamp '1970-01-01' + (archive.votes->'updated_at'->>i)::bigint * interval '1 microsecond'
+    FROM poll_archive archive
+    JOIN poll ON poll.id = archive.poll_id
+    CROSS JOIN generate_series(0, jsonb_array_length(archive.votes->'user_id') - 1) AS i
+    WHERE archive.poll_id = ANY(:poll_ids)
+    AND EXISTS (
+        SELECT 1 FROM option WHERE option.id = (archive.votes->'option_id'->>i)::integer
+    )
+    AND EXISTS (
+        SELECT 1 FROM "user" WHERE "user".id = (archive.votes->'user_id'->>i)::bigint
+    )
+    ORDER BY archive.poll_id, i
+    """
+)
+
+
+def archive_poll(
+    session: scoped_session,
+    poll: Poll,
+    text: str,
+    summarize: bool,
+    pages: list[list[str]],
+) -> PollArchive:
+    """Move the votes of a poll and its rendered text into a new archive."""
+    # Flush pending changes, otherwise the poll's version might be outdated.
+    session.flush()
+
+    rows = session.execute(
+        select(*[getattr(Vote, column) for column in VOTE_COLUMNS])
+        .where(Vote.poll_id == poll.id)
+        .order_by(Vote.id)
+    ).all()
+
+    votes: dict[str, list] = {column: [] for column in VOTE_COLUMNS}
+    for row in rows:
+        for column, value in zip(VOTE_COLUMNS, row):
+            if column in TIMESTAMP_COLUMNS:
+                value = (value - EPOCH) // timedelta(microseconds=1)
+            votes[column].append(value)
+
+    voter_ids = sorted(set(votes["user_id"]))
+    archive = PollArchive(poll, text, summarize, pages, votes, voter_ids)
+    session.add(archive)
+
+    # Bulk operations bypass the session events. The aggregates and the render
+    # version of the poll thereby stay the same.
+    session.execute(delete(Vote).where(Vote.poll_id == poll.id))
+    set_archived(session, poll, True)
+    session.flush()
+
+    return archive
+
+
+def get_archive(session: scoped_session, poll: Poll) -> PollArchive | None:
+    """Get the archive of a poll.
+
+    This is called while rendering and never writes anything.
+    Handlers, that change the poll, restore it beforehand.
+    """
+    if not poll.archived:
+        return None
+
+    return poll.archive
+
+
+def restore_poll(session: scoped_session, poll: Poll) -> None:
+    """Move the votes of an archived poll back into the vote table.
+
+    Call this before changing the poll, its options or its votes.
+    """
+    if not poll.archived:
+        return
+
+    restore_archives(session, [poll.id])
+
+
+def restore_archives(session: scoped_session, poll_ids: list[int]) -> None:
+    """Move the votes of some archived polls back into the vote table."""
+    poll_ids = sorted(set(poll_ids))
+    session.flush()
+    connection = session.connection()
+
+    # Lock the archives, in case somebody else restores them at the same time.
+    locked_ids = (
+        connection.execute(
+            select(PollArchive.poll_id)
+            .where(PollArchive.poll_id.in_(poll_ids))
+            .order_by(PollArchive.poll_id)
+            .with_for_update()
+        )
+        .scalars()
+        .all()
+    )
+    if locked_ids:
+        connection.execute(RESTORE_VOTES, {"poll_ids": locked_ids})
+        connection.execute(
+            delete(PollArchive.__table__).where(PollArchive.poll_id.in_(locked_ids))
+        )
+    connection.execute(
+        update(Poll.__table__)
+        .where(Poll.id.in_(poll_ids))
+        .values(archived=False, updated_at=Poll.updated_at)
+    )
+
+    # Forget the archives and the votes, that have been loaded in the meantime
+    for instance in list(session.identity_map.values()):
+        if isinstance(instance, PollArchive) and instance.poll_id in poll_ids:
+            session.expunge(instance)
+        elif isinstance(instance, Option) and instance.poll_id in poll_ids:
+            session.expire(instance, ["votes"])
+        elif isinstance(instance, Poll) and instance.id in poll_ids:
+            set_committed_value(instance, "archived", False)
+            set_committed_value(instance, "archive", None)
+            session.expire(instance, ["votes"])
+
+
+def restore_archives_of_voter(session: scoped_session, user: User) -> list[int]:
+    """Restore all archives, the user voted in, and return the ids of their polls.
+
+    The names of the user are part of the rendered texts.
+    Those polls are thereby served from their votes, until they're archived again.
+    """
+    poll_ids = (
+        session.execute(
+            select(PollArchive.poll_id).where(PollArchive.voter_ids.contains([user.id]))
+        )
+        .scalars()
+        .all()
+    )
+    if poll_ids:
+        restore_archives(session, poll_ids)
+
+    return sorted(poll_ids)
+
+
+def set_archived(session: scoped_session, poll: Poll, archived: bool) -> None:
+    """Set the archive flag without touching `updated_at`."""
+    session.execute(
+        update(Poll.__table__)
+        .where(Poll.id == poll.id)
+        .values(archived=archived, updated_at=Poll.updated_at)
+    )
+    set_committed_value(poll, "archived", archived)
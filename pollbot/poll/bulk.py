@@ -0,0 +1,105 @@
+"""Set-based removal of votes and polls.
+
+Resetting a poll, deleting all polls of a user or deleting a user used to
+load every affected vote and poll into the session and delete them one by one.
+For heavy voters this easily took longer than Telegram waits for a callback.
+
+Everything here is done with a single statement per step instead, which
+returns the ids of the affected polls. Bulk statements bypass the session events.
+The render versions and aggregates of those polls are thereby updated by hand,
+and the message updates are scheduled afterwards in one go.
+"""
+from sqlalchemy import delete, inspect, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.enums import PollDeletionMode
+from pollbot.models import Option, Poll, User, Vote
+from pollbot.poll.aggregates import rebuild_aggregates
+from pollbot.poll.archive import restore_archives_of_voter
+from pollbot.poll.versioning import increase_poll_version
+
+
+def remove_votes_of_poll(session: scoped_session, poll: Poll) -> list[int]:
+    """Remove all votes of a poll.
+
+    Archived polls have to be restored beforehand.
+    """
+    return _remove_votes(session, Vote.poll_id == poll.id)
+
+
+def remove_votes_of_user(session: scoped_session, user: User) -> list[int]:
+    """Remove all votes of a user and return the ids of the affected polls.
+
+    Archived polls, the user voted in, are restored beforehand.
+    """
+    restore_archives_of_voter(session, user)
+    poll_ids = _remove_votes(session, Vote.user_id == user.id)
+    session.expire(user, ["votes"])
+
+    return poll_ids
+
+
+def _remove_votes(session: scoped_session, condition) -> list[int]:
+    """Delete all matching votes and update the affected polls."""
+    session.flush()
+    rows = (
+        session.connection()
+        .execute(
+            delete(Vote.__table__)
+            .where(condition)
+            .returning(Vote.poll_id, Vote.option_id)
+        )
+        .all()
+    )
+    poll_ids = sorted({poll_id for poll_id, _ in rows})
+    option_ids = {option_id for _, option_id in rows}
+    if not poll_ids:
+        return []
+
+    increase_poll_version(session, poll_ids, option_ids)
+    rebuild_aggregates(session, poll_ids)
+
+    # Forget the votes, that have already been loaded.
+    for instance in list(session.identity_map.values()):
+        if isinstance(instance, Vote) and instance.poll_id in poll_ids:
+            session.expunge(instance)
+        elif isinstance(instance, Option) and instance.poll_id in poll_ids:
+            session.expire(instance, ["votes"])
+        elif isinstance(instance, Poll) and instance.id in poll_ids:
+            session.expire(instance, ["votes"])
+
+    return poll_ids
+
+
+def mark_polls_for_deletion(
+    session: scoped_session,
+    user: User,
+    mode: PollDeletionMode,
+    closed: bool | None = None,
+) -> list[int]:
+    """Mark all polls of a user for deletion by the background job.
+
+    Polls, that are already marked, keep their deletion mode.
+    Only closed or open polls are marked, if `closed` is given.
+    """
+    session.flush()
+    statement = (
+        update(Poll.__table__)
+        .where(Poll.user_id == user.id)
+        .where(Poll.delete.is_(None))
+        .values(delete=mode.name)
+        .returning(Poll.id)
+    )
+    if closed is not None:
+        statement = statement.where(Poll.closed.is_(closed))
+
+    poll_ids = session.connection().execute(statement).scalars().all()
+    for poll_id in poll_ids:
+        poll = session.identity_map.get(
+            inspect(Poll).identity_key_from_primary_key([poll_id])
+        )
+        if poll is not None:
+            set_committed_value(poll, "delete", mode.name)
+
+    return sorted(poll_ids)
@@ -76,11 +76,7 @@ def remove_old_references(
 
 def calculate_total_votes(poll: Poll) -> int:
     """Calculate the total number of votes of a poll."""
-    total = 0
-    for vote in poll.votes:
-        total += vote.vote_count
-
-    return total
+    return poll.vote_sum
 
 
 def translate_poll_type(poll_type: str, locale: str) -> str:
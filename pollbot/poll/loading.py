@@ -0,0 +1,58 @@
+"""Loading profiles for polls and options.
+
+All relationships are loaded lazily by default, except for `Poll.options`,
+which is loaded with a separate `SELECT ... IN` as it's needed almost everywhere.
+Loading a poll or option thereby never pulls in all votes and references of a poll.
+
+Call sites pick the profile, that matches the data they're going to access.
+E.g. `session.query(Poll).options(*LIST_VIEW)`.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, lazyload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.models import Option, Poll, Vote
+
+# Only the poll rows, e.g. for lists of polls or for resolving callbacks.
+LIST_VIEW = (lazyload(Poll.options), lazyload(Poll.references))
+
+# An option with its poll, but without the votes of the option.
+VOTE_CLICK = (joinedload(Option.poll),)
+
+# Everything that's needed to render a poll and to update all of its messages.
+# The votes are only loaded on demand, if the rendered option isn't cached.
+RENDER = (selectinload(Poll.options), selectinload(Poll.references))
+
+# Polls that are about to be deleted. Options and votes are removed by the database.
+DELETION = (lazyload(Poll.options), selectinload(Poll.references))
+
+
+def load_option_votes(session: scoped_session, options: list[Option]) -> None:
+    """Load all votes of these options with their users in a single query.
+
+    Lazy loading `option.votes` would load the votes of each option and
+    the users of those votes one by one.
+    """
+    options = [
+        option
+        for option in options
+        if option.id is not None and "votes" in inspect(option).unloaded
+    ]
+    if len(options) == 0:
+        return
+
+    votes_by_option: dict[int, list[Vote]] = {option.id: [] for option in options}
+    votes = (
+        session.query(Vote)
+        .filter(Vote.poll_id.in_({option.poll_id for option in options}))
+        .filter(Vote.option_id.in_(votes_by_option.keys()))
+        .options(joinedload(Vote.user))
+        .order_by(Vote.id)
+        .all()
+    )
+    for vote in votes:
+        votes_by_option[vote.option_id].append(vote)
+
+    for option in options:
+        set_committed_value(option, "votes", votes_by_option[option.id])
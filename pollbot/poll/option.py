@@ -2,8 +2,9 @@ from typing import Any
 
 from sqlalchemy.orm.scoping import scoped_session
 
-from pollbot.enums import OptionSorting, PollType, VoteResultType
+from pollbot.enums import OptionSorting, PollType
 from pollbot.models import Option, Poll
+from pollbot.poll.archive import restore_poll
 from pollbot.poll.helper import poll_allows_cumulative_votes
 from pollbot.poll.vote import init_votes_for_new_options
 
@@ -12,6 +13,7 @@ def add_single_option(
     session: scoped_session, poll: Poll, line: str, is_date: bool
 ) -> None:
     """Add a single option from a single line."""
+    restore_poll(session, poll)
     option = add_option(poll, line, [], is_date)
 
     if option is None:
@@ -39,6 +41,7 @@ def add_multiple_options(
     is_date: bool = False,
 ) -> list[Any | str]:
     """Create options from a list of strings."""
+    restore_poll(session, poll)
     added_options = []
 
     for option_to_add in options_to_add:
@@ -117,29 +120,22 @@ def calculate_percentage(option: Option, total_user_count: int) -> float | int:
     # - This option has no votes
     if total_user_count == 0:
         return 0
-    if len(option.votes) == 0:
+    if option.voter_count == 0:
         return 0
 
-    poll_vote_count = sum([vote.vote_count for vote in option.poll.votes])
+    poll_vote_count = option.poll.vote_sum
     if poll_vote_count == 0:
         return 0
 
     if poll_allows_cumulative_votes(option.poll):
-        option_vote_count = sum([vote.vote_count for vote in option.votes])
-
-        percentage = round(option_vote_count / poll_vote_count * 100)
+        percentage = round(option.vote_sum / poll_vote_count * 100)
 
     elif option.poll.poll_type == PollType.doodle.name:
-        score = 0
-        for vote in option.votes:
-            if vote.type == VoteResultType.yes.name:
-                score += 1
-            elif vote.type == VoteResultType.maybe.name:
-                score += 0.5
+        score = option.yes_count + option.maybe_count * 0.5
 
         return score / total_user_count * 100
     else:
-        percentage = len(option.votes) / total_user_count * 100
+        percentage = option.voter_count / total_user_count * 100
 
     return percentage
 
@@ -0,0 +1,196 @@
+"""Online conversion of the vote table into a partitioned table.
+
+The migration `e5d1f7a92c40` creates the empty partitioned table
+`vote_partitioned` and a trigger, which mirrors every change of `vote` into it.
+The migration contains its own frozen copy of the DDL below.
+The existing votes are then copied in small batches, while the bot keeps running.
+Each batch only locks its own rows for a short moment.
+
+Once everything has been copied, both tables are swapped in a single short
+transaction. The constraints and indexes of the new table get their final
+name at the same time. The old table is kept as `vote_unpartitioned` and can be dropped
+by hand, after everything has been verified.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from pollbot.models.vote import VOTE_PARTITIONS
+
+# The constraints and indexes of the vote table, which are swapped by name.
+VOTE_INDEXES = [
+    "vote_pkey",
+    "one_vote_per_option_and_user",
+    "ix_unique_single_vote",
+    "ix_unique_priority_vote",
+    "ix_vote_option_id_user_id",
+    "ix_vote_poll_id_user_id",
+    "ix_vote_user_id",
+]
+
+CREATE_PARTITIONED_TABLE = [
+    """
+    CREATE TABLE vote_partitioned (LIKE vote INCLUDING DEFAULTS)
+    PARTITION BY HASH (poll_id)
+    """,
+    *(
+        f"""
+        CREATE TABLE vote_partitioned_p{remainder} PARTITION OF vote_partitioned
+        FOR VALUES WITH (MODULUS {VOTE_PARTITIONS}, REMAINDER {remainder})
+        """
+        for remainder in range(VOTE_PARTITIONS)
+    ),
+    """
+    ALTER TABLE vote_partitioned
+    ADD CONSTRAINT vote_pkey_partitioned PRIMARY KEY (id, poll_id),
+    ADD CONSTRAINT one_vote_per_option_and_user_partitioned
+        UNIQUE (user_id, poll_id, option_id),
+    ADD CONSTRAINT vote_option_id_fkey
+        FOREIGN KEY (option_id) REFERENCES option (id) ON DELETE CASCADE,
+    ADD CONSTRAINT vote_poll_id_fkey
+        FOREIGN KEY (poll_id) REFERENCES poll (id) ON DELETE CASCADE,
+    ADD CONSTRAINT vote_user_id_fkey
+        FOREIGN KEY (user_id) REFERENCES "user" (id) ON DELETE CASCADE
+    """,
+    """
+    CREATE UNIQUE INDEX ix_unique_single_vote_partitioned
+    ON vote_partitioned (user_id, poll_id) WHERE poll_type = 'single_vote'
+    """,
+    """
+    CREATE UNIQUE INDEX ix_unique_priority_vote_partitioned
+    ON vote_partitioned (user_id, poll_id, priority) WHERE poll_type = 'priority'
+    """,
+    """
+    CREATE INDEX ix_vote_option_id_user_id_partitioned
+    ON vote_partitioned (option_id, user_id)
+    """,
+    """
+    CREATE INDEX ix_vote_poll_id_user_id_partitioned
+    ON vote_partitioned (poll_id, user_id)
+    """,
+    """
+    CREATE INDEX ix_vote_user_id_partitioned ON vote_partitioned (user_id)
+    """,
+]
+
+# Mirror every change of the old table, while the votes are being copied.
+# An update is mirrored as delete and insert, since rows that haven't been
+# copied yet can't be updated.
+CREATE_TRIGGER = [
+    """
+    CREATE FUNCTION sync_vote_partitioned() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM vote_partitioned
+            WHERE id = OLD.id AND poll_id = OLD.poll_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO vote_partitioned SELECT NEW.* ON CONFLICT DO NOTHING;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER sync_vote_partitioned
+    AFTER INSERT OR UPDATE OR DELETE ON vote
+    FOR EACH ROW EXECUTE FUNCTION sync_vote_partitioned()
+    """,
+]
+
+
+NEXT_BATCH = text(
+    """
+    SELECT max(id) FROM (
+        SELECT id FROM vote WHERE id > :after ORDER BY id LIMIT :size
+    ) AS batch
+    """
+)
+
+# Rows that are changed concurrently have already been mirrored by the trigger.
+COPY_BATCH = text(
+    """
+    WITH batch AS (
+        SELECT * FROM vote WHERE id > :after AND id <= :until FOR SHARE
+    )
+    INSERT INTO vote_partitioned SELECT * FROM batch ON CONFLICT DO NOTHING
+    """
+)
+
+
+def is_partitioned(session: Session | Connection) -> bool:
+    """Check whether the vote table already is partitioned."""
+    return session.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'vote'::regclass")
+    ).scalar()
+
+
+def prepare_partitioned_table(session: Session | Connection) -> None:
+    """Create the empty partitioned table and start mirroring all changes."""
+    for statement in CREATE_PARTITIONED_TABLE + CREATE_TRIGGER:
+        session.execute(text(statement))
+
+
+def drop_partitioned_table(session: Session | Connection) -> None:
+    """Stop mirroring and remove the partitioned table before the swap."""
+    swapped = session.execute(text("SELECT to_regclass('vote_unpartitioned')"))
+    if swapped.scalar() is not None:
+        raise Exception(
+            "The vote table has already been swapped. "
+            "Swap it back by hand, before downgrading."
+        )
+
+    session.execute(text("DROP TRIGGER IF EXISTS sync_vote_partitioned ON vote"))
+    session.execute(text("DROP FUNCTION IF EXISTS sync_vote_partitioned()"))
+    session.execute(text("DROP TABLE IF EXISTS vote_partitioned"))
+
+
+def copy_vote_batch(session: Session, after: int, size: int) -> int | None:
+    """Copy the next batch of votes with an id bigger than `after`.
+
+    Returns the last copied id or None, if there's nothing left to copy.
+    """
+    until = session.execute(NEXT_BATCH, {"after": after, "size": size}).scalar()
+    if until is None:
+        return None
+
+    session.execute(COPY_BATCH, {"after": after, "until": until})
+
+    return until
+
+
+def swap_vote_tables(session: Session) -> None:
+    """Replace the vote table by the partitioned table.
+
+    The vote table is locked for the duration of the transaction.
+    This only renames things and is therefore fast.
+    """
+    session.execute(text("LOCK TABLE vote IN ACCESS EXCLUSIVE MODE"))
+    session.execute(text("DROP TRIGGER sync_vote_partitioned ON vote"))
+    session.execute(text("DROP FUNCTION sync_vote_partitioned()"))
+
+    session.execute(text("ALTER TABLE vote RENAME TO vote_unpartitioned"))
+    session.execute(text("ALTER TABLE vote_partitioned RENAME TO vote"))
+    for name in VOTE_INDEXES:
+        session.execute(text(f"ALTER INDEX {name} RENAME TO {name}_unpartitioned"))
+        session.execute(text(f"ALTER INDEX {name}_partitioned RENAME TO {name}"))
+
+    partitions = (
+        session.execute(
+            text(
+                """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = 'vote'::regclass
+            """
+            )
+        )
+        .scalars()
+        .all()
+    )
+    for partition in partitions:
+        remainder = partition.rsplit("_p", 1)[1]
+        session.execute(text(f"ALTER TABLE {partition} RENAME TO vote_p{remainder}"))
+
+    # Otherwise the sequence would be dropped together with the old table.
+    session.execute(text("ALTER SEQUENCE vote_id_seq OWNED BY vote.id"))
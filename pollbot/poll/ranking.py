@@ -0,0 +1,152 @@
+"""Ranked-choice results of priority polls.
+
+All votes of a poll are loaded with a single query into a matrix of ranks,
+with one row per voter and one column per option. All tallies are then
+computed on the whole matrix at once:
+
+- Borda: Each option gets `option count - priority` points from each voter.
+- Condorcet: The option, that beats every other option in a head-to-head comparison.
+- Instant runoff: The option with the fewest first preferences is eliminated,
+    until one option has the majority of the first preferences.
+"""
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.models import Poll, Vote
+
+
+class PriorityResult:
+    """The outcome of a priority poll.
+
+    Everything is stored as plain python types and keyed by option id.
+    """
+
+    def __init__(
+        self,
+        points: dict[int, int],
+        runoff_winner: int | None,
+        runoff_rounds: int,
+        condorcet_winner: int | None,
+    ) -> None:
+        """Contructor."""
+        self.points = points
+        self.runoff_winner = runoff_winner
+        self.runoff_rounds = runoff_rounds
+        self.condorcet_winner = condorcet_winner
+
+
+def get_priority_result(session: scoped_session, poll: Poll) -> PriorityResult:
+    """Compute all tallies of a priority poll."""
+    option_ids = np.array(sorted(option.id for option in poll.options), dtype=np.int64)
+    ranks = load_ranks(session, poll, option_ids)
+
+    points = get_borda_points(ranks)
+    runoff_winner, rounds = get_runoff_winner(ranks, points)
+    condorcet_winner = get_condorcet_winner(get_pairwise_wins(ranks))
+
+    def option_id(index):
+        return None if index is None else int(option_ids[index])
+
+    return PriorityResult(
+        dict(zip(option_ids.tolist(), points.tolist())),
+        option_id(runoff_winner),
+        len(rounds),
+        option_id(condorcet_winner),
+    )
+
+
+def load_ranks(
+    session: scoped_session, poll: Poll, option_ids: np.ndarray
+) -> np.ndarray:
+    """Load the priorities of all voters as a (voter, option) matrix.
+
+    Options without a vote are ranked behind all other options.
+    """
+    option_count = len(option_ids)
+    votes = session.execute(
+        select(Vote.user_id, Vote.option_id, Vote.priority)
+        .where(Vote.poll_id == poll.id)
+        .where(Vote.priority.isnot(None))
+    ).all()
+    if not votes or option_count == 0:
+        return np.empty((0, option_count), dtype=np.int32)
+
+    votes = np.array(votes, dtype=np.int64)
+    voters, voter_index = np.unique(votes[:, 0], return_inverse=True)
+    option_index = np.searchsorted(option_ids, votes[:, 1])
+    # Votes of removed options
+    known = option_ids[np.minimum(option_index, option_count - 1)] == votes[:, 1]
+
+    ranks = np.full((len(voters), option_count), option_count, dtype=np.int32)
+    ranks[voter_index[known], option_index[known]] = votes[known, 2]
+
+    return ranks
+
+
+def get_borda_points(ranks: np.ndarray) -> np.ndarray:
+    """Get the points of each option."""
+    option_count = ranks.shape[1]
+    points = np.where(ranks < option_count, option_count - ranks, 0)
+
+    return points.sum(axis=0)
+
+
+def get_pairwise_wins(ranks: np.ndarray) -> np.ndarray:
+    """Count the voters, that prefer option i over option j, as `wins[i, j]`."""
+    option_count = ranks.shape[1]
+    wins = np.zeros((option_count, option_count), dtype=np.int64)
+    for option in range(option_count):
+        wins[option] = (ranks[:, [option]] < ranks).sum(axis=0)
+
+    return wins
+
+
+def get_condorcet_winner(wins: np.ndarray) -> int | None:
+    """Get the option, that beats all other options, if there is one."""
+    option_count = wins.shape[0]
+    beaten = (wins > wins.T).sum(axis=1)
+    winners = np.flatnonzero(beaten == option_count - 1)
+    if option_count == 0 or len(winners) == 0:
+        return None
+
+    return int(winners[0])
+
+
+def get_runoff_winner(
+    ranks: np.ndarray, points: np.ndarray
+) -> tuple[int | None, list[np.ndarray]]:
+    """Run an instant-runoff election.
+
+    Ties for the last place are broken by the Borda points.
+    Returns the winner, or None on a complete tie, and the votes of each round.
+    """
+    voter_count, option_count = ranks.shape
+    active = np.ones(option_count, dtype=bool)
+    rounds = []
+    while active.any():
+        # The highest ranked option of each voter, that's still in the race
+        masked = np.where(active, ranks, option_count)
+        first = masked.argmin(axis=1)
+        counted = masked[np.arange(voter_count), first] < option_count
+        votes = np.bincount(first[counted], minlength=option_count)
+        rounds.append(votes)
+
+        total = counted.sum()
+        if total == 0:
+            return None, rounds
+
+        candidates = np.flatnonzero(active)
+        leader = candidates[votes[candidates].argmax()]
+        if votes[leader] * 2 > total or len(candidates) == 1:
+            return int(leader), rounds
+
+        fewest = candidates[votes[candidates] == votes[candidates].min()]
+        losers = fewest[points[fewest] == points[fewest].min()]
+        # Nothing can separate the remaining options
+        if len(losers) == len(candidates):
+            return None, rounds
+
+        active[losers[-1]] = False
+
+    return None, rounds
@@ -0,0 +1,223 @@
+"""Search the polls of a user for inline queries.
+
+The name and description of polls have trigram indexes, which are used for the
+`ILIKE '%query%'` filter. Results are ranked by their similarity to the query.
+
+Results are paginated with a keyset instead of an offset.
+The keyset of the last poll of a page is passed to Telegram as `next_offset`,
+which is sent back to us, once the user scrolls down.
+
+Search results are cached per user and search generation.
+The generation of a user is the time of the last change to one of their polls,
+which is visible in search results. It's stored in `User.polls_changed_at` in the
+same transaction as the change. The generation is thereby the same for all
+processes, no matter which process handled the change.
+"""
+import math
+from datetime import datetime
+
+from sqlalchemy import and_, cast, event, func, inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.scoping import scoped_session
+
+from pollbot.helper.cache import LRUCache
+from pollbot.models import Poll, User
+from pollbot.poll.loading import LIST_VIEW
+
+SEARCH_PAGE_SIZE = 10
+
+# Poll columns, that decide which polls are found and in which order.
+# Changes to anything else, e.g. the locale or the amount of inline shares,
+# only affect the prebuilt results and show up once the cached results expire.
+SEARCH_POLL_COLUMNS = [
+    "name",
+    "description",
+    "created",
+    "closed",
+    "delete",
+]
+
+# Telegram sends a new inline query for each keystroke and sends the same query
+# again, when a user deletes a character. Changes invalidate the cache via the
+# search generation. The time to live guards against bulk updates, which bypass
+# the session, and against changes, that don't affect which polls are found.
+search_results = LRUCache(max_size=10000, ttl=60)
+
+# The change time is written during the flush, the commit follows shortly after.
+COMMIT_GRACE_SECONDS = 1.0
+
+
+def get_search_generation(user: User) -> float:
+    """Get the current search generation of a user."""
+    if user.polls_changed_at is None:
+        return 0
+
+    return user.polls_changed_at.timestamp()
+
+
+def get_last_poll_change(user: User) -> float | None:
+    """Get the time of the last change to the listed polls of a user.
+
+    A read replica has to contain this change, before it may be used for the user.
+    """
+    if user.polls_changed_at is None:
+        return None
+
+    return user.polls_changed_at.timestamp() + COMMIT_GRACE_SECONDS
+
+
+def search_polls(
+    session: scoped_session, user: User, query: str, closed: bool, offset: str
+) -> tuple[list[Poll], str]:
+    """Search the polls of a user and return a single page of results.
+
+    An empty query returns the most recent polls.
+    Returns the found polls and the offset of the next page.
+    The offset is empty, if there are no further results.
+    """
+    key = (user.id, get_search_generation(user), query, closed, offset)
+    cached = search_results.get(key)
+    if cached is None:
+        cached = find_poll_ids(session, user, query, closed, offset)
+        search_results.set(key, cached)
+
+    poll_ids, next_offset = cached
+    if not poll_ids:
+        return [], next_offset
+
+    polls = session.query(Poll).options(*LIST_VIEW).filter(Poll.id.in_(poll_ids))
+    polls_by_id = {poll.id: poll for poll in polls}
+    # Polls might have been deleted in the meantime
+    polls = [polls_by_id[poll_id] for poll_id in poll_ids if poll_id in polls_by_id]
+
+    return polls, next_offset
+
+
+def find_poll_ids(
+    session: scoped_session, user: User, query: str, closed: bool, offset: str
+) -> tuple[list[int], str]:
+    """Get the ids of a single page of matching polls and the next offset."""
+    statement = (
+        select(Poll.id)
+        .where(Poll.user_id == user.id)
+        .where(Poll.closed.is_(closed))
+        .where(Poll.created.is_(True))
+        .where(Poll.delete.is_(None))
+        .limit(SEARCH_PAGE_SIZE)
+    )
+
+    # Just display all polls, starting with the newest
+    if query == "":
+        after = parse_offset(offset, 1)
+        if after is not None:
+            statement = statement.where(Poll.id < int(after[0]))
+        statement = statement.order_by(Poll.id.desc())
+
+        poll_ids = list(session.execute(statement).scalars())
+        next_offset = ""
+        if len(poll_ids) == SEARCH_PAGE_SIZE:
+            next_offset = str(poll_ids[-1])
+
+        return poll_ids, next_offset
+
+    # Find polls with the search parameter in their name or description
+    pattern = f"%{escape_like(query)}%"
+    # The similarity is a `real`. Compare it as double, which survives the
+    # round trip through the offset without losing precision.
+    rank = cast(
+        func.greatest(
+            func.similarity(Poll.name, query),
+            func.similarity(func.coalesce(Poll.description, ""), query),
+        ),
+        DOUBLE_PRECISION,
+    )
+    statement = (
+        statement.add_columns(rank)
+        .where(
+            or_(
+                Poll.name.ilike(pattern, escape="\\"),
+                Poll.description.ilike(pattern, escape="\\"),
+            )
+        )
+        .order_by(rank.desc(), Poll.id.desc())
+    )
+
+    after = parse_offset(offset, 2)
+    if after is not None:
+        rank_after, id_after = after
+        statement = statement.where(
+            or_(
+                rank < rank_after,
+                and_(rank == rank_after, Poll.id < int(id_after)),
+            )
+        )
+
+    rows = session.execute(statement).all()
+    poll_ids = [row[0] for row in rows]
+    next_offset = ""
+    if len(rows) == SEARCH_PAGE_SIZE:
+        last_id, last_rank = rows[-1]
+        next_offset = f"{last_rank!r}:{last_id}"
+
+    return poll_ids, next_offset
+
+
+def parse_offset(offset: str, parts: int) -> tuple[float, ...] | None:
+    """Parse a keyset offset. Invalid offsets start from the beginning."""
+    if offset == "":
+        return None
+
+    try:
+        values = tuple(float(value) for value in offset.split(":"))
+    except ValueError:
+        return None
+
+    if len(values) != parts or not all(math.isfinite(value) for value in values):
+        return None
+
+    return values
+
+
+def escape_like(query: str) -> str:
+    """Escape all wildcards of a LIKE pattern."""
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@event.listens_for(Session, "after_flush")
+def remember_search_changes(session: Session, _) -> None:
+    """Store the time of this change for the owners of all changed polls.
+
+    Only changes, that affect which polls are found, are stored. Other changes,
+    e.g. new inline shares of a viral poll, would serialize on the owner's row.
+
+    The users are expired instead of being set, so a rolled back savepoint
+    doesn't leave the new time behind.
+    """
+    user_ids = set()
+    for instance in list(session.new) + list(session.deleted):
+        if isinstance(instance, Poll):
+            user_ids.add(instance.user_id)
+
+    for instance in session.dirty:
+        if not isinstance(instance, Poll):
+            continue
+        attributes = inspect(instance).attrs
+        if any(attributes[key].history.has_changes() for key in SEARCH_POLL_COLUMNS):
+            user_ids.add(instance.user_id)
+
+    user_ids.discard(None)
+    if not user_ids:
+        return
+
+    session.connection().execute(
+        update(User.__table__)
+        .where(User.id.in_(sorted(user_ids)))
+        .values(polls_changed_at=datetime.now(), updated_at=User.updated_at)
+    )
+    for user_id in user_ids:
+        user = session.identity_map.get(
+            inspect(User).identity_key_from_primary_key([user_id])
+        )
+        if user is not None:
+            session.expire(user, ["polls_changed_at"])
@@ -1,12 +1,21 @@
 """Update or delete poll messages."""
+from collections.abc import Iterable
 from datetime import datetime, timedelta
 
 from psycopg2.errors import UniqueViolation
+from sqlalchemy import literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import ObjectDeletedError
 from sqlalchemy.orm.scoping import scoped_session
 from telegram.bot import Bot
-from telegram.error import BadRequest, RetryAfter, TimedOut, Unauthorized
+from telegram.error import (
+    BadRequest,
+    RetryAfter,
+    TelegramError,
+    TimedOut,
+    Unauthorized,
+)
 
 from pollbot.display.poll.compilation import get_poll_text_and_vote_keyboard
 from pollbot.enums import ExpectedInput, ReferenceType
@@ -102,6 +111,33 @@ def update_poll_messages(
             update_poll_messages(session, bot, poll)
 
 
+def schedule_poll_updates(session: scoped_session, poll_ids: Iterable[int]) -> None:
+    """Schedule message updates for many polls with a single statement.
+
+    Closed polls and polls, that are about to be deleted, are skipped.
+    Existing updates are handled the same way as in `update_poll_messages`.
+    """
+    poll_ids = list(poll_ids)
+    if not poll_ids:
+        return
+
+    now = datetime.now()
+    polls = (
+        select(Poll.id, literal(now), literal(0))
+        .where(Poll.id.in_(poll_ids))
+        .where(Poll.closed.is_(False))
+        .where(Poll.delete.is_(None))
+    )
+    statement = insert(Update.__table__).from_select(
+        ["poll_id", "next_update", "count"], polls
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="one_update_per_poll",
+        set_={"count": Update.count + 1, "next_update": now},
+    )
+    session.execute(statement)
+
+
 def send_updates(session: scoped_session, bot: Bot, poll: Poll) -> None:
     """Actually update all messages."""
     for reference in poll.references:
@@ -143,62 +179,78 @@ def update_reference(
     reference: Reference,
     first_try: bool = False,
 ) -> None:
+    message = get_reference_message(session, poll, reference)
+    if message is None:
+        return
+
     try:
-        # Admin poll management interface
-        if reference.type == ReferenceType.admin.name and not poll.in_settings:
-            text, keyboard = get_poll_text_and_vote_keyboard(
-                session, poll, user=poll.user, show_back=True
-            )
+        bot.edit_message_text(**message)
+    except TelegramError as e:
+        handle_reference_error(session, poll, reference, e, first_try)
 
-            if poll.user.expected_input != ExpectedInput.votes.name:
-                keyboard = get_management_keyboard(poll)
 
-            bot.edit_message_text(
-                text,
-                chat_id=reference.user.id,
-                message_id=reference.message_id,
-                reply_markup=keyboard,
-                parse_mode="markdown",
-                disable_web_page_preview=True,
-            )
+def get_reference_message(
+    session: scoped_session, poll: Poll, reference: Reference
+) -> dict | None:
+    """Render the message of a reference.
 
-        # User that votes in private chat (priority vote)
-        elif reference.type == ReferenceType.private_vote.name:
-            text, keyboard = get_poll_text_and_vote_keyboard(
-                session,
-                poll,
-                user=reference.user,
-            )
+    Returns the arguments of the `editMessageText` call, that updates the reference.
+    """
+    # Admin poll management interface
+    if reference.type == ReferenceType.admin.name and not poll.in_settings:
+        text, keyboard = get_poll_text_and_vote_keyboard(
+            session, poll, user=poll.user, show_back=True
+        )
 
-            bot.edit_message_text(
-                text,
-                chat_id=reference.user.id,
-                message_id=reference.message_id,
-                reply_markup=keyboard,
-                parse_mode="markdown",
-                disable_web_page_preview=True,
-            )
+        if poll.user.expected_input != ExpectedInput.votes.name:
+            keyboard = get_management_keyboard(poll)
 
-        # Edit message created via inline query
-        elif reference.type == ReferenceType.inline.name:
-            # Create text and keyboard
-            text, keyboard = get_poll_text_and_vote_keyboard(session, poll)
-
-            bot.edit_message_text(
-                text,
-                inline_message_id=reference.bot_inline_message_id,
-                reply_markup=keyboard,
-                parse_mode="markdown",
-                disable_web_page_preview=True,
-            )
+        target = {"chat_id": reference.user.id, "message_id": reference.message_id}
 
-    except BadRequest as e:
+    # User that votes in private chat (priority vote)
+    elif reference.type == ReferenceType.private_vote.name:
+        text, keyboard = get_poll_text_and_vote_keyboard(
+            session,
+            poll,
+            user=reference.user,
+        )
+
+        target = {"chat_id": reference.user.id, "message_id": reference.message_id}
+
+    # Edit message created via inline query
+    elif reference.type == ReferenceType.inline.name:
+        # Create text and keyboard
+        text, keyboard = get_poll_text_and_vote_keyboard(session, poll)
+
+        target = {"inline_message_id": reference.bot_inline_message_id}
+
+    else:
+        return None
+
+    return {
+        "text": text,
+        **target,
+        "reply_markup": keyboard,
+        "parse_mode": "markdown",
+        "disable_web_page_preview": True,
+    }
+
+
+def handle_reference_error(
+    session: scoped_session,
+    poll: Poll,
+    reference: Reference,
+    error: TelegramError,
+    first_try: bool = False,
+) -> None:
+    """Handle a failed update of a reference. Unexpected errors are raised again."""
+    if isinstance(error, BadRequest):
         if (
-            e.message.startswith("Message_id_invalid")
-            or e.message.startswith("Message can't be edited")
-            or e.message.startswith("Message to edit not found")
-            or e.message.startswith("Chat not found")
-            or e.message.startswith("Can't access the chat")
+            error.message.startswith("Message_id_invalid")
+            or error.message.startswith("Message can't be edited")
+            or error.message.startswith("Message to edit not found")
+            or error.message.startswith("Chat not found")
+            or error.message.startswith("Can't access the chat")
         ):
             # Sometimes it fells like we're too fast and the message isn't synced between Telegram's servers yet.
             # If this happens, allow the first try to fail and schedule an update.
@@ -211,16 +263,18 @@ def update_reference(
 
             session.delete(reference)
             session.flush()
-        elif e.message.startswith("Message is not modified") or e.message.startswith(
-            "Message_author_required"
-        ):
+        elif error.message.startswith(
+            "Message is not modified"
+        ) or error.message.startswith("Message_author_required"):
             pass
         else:
-            raise e
+            raise error
 
-    except Unauthorized:
+    elif isinstance(error, Unauthorized):
         session.delete(reference)
         session.flush()
-    except TimedOut:
+    elif isinstance(error, TimedOut):
         # Ignore timeouts during updates for now
         pass
+    else:
+        raise error
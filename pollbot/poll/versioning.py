@@ -0,0 +1,137 @@
+"""Render versions of polls and options.
+
+Every change, that affects the text of a poll, increases the poll's version.
+Changes to votes or an option additionally increase the version of the option.
+Rendered poll texts can then be cached by those versions.
+
+The versions are increased with `version = version + 1` in SQL and not in Python.
+The row lock of this update serializes concurrent changes to the same poll,
+which guarantees that a single version always describes a single poll state.
+"""
+from collections.abc import Iterable
+from itertools import chain
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from pollbot.models import Option, Poll, User, Vote
+
+# Poll columns that have no influence on the rendered poll.
+IGNORED_POLL_COLUMNS = {
+    "updated_at",
+    "version",
+    "next_notification",
+    "delete",
+    "expected_input",
+    "in_settings",
+    "archived",
+}
+
+
+def increase_poll_version(
+    session: Session, poll_ids: Iterable[int], option_ids: Iterable[int] = ()
+) -> None:
+    """Increase the render version of some polls and options.
+
+    The ORM does this automatically on flush.
+    Only call this after bulk operations, that bypass the session.
+    E.g. `session.query(Option).filter(...).delete()`.
+    """
+    poll_ids = sorted(set(poll_ids))
+    option_ids = sorted(set(option_ids))
+    if option_ids:
+        _increase_version(session, Option, Option.id.in_(option_ids))
+    if poll_ids:
+        _increase_version(session, Poll, Poll.id.in_(poll_ids))
+
+
+def _increase_version(session: Session, model: type, condition) -> None:
+    """Increase the version of all matching rows.
+
+    The new version is set on all instances that are loaded in this session.
+    This avoids a refresh, as soon as the version is accessed.
+    """
+    statement = (
+        update(model.__table__)
+        .where(condition)
+        .values(version=model.version + 1)
+        .returning(model.id, model.version)
+    )
+    rows = session.connection().execute(statement)
+    for row_id, version in rows:
+        instance = session.identity_map.get(
+            inspect(model).identity_key_from_primary_key([row_id])
+        )
+        if instance is not None:
+            set_committed_value(instance, "version", version)
+
+    session.info["render_versions_changed"] = True
+
+
+def _has_changes(instance, ignored: set[str] = frozenset()) -> bool:
+    """Check whether any column attribute of this instance has been changed."""
+    state = inspect(instance)
+    for attribute in state.mapper.column_attrs:
+        if attribute.key in ignored:
+            continue
+        if state.attrs[attribute.key].history.has_changes():
+            return True
+
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def increase_versions_after_flush(session: Session, _) -> None:
+    """Increase the versions of all polls and options, that changed in this flush.
+
+    All primary keys are available at this point.
+    `session.new`, `session.dirty` and `session.deleted` still show the pre-flush state.
+    """
+    poll_ids = set()
+    option_ids = set()
+    renamed_user_ids = set()
+
+    for instance in chain(session.new, session.deleted):
+        if isinstance(instance, Vote):
+            poll_ids.add(instance.poll_id)
+            option_ids.add(instance.option_id)
+        elif isinstance(instance, Option):
+            poll_ids.add(instance.poll_id)
+
+    for instance in session.dirty:
+        if isinstance(instance, Vote) and _has_changes(instance):
+            poll_ids.add(instance.poll_id)
+            option_ids.add(instance.option_id)
+        elif isinstance(instance, Option) and _has_changes(instance, {"updated_at"}):
+            poll_ids.add(instance.poll_id)
+            option_ids.add(instance.id)
+        elif isinstance(instance, Poll) and _has_changes(
+            instance, IGNORED_POLL_COLUMNS
+        ):
+            poll_ids.add(instance.id)
+        elif (
+            isinstance(instance, User)
+            and inspect(instance).attrs.name.history.has_changes()
+        ):
+            renamed_user_ids.add(instance.id)
+
+    # Deleted rows are simply not updated.
+    poll_ids.discard(None)
+    option_ids.discard(None)
+    increase_poll_version(session, poll_ids, option_ids)
+
+    # The names of voters are displayed in the polls they voted on.
+    # Archived polls have no votes in the vote table and thereby keep the old names.
+    if renamed_user_ids:
+        votes = select(Vote.option_id).where(Vote.user_id.in_(renamed_user_ids))
+        _increase_version(session, Option, Option.id.in_(votes))
+        votes = select(Vote.poll_id).where(Vote.user_id.in_(renamed_user_ids))
+        _increase_version(session, Poll, Poll.id.in_(votes))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def reset_changed_versions(session: Session, *args) -> None:
+    """Versions of this transaction are either persisted or thrown away."""
+    session.info.pop("render_versions_changed", None)
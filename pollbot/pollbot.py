@@ -12,14 +12,7 @@ from telegram.ext import (
 )
 
 from pollbot.config import config
-from pollbot.telegram.callback_handler import (
-    handle_async_callback_query,
-    handle_callback_query,
-)
-from pollbot.telegram.callback_handler.mapping import (
-    get_async_callback_mapping_regex,
-    get_callback_mapping_regex,
-)
+from pollbot.telegram.callback_handler import route_callback_query
 from pollbot.telegram.commands.admin import broadcast, reset_broadcast, test_broadcast
 from pollbot.telegram.commands.external import notify
 from pollbot.telegram.commands.misc import send_help
@@ -40,6 +33,7 @@ from pollbot.telegram.job import (
     delete_polls,
     message_update_job,
     perma_ban_checker,
+    refresh_admin_stats,
     send_notifications,
 )
 from pollbot.telegram.message_handler import handle_private_text
@@ -193,16 +187,7 @@ dispatcher.add_handler(
 )
 
 # Callback handler
-dispatcher.add_handler(
-    CallbackQueryHandler(handle_callback_query, pattern=get_callback_mapping_regex())
-)
-dispatcher.add_handler(
-    CallbackQueryHandler(
-        handle_async_callback_query,
-        pattern=get_async_callback_mapping_regex(),
-        run_async=True,
-    )
-)
+dispatcher.add_handler(CallbackQueryHandler(route_callback_query))
 
 # InlineQuery handler
 dispatcher.add_handler(InlineQueryHandler(search, run_async=True))
@@ -236,6 +221,12 @@ job_queue.run_repeating(
     first=0,
     name="Create daily statistic entities.",
 )
+job_queue.run_repeating(
+    refresh_admin_stats,
+    interval=15 * minute,
+    first=0,
+    name="Refresh the admin statistics.",
+)
 job_queue.run_repeating(
     perma_ban_checker,
     interval=1 * hour,
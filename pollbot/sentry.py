@@ -1,8 +1,9 @@
-"""Simple wrapper around sentry that allows for lazy initilization."""
+"""Simple wrapper around sentry that allows for lazy initilization.
+
+The sentry sdk is only imported, if sentry is enabled.
+"""
 import traceback
 
-import sentry_sdk
-from sentry_sdk import configure_scope
 from telegram.error import NetworkError, TimedOut
 
 from pollbot.config import config
@@ -35,6 +36,8 @@ class Sentry:
     def __init__(self):
         """Construct new sentry wrapper."""
         if config["logging"]["sentry_enabled"]:
+            import sentry_sdk
+
             self.initialized = True
             sentry_sdk.init(
                 config["logging"]["sentry_token"],
@@ -45,7 +48,9 @@ class Sentry:
         if not self.initialized:
             return
 
-        with configure_scope() as scope:
+        import sentry_sdk
+
+        with sentry_sdk.configure_scope() as scope:
             if tags is not None:
                 for key, tag in tags.items():
                     scope.set_tag(key, tag)
@@ -57,12 +62,17 @@ class Sentry:
             scope.set_tag("bot", "pollbot")
             sentry_sdk.capture_message(message, level)
 
-    def capture_exception(self, tags=None, extra=None):
-        """Capture exception with sentry."""
+    def capture_exception(self, tags=None, extra=None, exception=None):
+        """Capture exception with sentry.
+
+        Without an explicit exception, the currently handled one is captured.
+        """
         if not self.initialized:
             return
 
-        with configure_scope() as scope:
+        import sentry_sdk
+
+        with sentry_sdk.configure_scope() as scope:
             if tags is not None:
                 for key, tag in tags.items():
                     scope.set_tag(key, tag)
@@ -72,7 +82,16 @@ class Sentry:
                     scope.set_extra(key, extra)
 
             scope.set_tag("bot", "pollbot")
-            sentry_sdk.capture_exception()
+            sentry_sdk.capture_exception(exception)
+
+    def add_breadcrumb(self, **kwargs):
+        """Add a breadcrumb to the current scope."""
+        if not self.initialized:
+            return
+
+        import sentry_sdk
+
+        sentry_sdk.add_breadcrumb(**kwargs)
 
     def capture_job_exception(self, exception):
         # Capture all exceptions from jobs. We need to handle those inside the jobs
@@ -80,7 +99,7 @@ class Sentry:
             if config["logging"]["debug"]:
                 traceback.print_exc()
 
-            sentry.capture_exception(tags={"handler": "job"})
+            sentry.capture_exception(tags={"handler": "job"}, exception=exception)
 
 
 sentry = Sentry()
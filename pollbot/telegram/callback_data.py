@@ -0,0 +1,138 @@
+"""Encoding and decoding of callback data.
+
+Telegram limits callback data to 64 bytes, so the data is kept as compact as possible.
+
+Version 1 payloads look like `~1o14:2n9:20`:
+- `~1` The format version.
+- `o` The type of the referenced entity (see `CallbackEntity`).
+- `14` The callback type in base 36.
+- `2n9` The id of the referenced entity in base 36.
+- `20` The action, which may contain further `:` separated values.
+
+All buttons below poll messages use this format. The private menus, that haven't
+been moved yet, and buttons of old messages use the legacy format `{callback_type}:{poll_id}:{action}`.
+The entity of legacy payloads is derived from their callback type.
+"""
+from pollbot.enums import CallbackEntity, CallbackType
+
+VERSION_PREFIX = "~1"
+
+# The payload of those callback types doesn't reference a poll
+LEGACY_ENTITIES = {
+    CallbackType.vote: CallbackEntity.option,
+}
+
+ENTITIES = {entity.value: entity for entity in CallbackEntity}
+
+BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+class CallbackData:
+    """Decoded callback data."""
+
+    def __init__(
+        self,
+        version: int,
+        callback_type: CallbackType,
+        entity: CallbackEntity,
+        entity_id: int,
+        action: str,
+    ) -> None:
+        """Contructor."""
+        self.version = version
+        self.callback_type = callback_type
+        self.entity = entity
+        self.entity_id = entity_id
+        self.action = action
+
+    @property
+    def parts(self) -> list[str]:
+        """The data in the legacy `type:payload:action[:...]` layout."""
+        return [
+            str(self.callback_type.value),
+            str(self.entity_id),
+            *self.action.split(":"),
+        ]
+
+
+def encode_callback(
+    callback_type: CallbackType,
+    entity: CallbackEntity = CallbackEntity.none,
+    entity_id: int = 0,
+    action: object = 0,
+) -> str:
+    """Encode callback data in the current version."""
+    return (
+        f"{VERSION_PREFIX}{entity.value}{to_base36(callback_type.value)}:"
+        f"{to_base36(entity_id)}:{action}"
+    )
+
+
+def decode_callback(data: str) -> CallbackData:
+    """Decode callback data of any version.
+
+    Raises a `ValueError` for malformed data.
+    """
+    if data.startswith(VERSION_PREFIX):
+        body = data[len(VERSION_PREFIX) :]
+        if body[:1] not in ENTITIES:
+            raise ValueError(f"Unknown callback entity in {data}")
+
+        callback_type, entity_id, action = body[1:].split(":", 2)
+        return CallbackData(
+            1,
+            CallbackType(int(callback_type, 36)),
+            ENTITIES[body[0]],
+            int(entity_id, 36),
+            action,
+        )
+
+    callback_type, entity_id, action = data.split(":", 2)
+    callback_type = CallbackType(int(callback_type))
+    entity_id = int(entity_id)
+    if entity_id == 0:
+        entity = CallbackEntity.none
+    else:
+        entity = LEGACY_ENTITIES.get(callback_type, CallbackEntity.poll)
+
+    return CallbackData(0, callback_type, entity, entity_id, action)
+
+
+def get_vote_poll_id(callback: CallbackData) -> int | None:
+    """Get the poll of a vote button, which follows the result in the action.
+
+    Legacy vote buttons only contain the option.
+    """
+    parts = callback.action.split(":")
+    if callback.callback_type != CallbackType.vote or len(parts) < 2:
+        return None
+
+    try:
+        return int(parts[1], 36)
+    except ValueError:
+        return None
+
+
+def get_callback_type(data: str) -> CallbackType | None:
+    """Get the callback type of the data without decoding the rest of it."""
+    try:
+        if data.startswith(VERSION_PREFIX):
+            start = len(VERSION_PREFIX) + 1
+            return CallbackType(int(data[start : data.index(":", start)], 36))
+
+        return CallbackType(int(data[: data.index(":")]))
+    except ValueError:
+        return None
+
+
+def to_base36(number: int) -> str:
+    """Convert a non-negative number to base 36."""
+    if number == 0:
+        return "0"
+
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(BASE36_DIGITS[remainder])
+
+    return "".join(reversed(digits))
@@ -3,61 +3,80 @@ from datetime import date
 
 from sqlalchemy.exc import IntegrityError
 
-from pollbot.enums import CallbackType
+from pollbot.config import config
+from pollbot.enums import CallbackEntity, CallbackType
+from pollbot.helper.executor import KeyedExecutor
 from pollbot.helper.stats import increase_stat, increase_user_stat
-from pollbot.models import Option, UserStatistic
+from pollbot.models import UserStatistic
+from pollbot.telegram.callback_data import (
+    decode_callback,
+    get_callback_type,
+    get_vote_poll_id,
+)
 from pollbot.telegram.callback_handler.context import CallbackContext  # noqa
 from pollbot.telegram.session import callback_query_wrapper
 
 from .context import get_context
-from .mapping import async_callback_mapping, callback_mapping
+from .mapping import callback_mapping
 from .vote import handle_vote
 
 
-@callback_query_wrapper
-def handle_callback_query(bot, update, session, user):
-    """Handle synchronous callback queries.
+# Callbacks of the same user or poll are handled strictly one after another.
+# Everything else is handled in parallel.
+callback_executor = KeyedExecutor(config["telegram"]["callback_worker_count"])
+
 
-    Some critical callbacks shouldn't be allowed to be asynchronous,
-    since they tend to cause race conditions and integrity errors in the database
-    schema. That's why some calls are restricted to be synchronous.
+def route_callback_query(update, context):
+    """Pass a callback query to the callback executor.
+
+    The callback type is looked up directly, instead of matching the callback data
+    against a pattern for each type.
+    Callbacks of unknown types are ignored.
     """
-    context = get_context(bot, update, session, user)
+    query = update.callback_query
+    if get_callback_type(query.data) not in callback_mapping:
+        return
 
-    increase_user_stat(session, context.user, "callback_calls")
-    session.commit()
-    response = callback_mapping[context.callback_type](session, context)
+    callback_executor.submit(
+        get_callback_keys(query), handle_callback_query, update, context
+    )
 
-    # Callback handler functions always return the callback answer
-    # The only exception is the vote function, which is way too complicated and
-    # implements its own callback query answer logic.
-    if response is not None and context.callback_type != CallbackType.vote:
-        context.query.answer(response)
-    else:
-        context.query.answer("")
 
-    increase_stat(session, "callback_calls")
+def get_callback_keys(query) -> list[tuple[str, int]]:
+    """Get the keys, that are used to serialize a callback query.
 
-    return
+    Votes are serialized per poll as well. Otherwise they would race with resets
+    and removed options and compete for the version and aggregates of the poll.
+    Only legacy vote buttons don't know their poll and are serialized per user.
+    """
+    keys = [("user", query.from_user.id)]
+    try:
+        callback = decode_callback(query.data)
+    except ValueError:
+        return keys
 
+    if callback.entity == CallbackEntity.poll:
+        keys.append(("poll", callback.entity_id))
+    elif callback.callback_type == CallbackType.vote:
+        poll_id = get_vote_poll_id(callback)
+        if poll_id is not None:
+            keys.append(("poll", poll_id))
 
-@callback_query_wrapper
-def handle_async_callback_query(bot, update, session, user):
-    """Handle asynchronous callback queries.
+    return keys
 
-    Most callback queries are unproblematic in terms of causing race-conditions.
-    Thereby they can be handled asynchronously.
 
-    However, we do handle votes asynchronously as an edge-case, since we want those
-    calls to be handled as fast as possible.
+@callback_query_wrapper
+def handle_callback_query(bot, update, session, user):
+    """Handle callback queries.
 
-    The race condition handling for votes is handled in the respective `handle_vote` function.
+    The callback executor guarantees, that no other callback of the same user
+    or poll is handled at the same time.
     """
     context = get_context(bot, update, session, user)
 
     # Vote logic needs some special handling
     if context.callback_type == CallbackType.vote:
-        option = session.query(Option).get(context.payload)
+        option = context.option
         if option is None:
             return
 
@@ -98,7 +117,7 @@ def handle_async_callback_query(bot, update, session, user):
     else:
         increase_user_stat(session, context.user, "callback_calls")
         session.commit()
-        response = async_callback_mapping[context.callback_type](session, context)
+        response = callback_mapping[context.callback_type](session, context)
 
     # Callback handler functions always return the callback answer
     # The only exception is the vote function, which is way too complicated and
@@ -3,6 +3,7 @@ import time
 
 from sqlalchemy.orm.scoping import scoped_session
 
+from pollbot.db import read_session
 from pollbot.display.admin import stats
 from pollbot.helper.plot import send_plots
 from pollbot.models import Poll
@@ -14,8 +15,10 @@ from pollbot.telegram.keyboard.user import get_admin_settings_keyboard
 def open_admin_settings(session: scoped_session, context: CallbackContext) -> None:
     """Open the main menu."""
     keyboard = get_admin_settings_keyboard(context.user)
+    text = stats(session)
+
     context.query.message.edit_text(
-        stats(session),
+        text,
         reply_markup=keyboard,
         parse_mode="Markdown",
         disable_web_page_preview=True,
@@ -54,4 +57,5 @@ def update_all(session: scoped_session, context: CallbackContext) -> str:
 
 def plot(session: scoped_session, context: CallbackContext) -> None:
     """Plot interesting statistics."""
-    send_plots(session, context.query.message.chat)
+    with read_session(session) as reader:
+        send_plots(reader, context.query.message.chat)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from sentry_sdk import add_breadcrumb
 from sqlalchemy.orm.scoping import scoped_session
 
-from pollbot.enums import CallbackResult, CallbackType
-from pollbot.models import Poll
+from pollbot.enums import CallbackEntity, CallbackResult
+from pollbot.models import Option, Poll
+from pollbot.poll.loading import LIST_VIEW, VOTE_CLICK
+from pollbot.sentry import sentry
+from pollbot.telegram.callback_data import decode_callback
+
+# Marks entities, that haven't been loaded yet
+UNLOADED = object()
 
 
 class CallbackContext:
@@ -12,20 +17,26 @@ class CallbackContext:
 
     def __init__(self, session: scoped_session, bot, query, user):
         """Create a new CallbackContext from a query."""
+        self.session = session
         self.bot = bot
         self.query = query
         self.user = user
 
-        # Extract the callback type, task id
-        self.data = self.query.data.split(":")
-        self.callback_type = CallbackType(int(self.data[0]))
-        self.payload = self.data[1]
+        # Extract the callback type, the referenced entity and the action
+        callback = decode_callback(self.query.data)
+        self.version = callback.version
+        self.data = callback.parts
+        self.callback_type = callback.callback_type
+        self.entity = callback.entity
+        self.payload = callback.entity_id
         try:
             self.action = int(self.data[2])
         except ValueError:
             self.action = self.data[2]
 
-        self.poll = session.query(Poll).get(self.payload)
+        # The poll and option are only loaded, once a handler accesses them
+        self._poll = UNLOADED
+        self._option = UNLOADED
 
         # Try to resolve the callback result, if possible
         self.callback_result = None
@@ -38,11 +49,36 @@ class CallbackContext:
             # Get chat entity and telegram chat
             self.tg_chat = self.query.message.chat
 
+    @property
+    def poll(self) -> Poll | None:
+        """Get the poll of this callback."""
+        if self._poll is UNLOADED:
+            if self.entity == CallbackEntity.poll:
+                self._poll = (
+                    self.session.query(Poll).options(*LIST_VIEW).get(self.payload)
+                )
+            elif self.entity == CallbackEntity.option and self.option is not None:
+                self._poll = self.option.poll
+            else:
+                self._poll = None
+
+        return self._poll
+
+    @property
+    def option(self) -> Option | None:
+        """Get the option of this callback, including its poll."""
+        if self._option is UNLOADED:
+            self._option = None
+            if self.entity == CallbackEntity.option:
+                self._option = (
+                    self.session.query(Option).options(*VOTE_CLICK).get(self.payload)
+                )
+
+        return self._option
+
     def __repr__(self):
         """Print as string."""
-        representation = (
-            f"Context: query-{self.data}, poll-({self.poll}), user-({self.user}), "
-        )
+        representation = f"Context: query-{self.data}, user-({self.user}), "
         representation += f"type-{self.callback_type}, action-{self.action}"
 
         return representation
@@ -52,14 +88,15 @@ def get_context(bot, update, session, user):
     """Create a context object for callback queries."""
     context = CallbackContext(session, bot, update.callback_query, user)
 
-    add_breadcrumb(
+    sentry.add_breadcrumb(
         crumb={
             "query": update.callback_query,
             "data": update.callback_query.data,
             "user": user,
             "callback_type": context.callback_type,
             "callback_result": context.callback_result,
-            "poll": context.poll,
+            "entity": context.entity,
+            "payload": context.payload,
         },
         category="callbacks",
     )
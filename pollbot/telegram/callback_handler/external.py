@@ -6,6 +6,7 @@ from sqlalchemy.orm.scoping import scoped_session
 
 from pollbot.decorators import poll_required
 from pollbot.display.creation import get_datepicker_text
+from pollbot.display.poll.results import get_results_page
 from pollbot.enums import ExpectedInput, ReferenceType
 from pollbot.helper.stats import increase_stat
 from pollbot.i18n import i18n
@@ -14,7 +15,10 @@ from pollbot.models.poll import Poll
 from pollbot.poll.update import try_update_reference
 from pollbot.telegram.callback_handler.context import CallbackContext
 from pollbot.telegram.keyboard.date_picker import get_external_datepicker_keyboard
-from pollbot.telegram.keyboard.external import get_external_add_option_keyboard
+from pollbot.telegram.keyboard.external import (
+    get_external_add_option_keyboard,
+    get_results_page_keyboard,
+)
 
 
 @poll_required
@@ -139,3 +143,23 @@ def update_shared(
             session.rollback()
 
     try_update_reference(session, context.bot, poll, reference)
+
+
+@poll_required
+def show_results_page(
+    session: scoped_session, context: CallbackContext, poll: Poll
+) -> None:
+    """Show the next or previous page of the results of a poll.
+
+    The action contains the direction and the keyset cursor, e.g. `n12.345.678.0`.
+    """
+    direction = context.action[0]
+    cursor = tuple(int(value) for value in context.action[1:].split("."))
+
+    page = get_results_page(session, poll, cursor, forward=direction == "n")
+    context.query.message.edit_text(
+        "\n".join(page.lines),
+        parse_mode="markdown",
+        disable_web_page_preview=True,
+        reply_markup=get_results_page_keyboard(poll, page),
+    )
@@ -8,6 +8,8 @@ from pollbot.display.poll.compilation import get_poll_text
 from pollbot.enums import PollDeletionMode
 from pollbot.i18n import i18n
 from pollbot.models.poll import Poll
+from pollbot.poll.archive import restore_poll
+from pollbot.poll.bulk import remove_votes_of_poll
 from pollbot.poll.helper import clone_poll as clone_poll_internal
 from pollbot.poll.update import update_poll_messages
 from pollbot.telegram.callback_handler.context import CallbackContext
@@ -53,6 +55,8 @@ def reopen_poll(
     """Reopen this poll."""
     if not poll.results_visible:
         return i18n.t("callback.cannot_reopen", locale=poll.user.locale)
+    # The votes have to be back, before anybody can vote again
+    restore_poll(session, poll)
     poll.closed = False
 
     # Remove the due date if it's in the past
@@ -72,8 +76,8 @@ def reopen_poll(
 @poll_required
 def reset_poll(session: scoped_session, context: CallbackContext, poll: Poll) -> str:
     """Reset this poll."""
-    for vote in poll.votes:
-        session.delete(vote)
+    restore_poll(session, poll)
+    remove_votes_of_poll(session, poll)
     session.commit()
 
     update_poll_messages(
@@ -30,6 +30,7 @@ from .external import (
     external_cancel,
     open_external_datepicker,
     open_external_menu,
+    show_results_page,
     update_shared,
 )
 from .management import (
@@ -96,38 +97,9 @@ from .user import (
 )
 from .vote import handle_vote
 
-# Some callbacks should be synchronous, since they do database operations that
-# lead to integrity/unique constraint errors when run asynchronously.
 callback_mapping = {
     # Creation
     CallbackType.all_options_entered: all_options_entered,
-    # Menu
-    CallbackType.menu_show: show_menu,
-    # Poll management
-    CallbackType.delete: delete_poll,
-    CallbackType.delete_poll_with_messages: delete_poll_with_messages,
-    CallbackType.clone: clone_poll,
-    # Settings
-    CallbackType.settings_remove_option: remove_option,
-    # Styling
-    CallbackType.settings_increase_option_index: increase_option_index,
-    CallbackType.settings_decrease_option_index: decrease_option_index,
-    # User
-    CallbackType.user_delete: delete_user,
-    CallbackType.user_delete_confirmation: delete_user_second_confirmation,
-    CallbackType.user_delete_all: delete_all,
-    CallbackType.user_delete_closed: delete_closed,
-    # Datepicker
-    CallbackType.pick_creation_date: pick_creation_date,
-    CallbackType.pick_creation_weekday: pick_creation_weekday,
-    CallbackType.pick_additional_date: pick_additional_date,
-    CallbackType.pick_additional_weekday: pick_additional_weekday,
-    CallbackType.pick_external_date: pick_external_date,
-}
-
-
-async_callback_mapping = {
-    # Creation
     CallbackType.show_poll_type_keyboard: show_poll_type_keyboard,
     CallbackType.change_poll_type: change_poll_type,
     CallbackType.toggle_anonymity: toggle_anonymity,
@@ -139,20 +111,22 @@ async_callback_mapping = {
     CallbackType.back_to_init: back_to_creation_init,
     CallbackType.anonymity_settings: open_init_anonymization_settings,
     CallbackType.ask_description: ask_description,
-    # Voting
-    CallbackType.vote: handle_vote,
-    CallbackType.update_shared: update_shared,
     # Menu
+    CallbackType.menu_show: show_menu,
     CallbackType.menu_back: go_back,
     CallbackType.menu_vote: show_vote_menu,
     CallbackType.menu_option: show_settings,
     CallbackType.menu_delete: show_deletion_confirmation,
     CallbackType.menu_close: show_close_confirmation,
     # Poll management
+    CallbackType.delete: delete_poll,
+    CallbackType.delete_poll_with_messages: delete_poll_with_messages,
+    CallbackType.clone: clone_poll,
     CallbackType.close: close_poll,
     CallbackType.reopen: reopen_poll,
     CallbackType.reset: reset_poll,
     # Settings
+    CallbackType.settings_remove_option: remove_option,
     CallbackType.settings_anonymization_confirmation: show_anonymization_confirmation,
     CallbackType.settings_anonymization: make_anonymous,
     CallbackType.settings_show_styling: show_styling_menu,
@@ -165,6 +139,8 @@ async_callback_mapping = {
     CallbackType.settings_open_language_picker: open_language_picker,
     CallbackType.settings_change_poll_language: change_poll_language,
     # Styling
+    CallbackType.settings_increase_option_index: increase_option_index,
+    CallbackType.settings_decrease_option_index: decrease_option_index,
     CallbackType.settings_toggle_percentage: toggle_percentage,
     CallbackType.settings_toggle_option_votes: toggle_option_votes,
     CallbackType.settings_toggle_date_format: toggle_date_format,
@@ -174,6 +150,10 @@ async_callback_mapping = {
     CallbackType.settings_toggle_compact_buttons: toggle_compact_buttons,
     CallbackType.settings_open_option_order_menu: open_option_order_menu,
     # User
+    CallbackType.user_delete: delete_user,
+    CallbackType.user_delete_confirmation: delete_user_second_confirmation,
+    CallbackType.user_delete_all: delete_all,
+    CallbackType.user_delete_closed: delete_closed,
     CallbackType.init_poll: init_poll,
     CallbackType.user_menu: open_main_menu,
     CallbackType.user_settings: open_user_settings,
@@ -187,46 +167,31 @@ async_callback_mapping = {
     CallbackType.open_help: open_help,
     CallbackType.user_delete_all_confirmation: delete_all_confirmation,
     CallbackType.user_delete_closed_confirmation: delete_closed_confirmation,
-    # Admin
-    CallbackType.admin_settings: open_admin_settings,
-    CallbackType.admin_plot: plot,
-    CallbackType.admin_update: update_all,
     # Datepicker
+    CallbackType.pick_creation_date: pick_creation_date,
+    CallbackType.pick_creation_weekday: pick_creation_weekday,
+    CallbackType.pick_additional_date: pick_additional_date,
+    CallbackType.pick_additional_weekday: pick_additional_weekday,
+    CallbackType.pick_external_date: pick_external_date,
     CallbackType.pick_due_date: pick_due_date,
     CallbackType.next_month: set_next_month,
     CallbackType.previous_month: set_previous_month,
+    # Voting
+    CallbackType.vote: handle_vote,
+    CallbackType.update_shared: update_shared,
+    # Admin
+    CallbackType.admin_settings: open_admin_settings,
+    CallbackType.admin_plot: plot,
+    CallbackType.admin_update: update_all,
     # External
     CallbackType.activate_notification: activate_notification,
     CallbackType.external_open_datepicker: open_external_datepicker,
     CallbackType.external_open_menu: open_external_menu,
     CallbackType.external_cancel: external_cancel,
+    CallbackType.show_results_page: show_results_page,
     # Misc
     CallbackType.switch_help: switch_help,
     CallbackType.show_option_name: show_option_name,
     # Ignore
     CallbackType.ignore: ignore,
 }
-
-
-def get_callback_mapping_regex():
-    """Get a filter regex to match synchronous callbacks"""
-    regex = ""
-    for key, _ in callback_mapping.items():
-        if regex != "":
-            regex += "|"
-
-        regex += f"^{key.value}:.*"
-
-    return regex
-
-
-def get_async_callback_mapping_regex():
-    """Get a filter regex to match asynchronous callbacks"""
-    regex = ""
-    for key, _ in async_callback_mapping.items():
-        if regex != "":
-            regex += "|"
-
-        regex += f"^{key.value}:.*"
-
-    return regex
@@ -12,6 +12,7 @@ from pollbot.enums import CallbackResult, ExpectedInput, ReferenceType
 from pollbot.i18n import i18n
 from pollbot.models import Reference
 from pollbot.models.poll import Poll
+from pollbot.poll.archive import restore_poll
 from pollbot.poll.helper import remove_old_references
 from pollbot.poll.vote import init_votes
 from pollbot.telegram.callback_handler.context import CallbackContext
@@ -54,6 +55,7 @@ def show_vote_menu(
 ) -> None:
     """Show the vote keyboard in the management interface."""
     if poll.is_priority():
+        restore_poll(session, poll)
         init_votes(session, poll, context.user)
         session.commit()
 
@@ -71,8 +73,13 @@ def show_vote_menu(
 
 
 @poll_required
-def show_settings(_: scoped_session, context: CallbackContext, poll: Poll) -> None:
+def show_settings(
+    session: scoped_session, context: CallbackContext, poll: Poll
+) -> None:
     """Show the settings tab."""
+    # All settings and styles are changed from here on.
+    # The votes have to be back, before the poll is rendered with new settings.
+    restore_poll(session, poll)
     text = get_settings_text(poll)
     keyboard = get_settings_keyboard(poll)
     context.query.message.edit_text(
@@ -11,7 +11,10 @@ from pollbot.enums import ExpectedInput
 from pollbot.i18n import i18n
 from pollbot.models import Option
 from pollbot.models.poll import Poll
+from pollbot.poll.aggregates import rebuild_aggregates
+from pollbot.poll.archive import restore_poll
 from pollbot.poll.update import update_poll_messages
+from pollbot.poll.versioning import increase_poll_version
 from pollbot.poll.vote import reorder_votes_after_option_delete
 from pollbot.telegram.callback_handler.context import CallbackContext
 from pollbot.telegram.keyboard.date_picker import (
@@ -154,7 +157,11 @@ def remove_option(
     session: scoped_session, context: CallbackContext, poll: Poll
 ) -> None:
     """Remove the option."""
+    restore_poll(session, poll)
     session.query(Option).filter(Option.id == context.action).delete()
+    # The bulk delete bypasses the session, the votes are removed by the database
+    increase_poll_version(session, [poll.id])
+    rebuild_aggregates(session, [poll.id])
 
     if poll.is_priority():
         reorder_votes_after_option_delete(session, poll)
@@ -5,8 +5,13 @@ from pollbot.display.misc import get_help_text_and_keyboard, get_poll_list
 from pollbot.display.settings import get_user_settings_text
 from pollbot.enums import PollDeletionMode
 from pollbot.i18n import i18n
+from pollbot.models import Poll
+from pollbot.poll.bulk import (
+    mark_polls_for_deletion,
+    remove_votes_of_user,
+)
 from pollbot.poll.creation import initialize_poll
-from pollbot.poll.update import update_poll_messages
+from pollbot.poll.update import schedule_poll_updates
 from pollbot.telegram.callback_handler.context import CallbackContext
 from pollbot.telegram.keyboard.user import (
     get_delete_all_confirmation_keyboard,
@@ -47,19 +52,32 @@ def open_language_menu(_: scoped_session, context: CallbackContext) -> None:
 
 def list_polls(session: scoped_session, context: CallbackContext) -> None:
     """List all open polls of a user."""
-    text, keyboard = get_poll_list(session, context.user, 0)
+    text, keyboard = get_poll_list(session, context.user)
     context.query.message.chat.send_message(text, reply_markup=keyboard)
 
 
 def list_closed_polls(session: scoped_session, context: CallbackContext) -> None:
     """List all open polls of a user."""
-    text, keyboard = get_poll_list(session, context.user, 0, closed=True)
+    text, keyboard = get_poll_list(session, context.user, closed=True)
     context.query.message.chat.send_message(text, reply_markup=keyboard)
 
 
+def get_list_cursor(context: CallbackContext) -> Poll | None:
+    """Get the first or last poll of the current page of a poll list.
+
+    Legacy payloads contain an offset instead of a poll. They start on the first page.
+    """
+    if context.version == 0:
+        return None
+
+    return context.poll
+
+
 def list_polls_navigation(session: scoped_session, context: CallbackContext) -> None:
     """List all open polls of a user."""
-    text, keyboard = get_poll_list(session, context.user, int(context.payload))
+    text, keyboard = get_poll_list(
+        session, context.user, get_list_cursor(context), forward=context.action != "p"
+    )
     context.query.message.edit_text(text, reply_markup=keyboard)
 
 
@@ -68,7 +86,11 @@ def list_closed_polls_navigation(
 ) -> None:
     """List all open polls of a user."""
     text, keyboard = get_poll_list(
-        session, context.user, int(context.payload), closed=True
+        session,
+        context.user,
+        get_list_cursor(context),
+        forward=context.action != "p",
+        closed=True,
     )
     context.query.message.edit_text(text, reply_markup=keyboard)
 
@@ -128,9 +150,7 @@ def delete_closed_confirmation(_: scoped_session, context: CallbackContext) -> N
 
 def delete_all(session: scoped_session, context: CallbackContext) -> str:
     """Delete all polls of the user."""
-    for poll in context.user.polls:
-        if poll.delete is None:
-            poll.delete = PollDeletionMode.DB_ONLY.name
+    mark_polls_for_deletion(session, context.user, PollDeletionMode.DB_ONLY)
     session.commit()
 
     open_user_settings(session, context)
@@ -139,9 +159,9 @@ def delete_all(session: scoped_session, context: CallbackContext) -> str:
 
 def delete_closed(session: scoped_session, context: CallbackContext) -> str:
     """Delete all closed polls of the user."""
-    for poll in context.user.polls:
-        if poll.delete is None:
-            poll.delete = PollDeletionMode.WITH_MESSAGES.name
+    mark_polls_for_deletion(
+        session, context.user, PollDeletionMode.WITH_MESSAGES, closed=True
+    )
     session.commit()
 
     open_user_settings(session, context)
@@ -164,27 +184,12 @@ def delete_user(session: scoped_session, context: CallbackContext) -> None:
     """Delete everything of a user and ban them forever."""
     user = context.user
 
-    for poll in context.user.polls:
-        if poll.delete is None:
-            poll.delete = PollDeletionMode.DB_ONLY.name
-    session.commit()
+    mark_polls_for_deletion(session, user, PollDeletionMode.DB_ONLY)
 
-    polls_for_update = []
-    # Delete all votes, but only update non-closed polls
-    for vote in user.votes:
-        # Make sure the poll exists (hasn't just been deleted) and is closed
-        if (
-            vote.poll is not None
-            and vote.poll not in polls_for_update
-            and not vote.poll.closed
-        ):
-            polls_for_update.append(vote.poll)
-        session.delete(vote)
-    session.flush()
-
-    for poll in polls_for_update:
-        update_poll_messages(session, context.bot, poll)
-    session.flush()
+    # Only the messages of polls, that are still open, are updated.
+    # Archives contain the user's name and are restored beforehand.
+    poll_ids = remove_votes_of_user(session, user)
+    schedule_poll_updates(session, poll_ids)
 
     user.delete()
     session.commit()
@@ -11,6 +11,7 @@ from pollbot.i18n import i18n
 from pollbot.models import Vote
 from pollbot.models.option import Option
 from pollbot.models.poll import Poll
+from pollbot.poll.archive import restore_poll
 from pollbot.poll.helper import poll_allows_cumulative_votes
 from pollbot.poll.update import update_poll_messages
 from pollbot.telegram.callback_handler.context import CallbackContext
@@ -34,6 +35,8 @@ def handle_vote(
         return
 
     poll = option.poll
+    # The votes have to be back, before they can be changed
+    restore_poll(session, poll)
     update_poll = False
     try:
         # Single vote
@@ -60,6 +63,8 @@ def handle_vote(
             raise Exception("Unknown poll type")
         session.commit()
 
+    # Votes on the same poll are handled one after another by the callback executor.
+    # Legacy vote buttons and other processes can still race, though.
     except IntegrityError:
         # Double vote. Rollback the transaction and ignore the second vote
         session.rollback()
@@ -82,6 +87,7 @@ def handle_vote(
     except NoResultFound:
         # This can happen if a user concurrently upvotes and downvotes an option.
         # -> Downvote deletes the Vote, upvote tries to change the Vote.
+        # Also priority buttons of an old message, after the votes have been reset.
         session.rollback()
         return
 
@@ -181,6 +187,7 @@ def handle_block_vote(
     locale = option.poll.locale
     existing_vote = (
         session.query(Vote)
+        .filter(Vote.poll_id == option.poll_id)
         .filter(Vote.option == option)
         .filter(Vote.user == context.user)
         .one_or_none()
@@ -209,6 +216,7 @@ def handle_limited_vote(
     locale = option.poll.locale
     existing_vote = (
         session.query(Vote)
+        .filter(Vote.poll_id == option.poll_id)
         .filter(Vote.option == option)
         .filter(Vote.user == context.user)
         .one_or_none()
@@ -261,6 +269,7 @@ def handle_cumulative_vote(
     locale = option.poll.locale
     existing_vote = (
         session.query(Vote)
+        .filter(Vote.poll_id == option.poll_id)
         .filter(Vote.option == option)
         .filter(Vote.user == context.user)
         .one_or_none()
@@ -339,6 +348,7 @@ def handle_doodle_vote(
     locale = option.poll.locale
     vote = (
         session.query(Vote)
+        .filter(Vote.poll_id == option.poll_id)
         .filter(Vote.option == option)
         .filter(Vote.user == context.user)
         .one_or_none()
@@ -374,6 +384,7 @@ def handle_priority_vote(
     """Handle a priority vote"""
     vote = (
         session.query(Vote)
+        .filter(Vote.poll_id == option.poll_id)
         .filter(Vote.option == option)
         .filter(Vote.user == context.user)
         .one()
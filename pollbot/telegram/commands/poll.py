@@ -39,7 +39,7 @@ def cancel_poll_creation(bot, update, session, user):
 @message_wrapper(private=True)
 def list_polls(bot: Bot, update: Update, session: scoped_session, user: User) -> None:
     """Get a list of all active polls."""
-    text, keyboard = get_poll_list(session, user, 0)
+    text, keyboard = get_poll_list(session, user)
     update.message.chat.send_message(text, reply_markup=keyboard)
 
 
@@ -48,5 +48,5 @@ def list_closed_polls(
     bot: Bot, update: Update, session: scoped_session, user: User
 ) -> None:
     """Get a list of all closed polls."""
-    text, keyboard = get_poll_list(session, user, 0, closed=True)
+    text, keyboard = get_poll_list(session, user, closed=True)
     update.message.chat.send_message(text, reply_markup=keyboard)
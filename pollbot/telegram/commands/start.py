@@ -1,5 +1,4 @@
 """The start command handler."""
-import time
 from uuid import UUID
 
 from sqlalchemy.orm.scoping import scoped_session
@@ -7,13 +6,10 @@ from telegram.bot import Bot
 from telegram.update import Update
 
 from pollbot.config import config
-from pollbot.display.poll.compilation import (
-    compile_poll_text,
-    get_poll_text_and_vote_keyboard,
-)
+from pollbot.display.poll.compilation import get_poll_text_and_vote_keyboard
+from pollbot.display.poll.results import get_results_page
 from pollbot.enums import ExpectedInput, ReferenceType, StartAction
 from pollbot.helper.stats import increase_stat
-from pollbot.helper.text import split_text
 from pollbot.i18n import i18n
 from pollbot.models import Poll, Reference
 from pollbot.models.user import User
@@ -21,6 +17,7 @@ from pollbot.poll.vote import init_votes
 from pollbot.telegram.keyboard.external import (
     get_external_add_option_keyboard,
     get_external_share_keyboard,
+    get_results_page_keyboard,
 )
 from pollbot.telegram.keyboard.user import get_main_keyboard
 from pollbot.telegram.session import message_wrapper
@@ -69,28 +66,14 @@ def start(bot: Bot, update: Update, session: scoped_session, user: User) -> str
             reply_markup=get_external_add_option_keyboard(poll),
         )
     elif action == StartAction.show_results:
-        # Get all lines of the poll
-        lines = compile_poll_text(session, poll)
-        # Now split the text into chunks of max 4000 characters
-        chunks = split_text(lines)
-
-        for chunk in chunks:
-            message = "\n".join(chunk)
-            try:
-                update.message.chat.send_message(
-                    message,
-                    parse_mode="markdown",
-                    disable_web_page_preview=True,
-                )
-            # Retry for Timeout error (happens quite often when sending large messages)
-            except TimeoutError:
-                time.sleep(2)
-                update.message.chat.send_message(
-                    message,
-                    parse_mode="markdown",
-                    disable_web_page_preview=True,
-                )
-            time.sleep(1)
+        # Only send the first page, the other pages are fetched on demand
+        page = get_results_page(session, poll)
+        update.message.chat.send_message(
+            "\n".join(page.lines),
+            parse_mode="markdown",
+            disable_web_page_preview=True,
+            reply_markup=get_results_page_keyboard(poll, page),
+        )
 
         update.message.chat.send_message(
             i18n.t("misc.start_after_results", locale=poll.locale),
@@ -1,7 +1,7 @@
 """Inline query handler function."""
 import uuid
 
-from sqlalchemy import or_
+from sqlalchemy import func
 from sqlalchemy.orm.scoping import scoped_session
 from telegram import (
     InlineKeyboardButton,
@@ -13,12 +13,24 @@ from telegram.bot import Bot
 from telegram.update import Update
 
 from pollbot.config import config
-from pollbot.enums import CallbackType, ReferenceType
+from pollbot.db import read_session
+from pollbot.enums import CallbackEntity, CallbackType, ReferenceType
+from pollbot.helper.cache import LRUCache
 from pollbot.i18n import i18n
-from pollbot.models import Poll
+from pollbot.models import Poll, Reference
 from pollbot.models.user import User
+from pollbot.poll.loading import LIST_VIEW
+from pollbot.poll.search import (
+    get_last_poll_change,
+    get_search_generation,
+    search_polls,
+)
+from pollbot.telegram.callback_data import encode_callback
 from pollbot.telegram.session import inline_query_wrapper
 
+# Prebuilt inline query results, see `pollbot.poll.search` for the invalidation
+inline_results = LRUCache(max_size=10000, ttl=60)
+
 
 @inline_query_wrapper
 def search(bot: Bot, update: Update, session: scoped_session, user: User) -> None:
@@ -33,142 +45,127 @@ def search(bot: Bot, update: Update, session: scoped_session, user: User) -> Non
 
     offset = update.inline_query.offset
 
-    if offset == "":
-        offset = 0
-    elif offset == "Done":
+    # Offset of older clients, that received the last page before keyset pagination
+    if offset == "Done":
         update.inline_query.answer(
             [],
             cache_time=0,
             is_personal=True,
         )
         return
-    else:
-        offset = int(offset)
-
-    if query == "":
-        # Just display all polls
-        polls = (
-            session.query(Poll)
-            .filter(Poll.user == user)
-            .filter(Poll.closed.is_(closed))
-            .filter(Poll.created.is_(True))
-            .filter(Poll.delete.is_(None))
-            .order_by(Poll.created_at.desc())
-            .limit(10)
-            .offset(offset)
-            .all()
+
+    # Prebuilt results of the user's own polls
+    key = (user.id, get_search_generation(user), query, closed, offset)
+    cached = inline_results.get(key)
+    if cached is not None:
+        results, next_offset = cached
+        update.inline_query.answer(
+            results,
+            cache_time=config["telegram"]["inline_cache_time"],
+            is_personal=True,
+            next_offset=next_offset,
         )
+        return
 
-    else:
-        # Find polls with search parameter in name or description
-        polls = (
-            session.query(Poll)
-            .filter(Poll.user == user)
-            .filter(Poll.closed.is_(closed))
-            .filter(Poll.created.is_(True))
-            .filter(Poll.delete.is_(None))
-            .filter(
-                or_(
-                    Poll.name.ilike(f"%{query}%"),
-                    Poll.description.ilike(f"%{query}%"),
-                )
-            )
-            .order_by(Poll.created_at.desc())
-            .limit(10)
-            .offset(offset)
-            .all()
+    with read_session(session, get_last_poll_change(user)) as reader:
+        polls, next_offset = search_polls(reader, user, query, closed, offset)
+        results = get_inline_results(reader, polls) if len(polls) > 0 else []
+
+    if len(results) > 0:
+        inline_results.set(key, (results, next_offset))
+        update.inline_query.answer(
+            results,
+            cache_time=config["telegram"]["inline_cache_time"],
+            is_personal=True,
+            next_offset=next_offset,
         )
+        return
 
     # Try to find polls that are shared by external people via uuid
-    if len(polls) == 0 and len(query) == 36:
+    # Those are neither cached by us nor by Telegram, since we don't
+    # notice changes of polls of other users.
+    poll = None
+    if len(query) == 36 and offset == "":
         try:
             poll_uuid = uuid.UUID(query)
             poll = (
                 session.query(Poll)
+                .options(*LIST_VIEW)
                 .filter(Poll.uuid == poll_uuid)
                 .filter(Poll.delete.is_(None))
-                .offset(offset)
                 .one_or_none()
             )
-
-            if poll is not None:
-                # Check if sharin is enabled
-                # If not, check if the owner issued the query
-                if not poll.allow_sharing and user != poll.user:
-                    polls = []
-                else:
-                    polls = [poll]
-
         except ValueError:
             pass
 
-    if len(polls) == 0:
+    # Check if sharing is enabled
+    # If not, check if the owner issued the query
+    if poll is None or (not poll.allow_sharing and user != poll.user):
         update.inline_query.answer(
             [],
             cache_time=0,
             is_personal=True,
         )
-    else:
-        results = []
-        for poll in polls:
-            inline_reference_count = 0
-            for reference in poll.references:
-                if reference.type == ReferenceType.inline.name:
-                    inline_reference_count += 1
-
-            max_share_amount = config["telegram"]["max_inline_shares"]
-            if inline_reference_count > max_share_amount:
-                text = i18n.t(
-                    "poll.shared_too_often", locale=poll.locale, amount=max_share_amount
-                )
-                results.append(
-                    InlineQueryResultArticle(
-                        uuid.uuid4(),
-                        poll.name,
-                        description=text,
-                        input_message_content=InputTextMessageContent(text),
-                    )
-                )
-                continue
-
-            text = i18n.t("poll.please_wait", locale=poll.locale)
-            data = f"{CallbackType.update_shared.value}:{poll.id}:0"
-            keyboard = InlineKeyboardMarkup(
-                [
-                    [
-                        InlineKeyboardButton(
-                            "Not syncing? Try clicking", callback_data=data
-                        )
-                    ]
-                ]
-            )
+        return
 
-            content = InputTextMessageContent(
-                text,
-                parse_mode="markdown",
-                disable_web_page_preview=True,
-            )
-            description = (
-                poll.description[:100] if poll.description is not None else None
+    update.inline_query.answer(
+        get_inline_results(session, [poll]),
+        cache_time=0,
+        is_personal=True,
+    )
+
+
+def get_inline_results(
+    session: scoped_session, polls: list[Poll]
+) -> list[InlineQueryResultArticle]:
+    """Build the inline query results for some polls."""
+    # Count the inline shares of all polls, without loading their references
+    inline_reference_counts = dict(
+        session.query(Reference.poll_id, func.count(Reference.id))
+        .filter(Reference.poll_id.in_([poll.id for poll in polls]))
+        .filter(Reference.type == ReferenceType.inline.name)
+        .group_by(Reference.poll_id)
+        .all()
+    )
+
+    results = []
+    for poll in polls:
+        inline_reference_count = inline_reference_counts.get(poll.id, 0)
+        max_share_amount = config["telegram"]["max_inline_shares"]
+        if inline_reference_count > max_share_amount:
+            text = i18n.t(
+                "poll.shared_too_often", locale=poll.locale, amount=max_share_amount
             )
             results.append(
                 InlineQueryResultArticle(
-                    poll.id,
+                    uuid.uuid4(),
                     poll.name,
-                    description=description,
-                    input_message_content=content,
-                    reply_markup=keyboard,
+                    description=text,
+                    input_message_content=InputTextMessageContent(text),
                 )
             )
+            continue
 
-        if len(polls) < 10:
-            offset = "Done"
-        else:
-            offset + 10
+        text = i18n.t("poll.please_wait", locale=poll.locale)
+        data = encode_callback(CallbackType.update_shared, CallbackEntity.poll, poll.id)
+        keyboard = InlineKeyboardMarkup(
+            [[InlineKeyboardButton("Not syncing? Try clicking", callback_data=data)]]
+        )
 
-        update.inline_query.answer(
-            results,
-            cache_time=0,
-            is_personal=True,
-            next_offset=str(offset),
+        content = InputTextMessageContent(
+            text,
+            parse_mode="markdown",
+            disable_web_page_preview=True,
         )
+        description = poll.description[:100] if poll.description is not None else None
+        results.append(
+            InlineQueryResultArticle(
+                poll.id,
+                poll.name,
+                description=description,
+                input_message_content=content,
+                reply_markup=keyboard,
+            )
+        )
+
+    return results
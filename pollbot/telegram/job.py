@@ -9,14 +9,23 @@ from telegram.error import BadRequest, RetryAfter, Unauthorized
 from telegram.ext.callbackcontext import CallbackContext
 
 from pollbot.config import config
+from pollbot.display.poll.compilation import get_poll_text_and_summarize
+from pollbot.display.poll.render_cache import render_cache
+from pollbot.display.poll.results import get_all_results_pages
 from pollbot.enums import PollDeletionMode
+from pollbot.helper.stats import refresh_admin_statistic, rollup_daily_stats
 from pollbot.i18n import i18n
 from pollbot.models import DailyStatistic, Poll, Update, UserStatistic, Vote
+from pollbot.poll.archive import archive_poll
 from pollbot.poll.delete import delete_poll
+from pollbot.poll.loading import DELETION, RENDER
 from pollbot.poll.update import send_updates, update_poll_messages
 from pollbot.sentry import sentry
 from pollbot.telegram.session import job_wrapper
 
+# Polls, that are archived per cleanup run
+ARCHIVE_BATCH_SIZE = 200
+
 
 @job_wrapper
 def message_update_job(context: CallbackContext, session: scoped_session) -> None:
@@ -31,7 +40,7 @@ def message_update_job(context: CallbackContext, session: scoped_session) -> Non
             updates = (
                 session.query(Update)
                 .filter(Update.next_update <= now)
-                .options(joinedload(Update.poll))
+                .options(joinedload(Update.poll).options(*RENDER))
                 .order_by(Update.next_update.asc())
                 .limit(50)
                 .all()
@@ -77,6 +86,7 @@ def delete_polls(context: CallbackContext, session: scoped_session) -> None:
         # Only delete a few polls at a time to prevent RAM usage spikes
         polls_to_delete = (
             session.query(Poll)
+            .options(*DELETION)
             .filter(Poll.delete.isnot(None))
             .order_by(Poll.updated_at.asc())
             .limit(20)
@@ -170,7 +180,7 @@ def send_notifications_for_poll(
 
 @job_wrapper
 def create_daily_stats(context: CallbackContext, session: scoped_session) -> None:
-    """Create the daily stats entity for today and tomorrow."""
+    """Create the daily stats entity for today and tomorrow and roll up finished days."""
     try:
         today = date.today()
         tomorrow = today + timedelta(days=1)
@@ -181,11 +191,19 @@ def create_daily_stats(context: CallbackContext, session: scoped_session) -> Non
                 statistic = DailyStatistic(stat_date)
                 session.add(statistic)
 
+        rollup_daily_stats(session)
         session.commit()
     except Exception as e:
         sentry.capture_job_exception(e)
 
 
+@job_wrapper
+def refresh_admin_stats(context: CallbackContext, session: scoped_session) -> None:
+    """Refresh the statistics snapshot for the admin settings."""
+    refresh_admin_statistic(session)
+    session.commit()
+
+
 @job_wrapper
 def perma_ban_checker(context: CallbackContext, session: scoped_session) -> None:
     """Perma-ban people that send more than 250 votes for at least 3 days in the last week."""
@@ -218,8 +236,10 @@ def cleanup(context: CallbackContext, session: scoped_session) -> None:
     """Run various database cleanup operations."""
     user_statistics_cleanup(context, session)
     old_closed_poll_cleanup(context, session)
+    archive_closed_polls(context, session)
     old_open_poll_cleanup(context, session)
     unfinished_polls_cleanup(context, session)
+    render_cache.purge(session)
 
 
 def user_statistics_cleanup(context: CallbackContext, session: scoped_session) -> None:
@@ -259,6 +279,29 @@ def old_closed_poll_cleanup(context: CallbackContext, session: scoped_session) -
     session.commit()
 
 
+def archive_closed_polls(context: CallbackContext, session: scoped_session) -> None:
+    """Move the votes of polls, that have been closed for some time, to an archive."""
+    threshold = datetime.now() - timedelta(
+        days=config["telegram"]["archive_after_days"]
+    )
+    polls = (
+        session.query(Poll)
+        .filter(Poll.closed.is_(True))
+        .filter(Poll.archived.is_(False))
+        .filter(Poll.delete.is_(None))
+        .filter(Poll.updated_at < threshold)
+        .order_by(Poll.updated_at.asc())
+        .limit(ARCHIVE_BATCH_SIZE)
+        .all()
+    )
+
+    for poll in polls:
+        text, summarize = get_poll_text_and_summarize(session, poll)
+        pages = get_all_results_pages(session, poll)
+        archive_poll(session, poll, text, summarize, pages)
+        session.commit()
+
+
 def old_open_poll_cleanup(context: CallbackContext, session: scoped_session) -> None:
     """Remove old open polls that haven't been touched for for a long time."""
     last_update_threshold = date.today() - timedelta(days=360)
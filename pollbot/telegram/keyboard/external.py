@@ -2,9 +2,11 @@
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
-from pollbot.enums import CallbackType
+from pollbot.display.poll.results import ResultsPage
+from pollbot.enums import CallbackEntity, CallbackType
 from pollbot.i18n import i18n
 from pollbot.models.poll import Poll
+from pollbot.telegram.callback_data import encode_callback
 
 
 def get_notify_keyboard(polls: list[Poll]) -> InlineKeyboardMarkup:
@@ -58,3 +60,31 @@ def get_external_share_keyboard(poll: Poll) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup(buttons)
 
     return keyboard
+
+
+def get_results_page_keyboard(
+    poll: Poll, page: ResultsPage
+) -> InlineKeyboardMarkup | None:
+    """Get the navigation keyboard for paginated poll results.
+
+    The buttons carry the keyset cursor of the first/last entry of the page.
+    """
+    navigation = []
+    if page.has_previous and page.first_cursor is not None:
+        cursor = ".".join(str(value) for value in page.first_cursor)
+        payload = encode_callback(
+            CallbackType.show_results_page, CallbackEntity.poll, poll.id, f"p{cursor}"
+        )
+        navigation.append(InlineKeyboardButton("<", callback_data=payload))
+
+    if page.has_next and page.last_cursor is not None:
+        cursor = ".".join(str(value) for value in page.last_cursor)
+        payload = encode_callback(
+            CallbackType.show_results_page, CallbackEntity.poll, poll.id, f"n{cursor}"
+        )
+        navigation.append(InlineKeyboardButton(">", callback_data=payload))
+
+    if len(navigation) == 0:
+        return None
+
+    return InlineKeyboardMarkup([navigation])
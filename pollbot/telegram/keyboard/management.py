@@ -3,9 +3,10 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from pollbot.config import config
-from pollbot.enums import CallbackResult, CallbackType, StartAction
+from pollbot.enums import CallbackEntity, CallbackResult, CallbackType, StartAction
 from pollbot.i18n import i18n
 from pollbot.models.poll import Poll
+from pollbot.telegram.callback_data import encode_callback
 from pollbot.telegram.keyboard.helper import get_start_button_payload
 
 
@@ -162,7 +163,7 @@ def get_deletion_confirmation(poll: Poll) -> InlineKeyboardMarkup:
 
 
 def get_poll_list_keyboard(
-    polls: list[Poll], closed: bool, offset: int, poll_count: int
+    polls: list[Poll], closed: bool, has_previous: bool, has_next: bool
 ) -> InlineKeyboardMarkup:
     """Get the confirmation keyboard for poll deletion."""
     buttons = []
@@ -176,18 +177,23 @@ def get_poll_list_keyboard(
     # Add navigation
     navigation = []
     if closed:
-        callback_type = CallbackType.user_list_closed_polls_navigation.value
+        callback_type = CallbackType.user_list_closed_polls_navigation
     else:
-        callback_type = CallbackType.user_list_polls_navigation.value
+        callback_type = CallbackType.user_list_polls_navigation
 
+    # The first and last poll of this page are the cursors for the next pages.
     # Only show the previous button, if we aren't on the first page
-    if offset > 0:
-        previous_page = f"{callback_type}:{offset-10}:0"
+    if has_previous:
+        previous_page = encode_callback(
+            callback_type, CallbackEntity.poll, polls[0].id, "p"
+        )
         navigation.append(InlineKeyboardButton("<", callback_data=previous_page))
 
     # Only show the next button, if there's a next page
-    if poll_count > offset + 10:
-        next_page = f"{callback_type}:{offset+10}:0"
+    if has_next:
+        next_page = encode_callback(
+            callback_type, CallbackEntity.poll, polls[-1].id, "n"
+        )
         navigation.append(InlineKeyboardButton(">", callback_data=next_page))
 
     if len(navigation) > 0:
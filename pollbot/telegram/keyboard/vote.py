@@ -7,18 +7,25 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from pollbot.config import config
 from pollbot.db import get_session
 from pollbot.display.poll.indices import get_option_indices
-from pollbot.enums import CallbackResult, CallbackType, PollType, StartAction
+from pollbot.enums import (
+    CallbackEntity,
+    CallbackResult,
+    CallbackType,
+    PollType,
+    StartAction,
+)
 from pollbot.i18n import i18n
-from pollbot.models import Vote
+from pollbot.models import Option, Vote
 from pollbot.models.poll import Poll
 from pollbot.models.user import User
 from pollbot.poll.helper import poll_allows_cumulative_votes
 from pollbot.poll.option import get_sorted_options
+from pollbot.telegram.callback_data import encode_callback, to_base36
 from pollbot.telegram.keyboard.helper import get_start_button_payload
 
 from .management import get_back_to_management_button
 
-IGNORE_PAYLOAD = f"{CallbackType.ignore.value}:0:0"
+IGNORE_PAYLOAD = encode_callback(CallbackType.ignore)
 
 
 def get_vote_keyboard(
@@ -92,20 +99,17 @@ def get_vote_buttons(
 def get_normal_buttons(poll: Poll) -> list[list[InlineKeyboardButton] | Any]:
     """Get the normal keyboard with one vote button per option."""
     buttons = []
-    vote_button_type = CallbackType.vote.value
-
     options = poll.options
 
     for option in options:
         option_name = option.get_formatted_name()
 
-        result = CallbackResult.vote.value
-        payload = f"{vote_button_type}:{option.id}:{result}"
+        payload = get_vote_payload(option, CallbackResult.vote)
         if poll.should_show_result() and poll.show_option_votes:
             text = i18n.t(
                 "keyboard.vote_with_count",
                 option_name=option_name,
-                count=len(option.votes),
+                count=option.voter_count,
                 locale=poll.locale,
             )
         else:
@@ -117,18 +121,14 @@ def get_normal_buttons(poll: Poll) -> list[list[InlineKeyboardButton] | Any]:
 
 def get_cumulative_buttons(poll: Poll) -> list[list[InlineKeyboardButton]]:
     """Get the cumulative keyboard with two buttons per option."""
-    vote_button_type = CallbackType.vote.value
-    vote_yes = CallbackResult.yes.value
-    vote_no = CallbackResult.no.value
-
     options = poll.options
 
     buttons = []
     for option in options:
         option_name = option.get_formatted_name()
 
-        yes_payload = f"{vote_button_type}:{option.id}:{vote_yes}"
-        no_payload = f"{vote_button_type}:{option.id}:{vote_no}"
+        yes_payload = get_vote_payload(option, CallbackResult.yes)
+        no_payload = get_vote_payload(option, CallbackResult.no)
         buttons.append(
             [
                 InlineKeyboardButton(f"－ {option_name}", callback_data=no_payload),
@@ -155,9 +155,6 @@ def get_priority_buttons(
 
     buttons = []
     options = get_sorted_options(poll)
-    vote_button_type = CallbackType.vote.value
-    vote_increase = CallbackResult.increase_priority.value
-    vote_decrease = CallbackResult.decrease_priority.value
     session = get_session()
     votes = (
         session.query(Vote)
@@ -176,12 +173,12 @@ def get_priority_buttons(
                 InlineKeyboardButton(f"{option.name}", callback_data=IGNORE_PAYLOAD)
             ]
             buttons.append(name_row)
-        name_hint_payload = (
-            f"{CallbackType.show_option_name.value}:{poll.id}:{option.id}"
+        # The option name is just looked up, the poll isn't needed
+        name_hint_payload = encode_callback(
+            CallbackType.show_option_name, action=option.id
         )
-        increase_payload = f"{vote_button_type}:{option.id}:{vote_increase}"
-        decrease_payload = f"{vote_button_type}:{option.id}:{vote_decrease}"
-        ignore_payload = f"{CallbackType.ignore.value}:0:0"
+        increase_payload = get_vote_payload(option, CallbackResult.increase_priority)
+        decrease_payload = get_vote_payload(option, CallbackResult.decrease_priority)
 
         vote_row = []
         if poll.compact_buttons:
@@ -194,12 +191,12 @@ def get_priority_buttons(
         if index != len(votes) - 1:
             vote_row.append(InlineKeyboardButton("▼", callback_data=decrease_payload))
         else:
-            vote_row.append(InlineKeyboardButton(" ", callback_data=ignore_payload))
+            vote_row.append(InlineKeyboardButton(" ", callback_data=IGNORE_PAYLOAD))
 
         if index != 0:
             vote_row.append(InlineKeyboardButton("▲", callback_data=increase_payload))
         else:
-            vote_row.append(InlineKeyboardButton(" ", callback_data=ignore_payload))
+            vote_row.append(InlineKeyboardButton(" ", callback_data=IGNORE_PAYLOAD))
 
         buttons.append(vote_row)
     return buttons
@@ -207,22 +204,18 @@ def get_priority_buttons(
 
 def get_doodle_buttons(poll: Poll) -> list[list[InlineKeyboardButton]]:
     """Get the doodle keyboard with yes, maybe and no button per option."""
-    show_option_name = CallbackType.show_option_name.value
-    vote_button_type = CallbackType.vote.value
-    vote_yes = CallbackResult.yes.value
-    vote_maybe = CallbackResult.maybe.value
-    vote_no = CallbackResult.no.value
-
     options = get_sorted_options(poll)
 
     buttons = []
     indices = get_option_indices(options)
 
     for index, option in enumerate(options):
-        name_hint_payload = f"{show_option_name}:{poll.id}:{option.id}"
-        yes_payload = f"{vote_button_type}:{option.id}:{vote_yes}"
-        maybe_payload = f"{vote_button_type}:{option.id}:{vote_maybe}"
-        no_payload = f"{vote_button_type}:{option.id}:{vote_no}"
+        name_hint_payload = encode_callback(
+            CallbackType.show_option_name, action=option.id
+        )
+        yes_payload = get_vote_payload(option, CallbackResult.yes)
+        maybe_payload = get_vote_payload(option, CallbackResult.maybe)
+        no_payload = get_vote_payload(option, CallbackResult.no)
 
         # If we don't have the compact button view, display the option name on it's own button row
         if not poll.compact_buttons:
@@ -249,3 +242,17 @@ def get_doodle_buttons(poll: Poll) -> list[list[InlineKeyboardButton]]:
         buttons.append(option_row + vote_row)
 
     return buttons
+
+
+def get_vote_payload(option: Option, result: CallbackResult) -> str:
+    """Get the callback data of a vote button.
+
+    The poll is part of the payload, so votes can be serialized per poll
+    without looking up the option first.
+    """
+    return encode_callback(
+        CallbackType.vote,
+        CallbackEntity.option,
+        option.id,
+        f"{result.value}:{to_base36(option.poll_id)}",
+    )
@@ -17,6 +17,7 @@ from pollbot.config import config
 from pollbot.db import get_session
 from pollbot.exceptions import RollbackException
 from pollbot.helper import remove_markdown_characters
+from pollbot.helper.leader import job_leader
 from pollbot.helper.stats import increase_stat
 from pollbot.i18n import i18n
 from pollbot.models import User, UserStatistic
@@ -24,9 +25,15 @@ from pollbot.sentry import ignore_job_exception, sentry
 
 
 def job_wrapper(func: Callable[[CallbackContext, Session], Any]):
-    """Create a session, handle permissions and exceptions for jobs."""
+    """Create a session, handle permissions and exceptions for jobs.
+
+    Jobs are skipped, if another process is the job leader.
+    """
 
     def wrapper(context: CallbackContext):
+        if not job_leader.is_leader():
+            return
+
         session = get_session()
         try:
             func(context, session)
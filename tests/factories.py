@@ -1,10 +1,11 @@
 """Factories for creating new databse objects."""
-from pollbot.models import User, Poll
+from pollbot.models import Option, Poll, Reference, User, Vote
 
 
 def user_factory(session, user_id, name, admin=False):
     """Create a user."""
     user = User(user_id, name)
+    user.name = name
     session.add(user)
     session.commit()
 
@@ -13,7 +14,37 @@ def user_factory(session, user_id, name, admin=False):
 
 def poll_factory(session, user):
     poll = Poll(user)
+    poll.name = "Test poll"
+    poll.created = True
     session.add(poll)
     session.commit()
 
     return poll
+
+
+def option_factory(session, poll, name):
+    """Create an option for a poll."""
+    option = Option(poll, name)
+    session.add(option)
+    session.commit()
+
+    return option
+
+
+def vote_factory(session, user, option):
+    """Create a vote of a user on an option."""
+    with session.no_autoflush:
+        vote = Vote(user, option)
+    session.add(vote)
+    session.commit()
+
+    return vote
+
+
+def reference_factory(session, poll, reference_type, **kwargs):
+    """Create a reference to a poll message."""
+    reference = Reference(poll, reference_type, **kwargs)
+    session.add(reference)
+    session.commit()
+
+    return reference
@@ -1,6 +1,10 @@
 """Database test fixtures."""
 import pytest
-from tests.factories import user_factory, poll_factory
+
+from pollbot.display.poll.render_cache import render_cache
+from pollbot.display.poll.snapshot import clear_snapshots
+from pollbot.poll.search import search_results
+from tests.factories import poll_factory, user_factory
 
 
 @pytest.fixture(scope="function")
@@ -12,3 +16,15 @@ def user(session):
 @pytest.fixture(scope="function")
 def poll(session, user):
     return poll_factory(session, user)
+
+
+@pytest.fixture(autouse=True)
+def snapshots():
+    """Every test starts with empty render and search caches."""
+    clear_snapshots()
+    render_cache.clear()
+    search_results.clear()
+    yield
+    clear_snapshots()
+    render_cache.clear()
+    search_results.clear()
@@ -1 +1,86 @@
 """Module for testing helper functions."""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Record all SQL statements that are executed on a connection."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        """Callback for the `before_cursor_execute` event."""
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(connection):
+    """Count all SQL statements that are executed inside this context."""
+    counter = QueryCounter()
+    event.listen(connection, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(connection, "before_cursor_execute", counter)
+
+
+@contextmanager
+def query_budget(connection, budget):
+    """Fail, if more than `budget` SQL statements are executed inside this context.
+
+    This is used to guard hot code paths against N+1 query patterns.
+    """
+    with count_queries(connection) as counter:
+        yield counter
+
+    statements = "\n\n".join(counter.statements)
+    assert (
+        counter.count <= budget
+    ), f"Executed {counter.count} queries, budget is {budget}:\n\n{statements}"
+
+
+class FakeBot:
+    """A telegram bot, that simply remembers all calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def edit_message_text(self, text, **kwargs):
+        self.calls.append(("edit_message_text", text, kwargs))
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.calls.append(("send_message", text, kwargs))
+
+
+class FakeCallbackQuery:
+    """A callback query of an inline message."""
+
+    def __init__(self, data, inline_message_id="inline_message"):
+        self.data = data
+        self.message = None
+        self.inline_message_id = inline_message_id
+        self.answers = []
+
+    def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+
+class FakeMessage:
+    """A message, whose chat simply remembers all sent and edited messages."""
+
+    def __init__(self):
+        self.chat = self
+        self.sent = []
+        self.edited = []
+
+    def send_message(self, text, **kwargs):
+        self.sent.append(text)
+
+    def edit_text(self, text, **kwargs):
+        self.edited.append((text, kwargs))
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from pollbot.display.admin import stats
+from pollbot.enums import PollDeletionMode, PollType
+from pollbot.helper.stats import refresh_admin_statistic
+from pollbot.models import AdminStatistic
+from tests.factories import option_factory, poll_factory, user_factory, vote_factory
+
+
+class TestAdminStats:
+    def test_refresh(self, session, user, poll):
+        user.started = True
+        voter = user_factory(session, 3, "Another voter")
+        vote_factory(session, voter, option_factory(session, poll, "option"))
+
+        doodle = poll_factory(session, user)
+        doodle.poll_type = PollType.doodle.name
+        doodle.closed = True
+        unfinished = poll_factory(session, voter)
+        unfinished.created = False
+        deleted = poll_factory(session, user)
+        deleted.delete = PollDeletionMode.DB_ONLY.name
+        session.commit()
+
+        refresh_admin_statistic(session)
+        statistic = session.query(AdminStatistic).one()
+
+        assert statistic.total_users == 2
+        assert statistic.started_users == 1
+        assert statistic.users_owning_polls == 1
+        assert statistic.users_with_votes == 1
+        assert statistic.highest_poll_id == deleted.id
+        assert statistic.total_polls == 3
+        assert statistic.open_polls == 1
+        assert statistic.unfinished_polls == 1
+        assert statistic.closed_polls == 1
+        assert statistic.polls_to_be_deleted == 1
+        assert statistic.poll_types == {"single_vote": 3, "doodle": 1}
+
+    def test_stats_use_snapshot(self, session, user, poll):
+        refresh_admin_statistic(session)
+        created_at = datetime(2020, 1, 1)
+        session.query(AdminStatistic).update({"created_at": created_at})
+        # Not part of the snapshot
+        poll_factory(session, user)
+
+        message = stats(session)
+        assert "Snapshot from 2020-01-01 00:00" in message
+        assert "Total: 1\n" in message
+        assert "Single: 1 (100.00%)" in message
+
+    def test_stats_without_snapshot(self, session, user, poll):
+        assert "Total: 1\n" in stats(session)
@@ -0,0 +1,69 @@
+from pollbot.enums import PollType, VoteResultType
+from pollbot.poll.aggregates import rebuild_aggregates
+from tests.factories import option_factory, user_factory, vote_factory
+
+
+class TestAggregates:
+    def test_votes_are_counted(self, session, user, poll):
+        poll.poll_type = PollType.cumulative_vote.name
+        option = option_factory(session, poll, "option 0")
+        other_option = option_factory(session, poll, "option 1")
+        voter = user_factory(session, 3, "Another voter")
+
+        vote_factory(session, user, option)
+        vote_factory(session, user, other_option)
+        vote = vote_factory(session, voter, option)
+
+        assert poll.voter_count == 2
+        assert poll.vote_sum == 3
+        assert option.voter_count == 2
+        assert other_option.voter_count == 1
+
+        vote.vote_count = 3
+        session.commit()
+        assert poll.vote_sum == 5
+        assert option.vote_sum == 4
+
+        session.delete(vote)
+        session.commit()
+        assert poll.voter_count == 1
+        assert poll.vote_sum == 2
+        assert option.voter_count == 1
+
+    def test_doodle_score(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote = vote_factory(session, user, option)
+        vote.type = VoteResultType.maybe.name
+        session.commit()
+        assert option.maybe_count == 1
+        assert option.yes_count == 0
+
+        vote.type = VoteResultType.yes.name
+        session.commit()
+        assert option.maybe_count == 0
+        assert option.yes_count == 1
+
+    def test_deleted_option(self, session, user, poll):
+        poll.poll_type = PollType.block_vote.name
+        option = option_factory(session, poll, "option 0")
+        other_option = option_factory(session, poll, "option 1")
+        vote_factory(session, user, option)
+        vote_factory(session, user, other_option)
+
+        session.delete(other_option)
+        session.commit()
+
+        assert poll.voter_count == 1
+        assert poll.vote_sum == 1
+
+    def test_rebuild(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+        poll.voter_count = 10
+        option.voter_count = 10
+        session.commit()
+
+        rebuild_aggregates(session, [poll.id])
+
+        assert poll.voter_count == 1
+        assert option.voter_count == 1
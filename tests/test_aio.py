@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from telegram import Bot
+from telegram.error import BadRequest, RetryAfter, Unauthorized
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application, RequestHandler
+
+from pollbot.aio.client import AsyncTelegramClient
+from pollbot.aio.jobs import finish_updates, prepare_updates
+from pollbot.aio.request import LoopRequest
+from pollbot.aio.runtime import run
+from pollbot.config import config
+from pollbot.enums import ReferenceType
+from pollbot.models import Reference, Update
+from tests.factories import reference_factory
+
+
+class FakeTelegram(RequestHandler):
+    """Answer bot api requests depending on the sent text."""
+
+    def post(self, token, method):
+        body = json.loads(self.request.body or b"{}")
+        text = body.get("text", "")
+        self.application.requests.append((method, body))
+        if text == "bad":
+            self.set_status(400)
+            self.write({"ok": False, "description": "Message to edit not found"})
+        elif text == "flood":
+            self.set_status(429)
+            self.write({"ok": False, "parameters": {"retry_after": 3}})
+        elif text == "blocked":
+            self.set_status(403)
+            self.write({"ok": False, "description": "Forbidden: bot was blocked"})
+        else:
+            self.write({"ok": True, "result": True})
+
+
+@pytest.fixture
+def telegram_server():
+    """Run a fake bot api on an event loop in a separate thread."""
+    loop = asyncio.new_event_loop()
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    application = Application([(r"/bot([^/]+)/(\w+)", FakeTelegram)])
+    application.requests = []
+
+    async def start():
+        server = HTTPServer(application)
+        server.add_sockets(sockets)
+        client = AsyncTelegramClient(
+            "token", max_clients=10, base_url=f"http://127.0.0.1:{port}"
+        )
+        return client
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    yield loop, client, application, port
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def call(loop, coroutine):
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout=10)
+
+
+class TestAsyncTelegramClient:
+    def test_concurrent_calls(self, telegram_server):
+        loop, client, application, _ = telegram_server
+
+        async def edit_all():
+            return await asyncio.gather(
+                *(client.call("editMessageText", text=str(i)) for i in range(50))
+            )
+
+        assert call(loop, edit_all()) == [True] * 50
+        assert len(application.requests) == 50
+
+    def test_errors(self, telegram_server):
+        loop, client, _, _ = telegram_server
+
+        with pytest.raises(BadRequest, match="Message to edit not found"):
+            call(loop, client.call("editMessageText", text="bad"))
+        with pytest.raises(RetryAfter):
+            call(loop, client.call("editMessageText", text="flood"))
+        with pytest.raises(Unauthorized):
+            call(loop, client.call("editMessageText", text="blocked"))
+
+    def test_synchronous_bot(self, telegram_server):
+        """The requests of the normal bot are sent by the event loop."""
+        loop, client, application, port = telegram_server
+        bot = Bot(
+            "123:token",
+            base_url=f"http://127.0.0.1:{port}/bot",
+            request=LoopRequest(client, loop),
+        )
+
+        bot.edit_message_text("text", inline_message_id="inline")
+        with pytest.raises(BadRequest):
+            bot.edit_message_text("bad", inline_message_id="inline")
+
+        assert application.requests[0] == (
+            "editMessageText",
+            {"text": "text", "inline_message_id": "inline"},
+        )
+
+
+class TestMessageUpdates:
+    def test_prepare_and_finish(self, session, poll):
+        now = datetime.now()
+        working = reference_factory(
+            session, poll, ReferenceType.inline.name, inline_message_id="working"
+        )
+        removed = reference_factory(
+            session, poll, ReferenceType.inline.name, inline_message_id="removed"
+        )
+        session.add(Update(poll, now - timedelta(seconds=1)))
+        session.commit()
+        working_id, removed_id = working.id, removed.id
+
+        prepared = prepare_updates(session, now)
+        assert len(prepared) == 1
+        assert [reference_id for reference_id, _ in prepared[0].messages] == [
+            working_id,
+            removed_id,
+        ]
+        message = prepared[0].messages[0][1]
+        assert message["inline_message_id"] == "working"
+
+        results = [True, BadRequest("Message to edit not found")]
+        finish_updates(session, prepared, results, now)
+
+        assert session.query(Update).count() == 0
+        assert session.query(Reference).get(working_id) is not None
+        assert session.query(Reference).get(removed_id) is None
+
+    def test_retry_after(self, session, poll):
+        now = datetime.now()
+        reference_factory(
+            session, poll, ReferenceType.inline.name, inline_message_id="inline"
+        )
+        session.add(Update(poll, now - timedelta(seconds=1)))
+        session.commit()
+
+        prepared = prepare_updates(session, now)
+        finish_updates(session, prepared, [RetryAfter(10)], now)
+
+        update = session.query(Update).one()
+        assert update.next_update == now + timedelta(seconds=11)
+
+    def test_keep_updates_of_new_votes(self, session, poll):
+        now = datetime.now()
+        session.add(Update(poll, now - timedelta(seconds=1)))
+        session.commit()
+
+        prepared = prepare_updates(session, now)
+        # Somebody voted, while the messages were sent
+        session.query(Update).update({"count": Update.count + 1})
+        session.commit()
+        finish_updates(session, prepared, [], now)
+
+        assert session.query(Update).count() == 1
+
+
+class TestRuntime:
+    def test_refuse_webhook(self, monkeypatch):
+        """Long polling would silently delete the webhook."""
+        monkeypatch.setitem(config["webhook"], "enabled", True)
+        with pytest.raises(RuntimeError):
+            run(None)
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+
+from pollbot.display.poll.compilation import get_poll_text_and_summarize
+from pollbot.display.poll.results import get_all_results_pages, get_results_page
+from pollbot.enums import CallbackType, PollDeletionMode, PollType
+from pollbot.models import PollArchive, Vote
+from pollbot.poll.aggregates import rebuild_aggregates
+from pollbot.poll.archive import (
+    archive_poll,
+    get_archive,
+    restore_poll,
+)
+from pollbot.poll.option import add_options_multiline
+from pollbot.telegram.callback_data import encode_callback
+from pollbot.telegram.callback_handler.context import CallbackContext
+from pollbot.telegram.callback_handler.user import delete_user
+from tests.factories import option_factory, user_factory, vote_factory
+from tests.helper import FakeBot, FakeCallbackQuery, FakeMessage
+
+
+def create_closed_poll(session, user, poll):
+    poll.poll_type = PollType.cumulative_vote.name
+    options = [option_factory(session, poll, f"option {i}") for i in range(2)]
+    voter = user_factory(session, 3, "Another voter")
+    vote_factory(session, user, options[0])
+    vote = vote_factory(session, voter, options[1])
+    vote.vote_count = 3
+    poll.closed = True
+    session.commit()
+
+    return voter
+
+
+def archive(session, poll):
+    # The test database only accepts ascii, so rendered texts can't be stored.
+    pages = [["page 0"], ["page 1"]]
+    archive_poll(session, poll, "text", False, pages)
+    session.commit()
+
+    return "text", pages
+
+
+class TestArchive:
+    def test_archive(self, session, user, poll):
+        create_closed_poll(session, user, poll)
+        poll.updated_at = updated_at = datetime.now() - timedelta(days=40)
+        session.commit()
+        version = poll.version
+        text, pages = archive(session, poll)
+
+        assert session.query(Vote).count() == 0
+        assert poll.archived
+        # The final state doesn't change
+        assert poll.version == version
+        assert poll.voter_count == 2
+        assert poll.vote_sum == 4
+        session.refresh(poll)
+        assert poll.updated_at == updated_at
+
+        assert get_poll_text_and_summarize(session, poll) == (text, False)
+        page = get_results_page(session, poll)
+        assert page.lines == pages[0]
+        assert page.has_next
+        page = get_results_page(session, poll, page.last_cursor)
+        assert page.lines == pages[1]
+        assert page.has_previous
+        assert not page.has_next
+
+        rebuild_aggregates(session)
+        session.refresh(poll)
+        assert poll.vote_sum == 4
+
+    def test_restore(self, session, user, poll):
+        voter = create_closed_poll(session, user, poll)
+        columns = [Vote.id, Vote.option_id, Vote.user_id, Vote.vote_count]
+        columns += [Vote.created_at, Vote.updated_at]
+        before = session.query(*columns).all()
+        text, _ = archive(session, poll)
+        assert get_poll_text_and_summarize(session, poll)[0] == text
+
+        restore_poll(session, poll)
+        session.commit()
+
+        assert not poll.archived
+        assert session.query(PollArchive).count() == 0
+        # Ids and timestamps are kept for cursors, sorting and statistics.
+        after = session.query(*columns).all()
+        assert sorted(after) == sorted(before)
+        assert {vote.user for vote in poll.votes} == {user, voter}
+        assert get_poll_text_and_summarize(session, poll)[0] != text
+
+    def test_changes_are_free_of_side_effects(self, session, user, poll):
+        """Only handlers, that change the poll, restore its archive."""
+        create_closed_poll(session, user, poll)
+        archive(session, poll)
+
+        poll.delete = PollDeletionMode.DB_ONLY.name
+        poll.show_percentage = False
+        session.commit()
+
+        assert poll.archived
+        assert session.query(Vote).count() == 0
+
+    def test_add_option(self, session, user, poll):
+        create_closed_poll(session, user, poll)
+        archive(session, poll)
+
+        add_options_multiline(session, poll, "option 2")
+        session.commit()
+
+        assert not poll.archived
+        assert get_archive(session, poll) is None
+        assert session.query(PollArchive).count() == 0
+        assert session.query(Vote).count() == 2
+        assert len(poll.options[1].votes) == 1
+
+    def test_render_is_read_only(self, session, user, poll):
+        create_closed_poll(session, user, poll)
+        text, _ = archive(session, poll)
+
+        assert get_poll_text_and_summarize(session, poll)[0] == text
+        get_results_page(session, poll)
+        assert not session.new and not session.dirty
+        session.commit()
+
+        assert poll.archived
+        assert session.query(Vote).count() == 0
+
+    def test_deleted_option(self, session, user, poll):
+        create_closed_poll(session, user, poll)
+        archive(session, poll)
+
+        session.delete(poll.options[1])
+        session.commit()
+
+        restore_poll(session, poll)
+        session.commit()
+        assert [vote.user for vote in session.query(Vote)] == [user]
+
+    def test_delete_user(self, session, user, poll):
+        """Deleted users don't show up in archived polls anymore."""
+        voter = create_closed_poll(session, user, poll)
+        pages = get_all_results_pages(session, poll)
+        assert any("Another voter" in line for line in pages[0])
+        text, _ = archive(session, poll)
+
+        query = FakeCallbackQuery(encode_callback(CallbackType.user_delete))
+        query.message = FakeMessage()
+        delete_user(session, CallbackContext(session, FakeBot(), query, voter))
+
+        assert not poll.archived
+        assert session.query(PollArchive).count() == 0
+        assert [vote.user for vote in poll.votes] == [user]
+        assert poll.voter_count == 1
+        assert poll.vote_sum == 1
+        assert get_poll_text_and_summarize(session, poll)[0] != text
+        pages = get_all_results_pages(session, poll)
+        assert not any("Another voter" in line for line in pages[0])
+        assert str(voter.id) not in "\n".join(pages[0])
+
+
+def test_all_results_pages(session, user, poll):
+    create_closed_poll(session, user, poll)
+    pages = get_all_results_pages(session, poll)
+    assert len(pages) == 1
+    assert "\n".join(pages[0]) == get_poll_text_and_summarize(session, poll)[0]
@@ -0,0 +1,83 @@
+from pollbot.enums import PollDeletionMode, PollType
+from pollbot.models import Poll, Update
+from pollbot.poll.bulk import (
+    mark_polls_for_deletion,
+    remove_votes_of_poll,
+    remove_votes_of_user,
+)
+from pollbot.poll.update import schedule_poll_updates
+from tests.factories import option_factory, poll_factory, user_factory, vote_factory
+
+
+class TestBulkRemoval:
+    def test_reset_poll(self, session, user, poll):
+        poll.poll_type = PollType.block_vote.name
+        option = option_factory(session, poll, "option 0")
+        other_option = option_factory(session, poll, "option 1")
+        voter = user_factory(session, 3, "Another voter")
+        vote_factory(session, user, option)
+        vote_factory(session, voter, other_option)
+        version = poll.version
+
+        assert remove_votes_of_poll(session, poll) == [poll.id]
+        session.commit()
+
+        assert poll.votes == []
+        assert option.votes == []
+        assert poll.voter_count == 0
+        assert option.voter_count == 0
+        assert poll.version > version
+
+    def test_remove_votes_of_user(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        other_poll = poll_factory(session, user)
+        other_option = option_factory(session, other_poll, "option 0")
+        voter = user_factory(session, 3, "Another voter")
+        vote_factory(session, voter, option)
+        vote_factory(session, voter, other_option)
+        vote_factory(session, user, option)
+
+        poll_ids = remove_votes_of_user(session, voter)
+        session.commit()
+
+        assert poll_ids == sorted([poll.id, other_poll.id])
+        assert voter.votes == []
+        assert [vote.user for vote in poll.votes] == [user]
+        assert poll.voter_count == 1
+        assert other_poll.voter_count == 0
+
+    def test_mark_polls_for_deletion(self, session, user, poll):
+        closed_poll = poll_factory(session, user)
+        closed_poll.closed = True
+        session.commit()
+
+        poll_ids = mark_polls_for_deletion(
+            session, user, PollDeletionMode.WITH_MESSAGES, closed=True
+        )
+
+        assert poll_ids == [closed_poll.id]
+        assert closed_poll.delete == PollDeletionMode.WITH_MESSAGES.name
+        assert poll.delete is None
+
+        poll_ids = mark_polls_for_deletion(session, user, PollDeletionMode.DB_ONLY)
+        session.commit()
+
+        assert poll_ids == [poll.id]
+        assert poll.delete == PollDeletionMode.DB_ONLY.name
+        assert closed_poll.delete == PollDeletionMode.WITH_MESSAGES.name
+
+    def test_schedule_poll_updates(self, session, user, poll):
+        closed_poll = poll_factory(session, user)
+        closed_poll.closed = True
+        scheduled_poll = poll_factory(session, user)
+        session.add(Update(scheduled_poll, scheduled_poll.created_at))
+        session.commit()
+
+        schedule_poll_updates(session, [poll.id, closed_poll.id, scheduled_poll.id])
+        session.commit()
+
+        updates = {
+            update.poll_id: update.count for update in session.query(Update).all()
+        }
+        assert updates == {poll.id: 0, scheduled_poll.id: 1}
+        assert session.query(Poll).count() == 3
@@ -0,0 +1,116 @@
+import pytest
+
+from pollbot.enums import CallbackEntity, CallbackResult, CallbackType, PollType
+from pollbot.telegram.callback_data import (
+    decode_callback,
+    encode_callback,
+    get_callback_type,
+)
+from pollbot.telegram.callback_handler import get_callback_keys
+from pollbot.telegram.callback_handler.context import CallbackContext
+from pollbot.telegram.keyboard.vote import get_vote_keyboard, get_vote_payload
+from tests.factories import option_factory
+from tests.helper import FakeBot, FakeCallbackQuery, query_budget
+
+
+class TestCodec:
+    def test_round_trip(self):
+        data = encode_callback(
+            CallbackType.show_results_page, CallbackEntity.poll, 123456, "n12.34"
+        )
+        callback = decode_callback(data)
+
+        assert callback.version == 1
+        assert callback.callback_type == CallbackType.show_results_page
+        assert callback.entity == CallbackEntity.poll
+        assert callback.entity_id == 123456
+        assert callback.action == "n12.34"
+        assert callback.parts == ["111", "123456", "n12.34"]
+
+    def test_legacy_format(self):
+        vote = decode_callback(f"{CallbackType.vote.value}:42:20")
+        assert vote.version == 0
+        assert vote.entity == CallbackEntity.option
+        assert vote.entity_id == 42
+
+        menu = decode_callback(f"{CallbackType.menu_show.value}:42:0")
+        assert menu.entity == CallbackEntity.poll
+
+        month = decode_callback(f"{CallbackType.next_month.value}:42:2026-10-01:0")
+        assert month.parts == [
+            str(CallbackType.next_month.value),
+            "42",
+            "2026-10-01",
+            "0",
+        ]
+
+        ignore = decode_callback(f"{CallbackType.ignore.value}:0:0")
+        assert ignore.entity == CallbackEntity.none
+
+    @pytest.mark.parametrize("data", ["", "abc", "9999:1:0", "~1x1:1:0", "~1p1"])
+    def test_malformed(self, data):
+        with pytest.raises(ValueError):
+            decode_callback(data)
+
+    def test_get_callback_type(self):
+        assert (
+            get_callback_type(encode_callback(CallbackType.vote)) == CallbackType.vote
+        )
+        assert (
+            get_callback_type(f"{CallbackType.close.value}:1:0") == CallbackType.close
+        )
+        assert get_callback_type("garbage") is None
+        assert get_callback_type("9999:1:0") is None
+
+    def test_doodle_keyboard(self, session, poll):
+        poll.poll_type = PollType.doodle.name
+        option_factory(session, poll, "option 0")
+
+        keyboard = get_vote_keyboard(poll, None)
+
+        payloads = [
+            button.callback_data for row in keyboard.inline_keyboard for button in row
+        ]
+        assert len(payloads) == 4
+        assert all(decode_callback(data).version == 1 for data in payloads)
+
+
+class TestLazyContext:
+    def test_no_queries_without_entity(self, session, connection, user):
+        query = FakeCallbackQuery(encode_callback(CallbackType.ignore))
+        session.refresh(user)
+        with query_budget(connection, 0):
+            context = CallbackContext(session, FakeBot(), query, user)
+            repr(context)
+
+        assert context.poll is None
+
+    def test_poll_of_vote(self, session, user, poll):
+        option = option_factory(session, poll, "option")
+        query = FakeCallbackQuery(get_vote_payload(option, CallbackResult.vote))
+        context = CallbackContext(session, FakeBot(), query, user)
+
+        assert context.option == option
+        assert context.poll == poll
+
+    def test_poll(self, session, user, poll):
+        data = encode_callback(CallbackType.menu_show, CallbackEntity.poll, poll.id)
+        context = CallbackContext(session, FakeBot(), FakeCallbackQuery(data), user)
+
+        assert context.option is None
+        assert context.poll == poll
+
+
+class TestCallbackKeys:
+    def test_votes_are_serialized_per_poll(self, session, user, poll):
+        option = option_factory(session, poll, "option")
+        query = FakeCallbackQuery(get_vote_payload(option, CallbackResult.vote))
+        query.from_user = user
+
+        assert get_callback_keys(query) == [("user", user.id), ("poll", poll.id)]
+
+    def test_legacy_votes(self, user):
+        query = FakeCallbackQuery(f"{CallbackType.vote.value}:42:20")
+        query.from_user = user
+
+        assert get_callback_keys(query) == [("user", user.id)]
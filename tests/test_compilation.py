@@ -0,0 +1,85 @@
+from pollbot.display.poll import compilation
+from pollbot.display.poll.compilation import (
+    MAX_TEXT_LENGTH,
+    compile_poll_text,
+    get_poll_text_and_summarize,
+    render_poll_text_within_budget,
+)
+from pollbot.enums import RenderLevel
+from pollbot.i18n import i18n
+from pollbot.models import User
+from tests.factories import option_factory, vote_factory
+
+
+def add_voters(session, option, count, first_id):
+    for user_id in range(first_id, first_id + count):
+        user = User(user_id, f"voter_{user_id}")
+        user.name = f"Voter with a rather long name {user_id}"
+        session.add(user)
+        vote_factory(session, user, option)
+
+
+class TestBudgetedRendering:
+    def test_small_poll(self, session, user, poll):
+        option = option_factory(session, poll, "option")
+        add_voters(session, option, 3, 100)
+
+        lines, level = render_poll_text_within_budget(session, poll)
+
+        assert level == RenderLevel.full
+        assert lines == compile_poll_text(session, poll)
+        assert get_poll_text_and_summarize(session, poll)[1] is False
+        assert not poll.permanently_summarized
+
+    def test_summarized_poll(self, session, user, poll):
+        option = option_factory(session, poll, "option")
+        add_voters(session, option, 3, 100)
+        poll.summarize = True
+
+        lines, level = render_poll_text_within_budget(session, poll)
+
+        assert level == RenderLevel.summarized
+        assert lines == compile_poll_text(session, poll, summarize=True)
+        assert not poll.permanently_summarized
+
+    def test_big_option_is_summarized(self, session, user, poll, monkeypatch):
+        small = option_factory(session, poll, "small")
+        big = option_factory(session, poll, "big")
+        last = option_factory(session, poll, "last")
+        add_voters(session, small, 5, 100)
+        add_voters(session, big, 100, 200)
+        add_voters(session, last, 5, 300)
+
+        lines, level = render_poll_text_within_budget(session, poll)
+        text = "\n".join(lines)
+
+        assert level == RenderLevel.shortened
+        assert len(text) <= MAX_TEXT_LENGTH
+        # The first option still lists all voters, the others are summarized
+        assert "long name 104" in text
+        assert "long name 299" not in text
+        assert "long name 304" not in text
+        assert len(text) > len("\n".join(compile_poll_text(session, poll, True)))
+
+        version = poll.version
+        text, summarize = get_poll_text_and_summarize(session, poll)
+        assert poll.permanently_summarized
+        assert poll.version > version
+        assert summarize
+
+        # The text has been cached for the new version
+        monkeypatch.setattr(
+            compilation, "render_poll_text_within_budget", None, raising=True
+        )
+        assert get_poll_text_and_summarize(session, poll) == (text, summarize)
+
+    def test_too_long(self, session, user, poll):
+        poll.description = "a" * MAX_TEXT_LENGTH
+        option_factory(session, poll, "option")
+
+        assert render_poll_text_within_budget(session, poll)[1] == RenderLevel.too_long
+
+        text, summarize = get_poll_text_and_summarize(session, poll)
+        assert text == i18n.t("misc.too_long", locale=poll.locale)
+        assert summarize
+        assert poll.permanently_summarized
@@ -0,0 +1,60 @@
+from threading import Event, Lock
+
+from pollbot.helper.executor import KeyedExecutor
+
+
+class TestKeyedExecutor:
+    def test_same_key_in_order(self):
+        executor = KeyedExecutor(max_workers=8)
+        results = []
+        for i in range(200):
+            executor.submit(["user"], results.append, i)
+        executor.shutdown()
+
+        assert results == list(range(200))
+        assert executor.pending() == 0
+
+    def test_different_keys_in_parallel(self):
+        executor = KeyedExecutor(max_workers=2)
+        blocked = Event()
+        done = Event()
+
+        # The first task only finishes, once the task of another key ran
+        executor.submit(["poll 1"], lambda: blocked.wait(timeout=5))
+        executor.submit(["poll 2"], done.set)
+        assert done.wait(timeout=5)
+
+        blocked.set()
+        executor.shutdown()
+
+    def test_multiple_keys(self):
+        executor = KeyedExecutor(max_workers=8)
+        lock = Lock()
+        running = set()
+        overlaps = []
+
+        def task(keys):
+            with lock:
+                if running.intersection(keys):
+                    overlaps.append(keys)
+                running.update(keys)
+            with lock:
+                running.difference_update(keys)
+
+        for i in range(300):
+            keys = [("user", i % 3), ("poll", i % 5)]
+            executor.submit(keys, task, keys)
+        executor.shutdown()
+
+        assert overlaps == []
+        assert executor.pending() == 0
+
+    def test_failing_task(self):
+        executor = KeyedExecutor(max_workers=2)
+        results = []
+
+        executor.submit(["user"], lambda: 1 / 0)
+        executor.submit(["user"], results.append, "next")
+        executor.shutdown()
+
+        assert results == ["next"]
@@ -0,0 +1,57 @@
+from pollbot.i18n import Catalog, i18n
+
+
+def write_catalog(tmp_path):
+    (tmp_path / "English.yml").write_text(
+        "poll:\n"
+        "    closed: 'Closed'\n"
+        "    voted: '%{count} users voted'\n"
+        "    percent: '100%% sure'\n"
+        "    users:\n"
+        "        one: 'One user'\n"
+        "        few: 'A few users'\n"
+        "        other: '%{count} users'\n"
+    )
+    (tmp_path / "German.yml").write_text("poll:\n    closed: 'Geschlossen'\n")
+
+    return Catalog(tmp_path)
+
+
+class TestCatalog:
+    def test_translation(self, tmp_path):
+        catalog = write_catalog(tmp_path)
+
+        assert catalog.t("poll.closed", locale="German") == "Geschlossen"
+        assert catalog.t("poll.closed", locale="English") == "Closed"
+
+    def test_fallback(self, tmp_path):
+        catalog = write_catalog(tmp_path)
+
+        assert catalog.t("poll.voted", locale="German", count=3) == "3 users voted"
+        assert catalog.t("poll.closed", locale="Klingon") == "Closed"
+        assert catalog.t("poll.closed", locale=None) == "Closed"
+
+    def test_missing_key(self, tmp_path):
+        catalog = write_catalog(tmp_path)
+
+        assert catalog.t("poll.unknown", locale="German") == "poll.unknown"
+        assert catalog.t("poll.unknown", default="Default") == "Default"
+
+    def test_placeholders(self, tmp_path):
+        catalog = write_catalog(tmp_path)
+
+        assert catalog.t("poll.voted") == "%{count} users voted"
+        assert catalog.t("poll.percent") == "100% sure"
+
+    def test_plurals(self, tmp_path):
+        catalog = write_catalog(tmp_path)
+
+        assert catalog.t("poll.users", count=0) == "0 users"
+        assert catalog.t("poll.users", count=1) == "One user"
+        assert catalog.t("poll.users", count=4) == "A few users"
+        assert catalog.t("poll.users", count=20) == "20 users"
+
+    def test_shipped_translations(self):
+        """All shipped locales are compiled from the package directory."""
+        assert "English" in i18n.locales
+        assert i18n.t("poll.closed", locale="German") != "poll.closed"
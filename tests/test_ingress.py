@@ -0,0 +1,159 @@
+import asyncio
+import json
+import queue
+import threading
+from collections import Counter
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from telegram import Bot
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+
+from pollbot.enums import CallbackEntity, CallbackType
+from pollbot.ingress.routing import get_routing_key, get_worker_index
+from pollbot.ingress.server import UpdateRouter, make_application
+from pollbot.ingress.worker import forward_updates
+from pollbot.telegram.callback_data import encode_callback
+
+
+def callback_update(update_id, user_id, data):
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "user"},
+            "chat_instance": "instance",
+            "data": data,
+        },
+    }
+
+
+def message_update(update_id, user_id):
+    user = {"id": user_id, "is_bot": False, "first_name": "user"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": user,
+            "chat": {"id": user_id, "type": "private"},
+            "date": 0,
+            "text": "/start",
+        },
+    }
+
+
+class TestRouting:
+    def test_routing_keys(self):
+        poll_data = encode_callback(CallbackType.menu_show, CallbackEntity.poll, 7)
+        vote_data = encode_callback(CallbackType.vote, CallbackEntity.option, 3, "1:7")
+
+        assert get_routing_key(callback_update(1, 5, poll_data)) == ("poll", 7)
+        assert get_routing_key(callback_update(1, 5, "20:3:1")) == ("user", 5)
+        assert get_routing_key(callback_update(1, 5, vote_data)) == ("poll", 7)
+        assert get_routing_key(callback_update(1, 5, "garbage")) == ("user", 5)
+        assert get_routing_key(message_update(1, 5)) == ("user", 5)
+        assert get_routing_key({"update_id": 1, "poll": {"id": "1"}}) is None
+
+        result = {"result_id": "9", "from": {"id": 5}, "query": ""}
+        assert get_routing_key({"chosen_inline_result": result}) == ("poll", 9)
+        result["result_id"] = "3f6e8a2c-0d0c-4c1e-a55b-47a18cc5a4b8"
+        assert get_routing_key({"chosen_inline_result": result}) == ("user", 5)
+
+    def test_worker_index(self):
+        indices = [get_worker_index(("poll", poll_id), 4) for poll_id in range(1000)]
+        assert indices == [
+            get_worker_index(("poll", poll_id), 4) for poll_id in range(1000)
+        ]
+        # The polls are spread over all workers
+        assert all(count > 150 for count in Counter(indices).values())
+        assert get_worker_index(None, 4) == 0
+
+
+@pytest.fixture
+def ingress():
+    """Run the ingress application with in-memory queues in a separate thread."""
+    loop = asyncio.new_event_loop()
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    queues = [queue.Queue() for _ in range(4)]
+
+    async def start():
+        server = HTTPServer(make_application(UpdateRouter(queues), "token"))
+        server.add_sockets(sockets)
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop).result()
+
+    yield f"http://127.0.0.1:{port}/token", queues
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def send(url, update):
+    return urlopen(url, data=json.dumps(update).encode()).status
+
+
+def drain(updates):
+    items = []
+    while not updates.empty():
+        items.append(json.loads(updates.get()))
+
+    return items
+
+
+class TestIngress:
+    def test_updates_of_a_poll_keep_their_order(self, ingress):
+        """A fake Telegram sender clicks buttons of a few polls."""
+        url, queues = ingress
+        for update_id in range(200):
+            data = encode_callback(
+                CallbackType.menu_show, CallbackEntity.poll, update_id % 5
+            )
+            assert send(url, callback_update(update_id, update_id, data)) == 200
+
+        workers = {}
+        update_ids = {}
+        for index, updates in enumerate(queues):
+            for update in drain(updates):
+                poll_id = update["update_id"] % 5
+                workers.setdefault(poll_id, set()).add(index)
+                update_ids.setdefault(poll_id, []).append(update["update_id"])
+
+        for poll_id in range(5):
+            assert len(workers[poll_id]) == 1
+            assert update_ids[poll_id] == list(range(poll_id, 200, 5))
+
+    def test_malformed_update(self, ingress):
+        url, queues = ingress
+        with pytest.raises(HTTPError) as error:
+            urlopen(url, data=b"not json")
+        assert error.value.code == 400
+
+        with pytest.raises(HTTPError):
+            urlopen(url, data=b'{"callback_query": {}}')
+        assert all(updates.empty() for updates in queues)
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.bot = Bot("123:token")
+        self.update_queue = queue.Queue()
+
+
+def test_forward_updates():
+    updates = queue.Queue()
+    updates.put(json.dumps(message_update(1, 5)).encode())
+    updates.put(json.dumps(message_update(2, 5)).encode())
+    updates.put(None)
+    dispatcher = FakeDispatcher()
+
+    forward_updates(updates, dispatcher)
+
+    first = dispatcher.update_queue.get_nowait()
+    assert first.update_id == 1
+    assert first.effective_user.id == 5
+    assert dispatcher.update_queue.get_nowait().update_id == 2
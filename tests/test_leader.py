@@ -0,0 +1,35 @@
+from pollbot.helper.leader import LeaderLock
+
+LOCK_ID = 1234
+
+
+def test_single_leader(engine):
+    first = LeaderLock(engine, LOCK_ID)
+    second = LeaderLock(engine, LOCK_ID)
+
+    assert first.is_leader()
+    assert not second.is_leader()
+    # The leader keeps its lock
+    assert first.is_leader()
+
+    first.release()
+    assert second.is_leader()
+    assert not first.is_leader()
+    second.release()
+
+
+def test_lost_connection(engine):
+    first = LeaderLock(engine, LOCK_ID)
+    second = LeaderLock(engine, LOCK_ID)
+    assert first.is_leader()
+
+    # Postgres releases the lock, once the connection of the leader is gone.
+    with engine.connect() as connection:
+        connection.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_locks "
+            f"WHERE locktype = 'advisory' AND objid = {LOCK_ID}"
+        )
+
+    assert not first.is_leader()
+    assert second.is_leader()
+    second.release()
@@ -0,0 +1,80 @@
+import pytest
+
+from pollbot.enums import PollType
+from pollbot.poll.partitioning import (
+    copy_vote_batch,
+    is_partitioned,
+    prepare_partitioned_table,
+    swap_vote_tables,
+)
+from tests.factories import option_factory, user_factory, vote_factory
+
+LEGACY_TABLE = [
+    "CREATE TABLE vote (LIKE public.vote INCLUDING DEFAULTS)",
+    "CREATE SEQUENCE vote_id_seq OWNED BY vote.id",
+    "ALTER TABLE vote ALTER id SET DEFAULT nextval('vote_id_seq')",
+    "ALTER TABLE vote ADD CONSTRAINT vote_pkey PRIMARY KEY (id)",
+    """ALTER TABLE vote ADD CONSTRAINT one_vote_per_option_and_user
+    UNIQUE (user_id, poll_id, option_id)""",
+    """CREATE UNIQUE INDEX ix_unique_single_vote ON vote (user_id, poll_id)
+    WHERE poll_type = 'single_vote'""",
+    """CREATE UNIQUE INDEX ix_unique_priority_vote ON vote (user_id, poll_id, priority)
+    WHERE poll_type = 'priority'""",
+    "CREATE INDEX ix_vote_option_id_user_id ON vote (option_id, user_id)",
+    "CREATE INDEX ix_vote_poll_id_user_id ON vote (poll_id, user_id)",
+    "CREATE INDEX ix_vote_user_id ON vote (user_id)",
+]
+
+
+@pytest.fixture
+def legacy_votes(session):
+    """Create an unpartitioned vote table, which shadows the real one."""
+    session.execute("CREATE SCHEMA legacy")
+    session.execute("SET LOCAL search_path TO legacy, public")
+    for statement in LEGACY_TABLE:
+        session.execute(statement)
+
+
+def get_votes(session, table):
+    return session.execute(
+        f"SELECT id, poll_id, option_id, user_id, type FROM {table} ORDER BY id"
+    ).fetchall()
+
+
+class TestPartitioning:
+    def test_new_tables_are_partitioned(self, session):
+        assert is_partitioned(session)
+
+    def test_online_conversion(self, session, user, poll, legacy_votes):
+        poll.poll_type = PollType.doodle.name
+        options = [option_factory(session, poll, f"option {i}") for i in range(3)]
+        voter = user_factory(session, 3, "Another voter")
+        votes = [vote_factory(session, user, option) for option in options]
+        assert not is_partitioned(session)
+
+        prepare_partitioned_table(session)
+
+        # Changes during the copy are mirrored by the trigger
+        vote_factory(session, voter, options[0])
+        votes[0].type = "yes"
+        session.delete(votes[1])
+        session.commit()
+
+        last_id = 0
+        while last_id is not None:
+            last_id = copy_vote_batch(session, last_id, 1)
+
+        expected = get_votes(session, "vote")
+        assert len(expected) == 3
+        assert get_votes(session, "vote_partitioned") == expected
+
+        swap_vote_tables(session)
+
+        assert is_partitioned(session)
+        assert get_votes(session, "vote") == expected
+        assert get_votes(session, "vote_unpartitioned") == expected
+        assert session.execute("SELECT to_regclass('vote_p0')").scalar() is not None
+
+        # New votes keep using the old sequence
+        vote = vote_factory(session, voter, options[2])
+        assert vote.id > expected[-1].id
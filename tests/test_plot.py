@@ -0,0 +1,80 @@
+from datetime import date, datetime, timedelta
+
+from pollbot.helper import plot
+from pollbot.helper.figures import render_plot
+from pollbot.helper.stats import rollup_daily_stats
+from pollbot.models import DailyRollup
+from tests.factories import option_factory, user_factory, vote_factory
+
+
+class FakeChat:
+    def __init__(self):
+        self.documents = []
+
+    def send_document(self, document, caption):
+        self.documents.append((document.name, caption, document.read()))
+
+
+def days_ago(days):
+    return datetime.combine(date.today() - timedelta(days=days), datetime.min.time())
+
+
+class TestDailyRollup:
+    def test_rollup(self, session, user, poll):
+        user.created_at = days_ago(3)
+        voter = user_factory(session, 3, "Another voter")
+        voter.created_at = days_ago(1)
+        voter.started = True
+        vote = vote_factory(session, voter, option_factory(session, poll, "option"))
+        vote.created_at = days_ago(2)
+        session.commit()
+
+        rollup_daily_stats(session)
+        rows = [
+            (
+                rollup.date,
+                rollup.users,
+                rollup.started_users,
+                rollup.voting_users,
+                rollup.owning_users,
+                rollup.votes,
+            )
+            for rollup in session.query(DailyRollup).order_by(DailyRollup.date)
+        ]
+        assert rows == [
+            (days_ago(3).date(), 1, 0, 0, 1, 0),
+            (days_ago(2).date(), 1, 0, 0, 1, 1),
+            (days_ago(1).date(), 2, 1, 1, 1, 0),
+        ]
+
+        # Only missing days are rolled up
+        session.delete(session.query(DailyRollup).get(days_ago(1).date()))
+        session.commit()
+        rollup_daily_stats(session)
+        rollup = session.query(DailyRollup).get(days_ago(1).date())
+        assert (rollup.users, rollup.started_users) == (2, 1)
+        assert session.query(DailyRollup).count() == 3
+
+    def test_nothing_to_roll_up(self, session, user):
+        rollup_daily_stats(session)
+        assert session.query(DailyRollup).count() == 0
+
+
+class TestPlots:
+    def test_render(self):
+        rows = [("Total votes", days_ago(days).date(), days) for days in range(5)]
+        assert render_plot(rows, "votes", "bar").startswith(b"\x89PNG")
+
+    def test_send_cached(self, session, monkeypatch):
+        cache = {name: (date.today(), b"png") for name, *_ in plot.PLOTS}
+        monkeypatch.setattr(plot, "plot_cache", cache)
+        chat = FakeChat()
+
+        plot.send_plots(session, chat)
+
+        assert chat.documents == [
+            ("user_statistics.png", "User statistics", b"png"),
+            ("vote_statistics.png", "Vote statistics", b"png"),
+            ("new_statistics.png", "New statistics", b"png"),
+        ]
+        assert plot.plot_pool is None
@@ -0,0 +1,80 @@
+from pollbot.display.misc import get_poll_list
+from pollbot.enums import CallbackType
+from pollbot.models import Poll
+from pollbot.telegram.callback_data import decode_callback
+from pollbot.telegram.callback_handler.context import CallbackContext
+from pollbot.telegram.callback_handler.user import list_polls_navigation
+from tests.factories import poll_factory, user_factory
+from tests.helper import FakeBot, FakeCallbackQuery, FakeMessage
+
+
+def get_page(session, user, cursor=None, forward=True):
+    """Get the polls and navigation payloads of a single page."""
+    _, keyboard = get_poll_list(session, user, cursor, forward)
+    rows = keyboard.inline_keyboard
+    polls = [decode_callback(row[0].callback_data).entity_id for row in rows]
+
+    navigation = {}
+    if rows[-1][0].text in ["<", ">"]:
+        polls.pop()
+        for button in rows[-1]:
+            callback = decode_callback(button.callback_data)
+            navigation[callback.action] = session.query(Poll).get(callback.entity_id)
+
+    return polls, navigation
+
+
+class TestPollList:
+    def test_keyset_navigation(self, session, user):
+        polls = [poll_factory(session, user) for _ in range(25)]
+        newest_first = [poll.id for poll in reversed(polls)]
+
+        first, navigation = get_page(session, user)
+        assert first == newest_first[:10]
+        assert set(navigation) == {"n"}
+
+        second, navigation = get_page(session, user, navigation["n"])
+        assert second == newest_first[10:20]
+        assert set(navigation) == {"n", "p"}
+
+        third, navigation = get_page(session, user, navigation["n"])
+        assert third == newest_first[20:]
+        assert set(navigation) == {"p"}
+
+        back, navigation = get_page(session, user, navigation["p"], forward=False)
+        assert back == second
+
+        back, navigation = get_page(session, user, navigation["p"], forward=False)
+        assert back == first
+        assert set(navigation) == {"n"}
+
+    def test_deleted_polls_are_not_listed(self, session, user):
+        polls = [poll_factory(session, user) for _ in range(11)]
+        polls[0].delete = "DB_ONLY"
+        session.commit()
+
+        page, navigation = get_page(session, user)
+        assert len(page) == 10
+        assert navigation == {}
+
+    def test_cursor_of_other_user(self, session, user):
+        polls = [poll_factory(session, user) for _ in range(15)]
+        other_poll = poll_factory(session, user_factory(session, 3, "Another user"))
+
+        page, _ = get_page(session, user, other_poll)
+        assert page == [poll.id for poll in reversed(polls)][:10]
+
+    def test_legacy_navigation(self, session, user):
+        """Legacy payloads contain an offset, which isn't a poll id."""
+        polls = [poll_factory(session, user) for _ in range(15)]
+        data = f"{CallbackType.user_list_polls_navigation.value}:{polls[12].id}:0"
+        query = FakeCallbackQuery(data)
+        query.message = FakeMessage()
+
+        list_polls_navigation(session, CallbackContext(session, FakeBot(), query, user))
+
+        keyboard = query.message.edited[0][1]["reply_markup"]
+        listed = [row[0].callback_data for row in keyboard.inline_keyboard[:10]]
+        assert [decode_callback(data).entity_id for data in listed] == [
+            poll.id for poll in reversed(polls)
+        ][:10]
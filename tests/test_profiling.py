@@ -0,0 +1,33 @@
+import pytest
+
+from pollbot.helper.profiling import parse_import_times, profile_startup
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     yaml.error
+import time:      1000 |       1120 |   yaml
+import time:       300 |       1420 | pollbot.i18n
+"""
+
+
+class TestProfiling:
+    def test_parse(self):
+        imports = parse_import_times(OUTPUT)
+
+        assert [(i.name, i.own, i.cumulative) for i in imports] == [
+            ("yaml.error", 120, 120),
+            ("yaml", 1000, 1120),
+            ("pollbot.i18n", 300, 1420),
+        ]
+
+    def test_handlers_dont_import_optional_packages(self):
+        """Plotting and sentry are only loaded, once they are actually used."""
+        profile = profile_startup("pollbot.telegram.callback_handler")
+        packages = {package for package, _ in profile.packages(1000)}
+
+        assert profile.seconds > 0
+        assert "sqlalchemy" in packages
+        assert packages.isdisjoint({"matplotlib", "numpy", "pandas", "sentry_sdk"})
+
+    def test_import_errors_are_reported(self):
+        with pytest.raises(Exception, match="No module named 'pollbot.missing'"):
+            profile_startup("pollbot.missing")
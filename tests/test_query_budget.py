@@ -0,0 +1,143 @@
+"""Query budgets for the hottest code paths of the bot.
+
+Each flow runs against a small and a big seeded poll. The amount of SQL
+statements must be the same for both sizes, so N+1 query patterns over voters
+or options can't silently creep back into those code paths.
+Each flow additionally has an absolute budget.
+"""
+import pytest
+
+from pollbot.display.poll.compilation import compile_poll_text
+from pollbot.enums import CallbackResult, ReferenceType
+from pollbot.models import Poll, Reference, User
+from pollbot.poll.update import send_updates, try_update_reference
+from pollbot.telegram.callback_handler.context import CallbackContext
+from pollbot.telegram.callback_handler.vote import handle_vote
+from pollbot.telegram.keyboard.vote import get_vote_payload
+from tests.factories import (
+    option_factory,
+    poll_factory,
+    reference_factory,
+    user_factory,
+    vote_factory,
+)
+from tests.helper import FakeBot, FakeCallbackQuery, count_queries
+
+# The amount of voters and options of the small and the big poll
+SMALL_POLL = (5, 3)
+BIG_POLL = (50, 10)
+
+# Maximum amount of queries for each flow.
+# Lower these, whenever a flow gets cheaper. Never raise them without a good reason.
+VOTE_BUDGET = 19
+INLINE_SHARE_BUDGET = 7
+SHOW_RESULTS_BUDGET = 5
+UPDATE_JOB_BUDGET = 7
+
+
+def seed_poll(session, user, size, first_user_id):
+    """A poll with some options, voters and shared messages."""
+    voter_count, option_count = size
+    poll = poll_factory(session, user)
+    options = [
+        option_factory(session, poll, f"Option {i}") for i in range(option_count)
+    ]
+    for i in range(voter_count):
+        voter = user_factory(session, first_user_id + i, f"Voter {i}")
+        vote_factory(session, voter, options[i % len(options)])
+
+    reference_factory(session, poll, ReferenceType.admin.name, user=user, message_id=1)
+    for i in range(2):
+        reference_factory(
+            session,
+            poll,
+            ReferenceType.inline.name,
+            inline_message_id=f"inline_message_{poll.id}_{i}",
+        )
+
+    # Start with an empty identity map, just like a fresh session in a handler
+    poll_id = poll.id
+    session.expunge_all()
+
+    return poll_id
+
+
+@pytest.fixture
+def seeded_polls(session, user):
+    """The ids of a small and a big poll."""
+    return [
+        seed_poll(session, user, SMALL_POLL, 1000),
+        seed_poll(session, user, BIG_POLL, 2000),
+    ]
+
+
+def assert_constant_queries(counts, budget):
+    """The flow must be as expensive for the big poll as for the small one."""
+    small, big = counts
+    assert small == big, f"{small} queries for the small poll, {big} for the big one"
+    assert small <= budget, f"Executed {small} queries, budget is {budget}"
+
+
+class TestQueryBudget:
+    def test_vote(self, session, connection, seeded_polls):
+        counts = []
+        for index, poll_id in enumerate(seeded_polls):
+            user_id = user_factory(session, 10 + index, "New voter").id
+            option = session.query(Poll).get(poll_id).options[0]
+            data = get_vote_payload(option, CallbackResult.vote)
+            query = FakeCallbackQuery(
+                data, inline_message_id=f"inline_message_{poll_id}_0"
+            )
+            session.expunge_all()
+
+            with count_queries(connection) as counter:
+                user = session.query(User).get(user_id)
+                context = CallbackContext(session, FakeBot(), query, user)
+                handle_vote(session, context, context.option)
+            counts.append(counter.count)
+
+        assert_constant_queries(counts, VOTE_BUDGET)
+
+    def test_inline_share(self, session, connection, seeded_polls):
+        counts = []
+        for poll_id in seeded_polls:
+            bot = FakeBot()
+            with count_queries(connection) as counter:
+                poll = session.query(Poll).get(poll_id)
+                reference = Reference(
+                    poll, ReferenceType.inline.name, inline_message_id=f"new_{poll_id}"
+                )
+                session.add(reference)
+                session.commit()
+                try_update_reference(session, bot, poll, reference, first_try=True)
+            counts.append(counter.count)
+
+            assert len(bot.calls) == 1
+            session.expunge_all()
+
+        assert_constant_queries(counts, INLINE_SHARE_BUDGET)
+
+    def test_show_results(self, session, connection, seeded_polls):
+        counts = []
+        for poll_id in seeded_polls:
+            with count_queries(connection) as counter:
+                poll = session.query(Poll).get(poll_id)
+                compile_poll_text(session, poll)
+            counts.append(counter.count)
+            session.expunge_all()
+
+        assert_constant_queries(counts, SHOW_RESULTS_BUDGET)
+
+    def test_update_job_tick(self, session, connection, seeded_polls):
+        counts = []
+        for poll_id in seeded_polls:
+            bot = FakeBot()
+            with count_queries(connection) as counter:
+                poll = session.query(Poll).get(poll_id)
+                send_updates(session, bot, poll)
+            counts.append(counter.count)
+
+            assert len(bot.calls) == 3
+            session.expunge_all()
+
+        assert_constant_queries(counts, UPDATE_JOB_BUDGET)
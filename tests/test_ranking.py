@@ -0,0 +1,84 @@
+import numpy as np
+
+from pollbot.display.poll.compilation import compile_poll_text
+from pollbot.enums import PollType
+from pollbot.models import User, Vote
+from pollbot.poll.ranking import (
+    get_borda_points,
+    get_condorcet_winner,
+    get_pairwise_wins,
+    get_priority_result,
+    get_runoff_winner,
+)
+from tests.factories import option_factory
+
+
+def add_ballot(session, user_id, options):
+    """Rank the given options in order for a new voter."""
+    user = User(user_id, f"voter_{user_id}")
+    user.name = f"Voter {user_id}"
+    session.add(user)
+    for priority, option in enumerate(options):
+        with session.no_autoflush:
+            vote = Vote(user, option)
+        vote.priority = priority
+        session.add(vote)
+    session.commit()
+
+
+class TestRankingTallies:
+    def test_borda_points(self):
+        ranks = np.array([[0, 1, 2], [1, 0, 3]])
+
+        assert get_borda_points(ranks).tolist() == [5, 5, 1]
+
+    def test_condorcet_winner(self):
+        ranks = np.array([[0, 1, 2], [1, 0, 2], [0, 2, 1]])
+
+        assert get_pairwise_wins(ranks).tolist() == [[0, 2, 3], [1, 0, 2], [0, 1, 0]]
+        assert get_condorcet_winner(get_pairwise_wins(ranks)) == 0
+
+    def test_condorcet_cycle(self):
+        ranks = np.array([[0, 1, 2], [2, 0, 1], [1, 2, 0]])
+
+        assert get_condorcet_winner(get_pairwise_wins(ranks)) is None
+
+    def test_runoff_transfers_votes(self):
+        # Option 2 is eliminated and its voter prefers option 1 next
+        ranks = np.array([[0, 1, 2], [0, 2, 1], [1, 0, 2], [1, 0, 2], [2, 1, 0]])
+
+        winner, rounds = get_runoff_winner(ranks, get_borda_points(ranks))
+
+        assert winner == 1
+        assert [votes.tolist() for votes in rounds] == [[2, 2, 1], [2, 3, 0]]
+
+    def test_runoff_tie(self):
+        ranks = np.array([[0, 1], [1, 0]])
+
+        winner, _ = get_runoff_winner(ranks, get_borda_points(ranks))
+
+        assert winner is None
+
+
+class TestPriorityResult:
+    def test_result(self, session, user, poll):
+        poll.poll_type = PollType.priority.name
+        poll.show_results = True
+        first, second, third = (
+            option_factory(session, poll, name) for name in ["first", "second", "third"]
+        )
+        add_ballot(session, 100, [first, second, third])
+        add_ballot(session, 101, [first, third, second])
+        add_ballot(session, 102, [second, first, third])
+
+        result = get_priority_result(session, poll)
+
+        assert result.points == {first.id: 8, second.id: 6, third.id: 4}
+        assert result.runoff_winner == first.id
+        assert result.runoff_rounds == 1
+        assert result.condorcet_winner == first.id
+
+        text = "\n".join(compile_poll_text(session, poll))
+        assert "8 Points" in text
+        assert "*first* wins the instant runoff in the first round" in text
+        assert "*first* beats every other option head-to-head" in text
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+
+from pollbot.display.poll import compilation
+from pollbot.display.poll.compilation import get_poll_text_and_vote_keyboard
+from pollbot.display.poll.render_cache import (
+    MemoryRenderCache,
+    PostgresRenderCache,
+    get_render_key,
+)
+from pollbot.models import Poll, RenderCacheEntry
+from tests.factories import option_factory, user_factory, vote_factory
+
+
+@pytest.fixture
+def postgres_cache(engine, tables):
+    """A postgres render cache, whose entries are committed by the test engine."""
+    cache = PostgresRenderCache(max_age=60, engine=engine)
+    yield cache
+    with engine.begin() as connection:
+        connection.execute(delete(RenderCacheEntry.__table__))
+
+
+class TestPostgresRenderCache:
+    def test_set_and_get(self, session, poll, postgres_cache):
+        cache = postgres_cache
+        key = get_render_key(poll, "text")
+        cache.set(session, key, {"text": "Poll", "summarize": False})
+        # A second process rendered the same version
+        cache.set(session, key, {"text": "Poll", "summarize": False})
+
+        assert cache.get(session, key) == {"text": "Poll", "summarize": False}
+        assert cache.get(session, get_render_key(poll, "other")) is None
+
+    def test_purge(self, session, engine, postgres_cache):
+        cache = postgres_cache
+        cache.set(session, "old", {})
+        cache.set(session, "new", {})
+        with engine.begin() as connection:
+            connection.execute(
+                update(RenderCacheEntry.__table__)
+                .where(RenderCacheEntry.key == "old")
+                .values(created_at=datetime.now() - timedelta(minutes=5))
+            )
+
+        cache.purge(session)
+
+        assert cache.get(session, "old") is None
+        assert cache.get(session, "new") == {}
+
+    def test_independent_of_session(self, session, engine, postgres_cache):
+        """Entries don't depend on the transaction of the render."""
+        cache = postgres_cache
+        cache.set(session, "key", {})
+        session.rollback()
+        assert cache.get(session, "key") == {}
+
+        # Entries of uncommitted versions are written after the commit.
+        session.info["render_versions_changed"] = True
+        cache.set(session, "pending", {})
+        assert cache.get(session, "pending") == {}
+        assert cache.store.get("pending") is None
+        session.commit()
+        assert cache.store.get("pending") == {}
+
+    def test_failing_write(self, session, poll, engine):
+        read_only = create_engine(
+            engine.url, connect_args={"options": "-c default_transaction_read_only=on"}
+        )
+        cache = PostgresRenderCache(max_age=60, engine=read_only)
+
+        cache.set(session, "key", {})
+
+        assert cache.get(session, "key") is None
+        # The session of the render can still be used
+        assert session.query(Poll).get(poll.id) == poll
+        read_only.dispose()
+
+
+class TestRenderCache:
+    def test_cached_text_and_keyboard(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+
+        text, keyboard = get_poll_text_and_vote_keyboard(session, poll)
+        cached_text, cached_keyboard = get_poll_text_and_vote_keyboard(session, poll)
+
+        assert cached_text == text
+        assert cached_keyboard.to_dict() == keyboard.to_dict()
+
+    def test_keyboard_is_shared_between_users(self, session, user, poll, monkeypatch):
+        cache = MemoryRenderCache(100)
+        monkeypatch.setattr(compilation, "render_cache", cache)
+        option_factory(session, poll, "option 0")
+        voter = user_factory(session, 3, "Another voter")
+
+        get_poll_text_and_vote_keyboard(session, poll, user=user)
+        get_poll_text_and_vote_keyboard(session, poll, user=voter)
+
+        keys = [key for key in cache.cache.entries if "keyboard" in str(key)]
+        assert len(keys) == 1
@@ -0,0 +1,41 @@
+import time
+
+from pollbot import db
+from pollbot.db import ReplicaMonitor, read_session
+
+
+class TestReplicaMonitor:
+    def test_fresh(self, engine):
+        """The test database isn't a replica and thereby always up to date."""
+        monitor = ReplicaMonitor(engine, max_lag=2)
+        assert monitor.is_fresh()
+        assert monitor.is_fresh(time.time() - 1)
+
+    def test_recent_changes(self, engine):
+        """Changes after the last check might not be replicated yet."""
+        monitor = ReplicaMonitor(engine, max_lag=2, check_interval=60)
+        assert monitor.is_fresh()
+        assert not monitor.is_fresh(time.time() + 1)
+
+    def test_lagging(self, engine):
+        monitor = ReplicaMonitor(engine, max_lag=2, check_interval=60)
+        monitor.is_fresh()
+        monitor.replayed_until -= 5
+        assert not monitor.is_fresh()
+
+
+class TestReadSession:
+    def test_without_replica(self, session):
+        with read_session(session) as reader:
+            assert reader is session
+
+    def test_with_replica(self, session, engine, monkeypatch):
+        monkeypatch.setattr(db, "replica_monitor", ReplicaMonitor(engine, max_lag=2))
+        with read_session(session) as reader:
+            assert reader is not session
+            assert reader.bind is engine
+            assert reader.execute("SELECT 1").scalar() == 1
+
+        # The primary is used, if the replica lacks the latest changes
+        with read_session(session, time.time() + 5) as reader:
+            assert reader is session
@@ -0,0 +1,132 @@
+from itertools import pairwise
+
+import pytest
+
+from pollbot.display.poll import results
+from pollbot.display.poll.results import get_results_page
+from pollbot.enums import PollType, UserSorting
+from pollbot.i18n import i18n
+from pollbot.models import User, Vote
+from tests.factories import option_factory, user_factory, vote_factory
+
+
+@pytest.fixture
+def large_poll(session, poll):
+    poll.poll_type = PollType.block_vote.name
+    poll.user_sorting = UserSorting.name.name
+    options = [option_factory(session, poll, f"option {i}") for i in range(3)]
+    for i in range(20):
+        voter = user_factory(session, 100 + i, f"voter {i:02}")
+        for option in options[: i % 3 + 1]:
+            vote_factory(session, voter, option)
+
+    return poll
+
+
+def collect_pages(session, poll):
+    pages = [get_results_page(session, poll)]
+    while pages[-1].has_next:
+        pages.append(get_results_page(session, poll, pages[-1].last_cursor))
+
+    return pages
+
+
+class TestResultsPages:
+    def test_pages_contain_all_votes(self, session, monkeypatch, large_poll):
+        monkeypatch.setattr(results, "PAGE_CHARACTERS", 300)
+        pages = collect_pages(session, large_poll)
+        assert len(pages) > 3
+
+        lines = [line for page in pages for line in page.lines]
+        vote_lines = [line for line in lines if line.startswith(("├", "└"))]
+        assert len(vote_lines) == sum(
+            option.voter_count for option in large_poll.options
+        )
+
+        # The voters of each option are sorted by name
+        first_option = vote_lines[:20]
+        names = [line[2:] for line in first_option]
+        assert names == sorted(names)
+        assert first_option[-1].startswith("└")
+        assert all(line.startswith("├") for line in first_option[:-1])
+
+        # The header is only shown on the first page and the footer on the last
+        assert pages[0].lines[0] == lines[0]
+        assert not pages[-1].has_next
+        assert not pages[0].has_previous
+
+    def test_previous_page(self, session, monkeypatch, large_poll):
+        monkeypatch.setattr(results, "PAGE_CHARACTERS", 300)
+        pages = collect_pages(session, large_poll)
+
+        for previous, current in pairwise(pages[1:]):
+            page = get_results_page(
+                session, large_poll, current.first_cursor, forward=False
+            )
+            assert page.lines == previous.lines
+            assert page.has_next
+
+    def test_single_page(self, session, large_poll):
+        page = get_results_page(session, large_poll)
+
+        assert not page.has_previous
+        assert not page.has_next
+
+    def test_doodle_answers(self, session, monkeypatch, poll):
+        monkeypatch.setattr(results, "PAGE_CHARACTERS", 100)
+        poll.poll_type = PollType.doodle.name
+        poll.user_sorting = UserSorting.name.name
+        option = option_factory(session, poll, "option 0")
+        for i, answer in enumerate(["yes", "no", "maybe"] * 4):
+            vote = vote_factory(
+                session, user_factory(session, 100 + i, f"v{i:02}"), option
+            )
+            vote.type = answer
+        session.commit()
+
+        pages = collect_pages(session, poll)
+        assert len(pages) > 2
+        lines = [line for page in pages for line in page.lines]
+
+        headers = [i18n.t(f"poll.doodle.{answer}") for answer in ["yes", "maybe", "no"]]
+        assert [line for line in lines if line in headers] == headers
+        assert not any("(yes)" in line for line in lines)
+        assert [line for line in lines if line.startswith("└ [")] == [
+            "└ [v10](tg://user?id=110)"
+        ]
+
+        for previous, current in pairwise(pages[1:]):
+            page = get_results_page(session, poll, current.first_cursor, forward=False)
+            assert page.lines == previous.lines
+
+    def test_removed_cursor_vote(self, session, monkeypatch, large_poll):
+        monkeypatch.setattr(results, "PAGE_CHARACTERS", 300)
+        pages = collect_pages(session, large_poll)
+
+        # The vote at the end of the first page is gone
+        option_id, vote_id = pages[0].last_cursor[:2]
+        session.delete(session.query(Vote).get(vote_id))
+        session.commit()
+
+        page = get_results_page(session, large_poll, pages[0].last_cursor)
+        assert page.lines == pages[1].lines
+
+    def test_deleted_cursor_voter(self, session, monkeypatch, large_poll):
+        """The name of a deleted voter is unknown, but no vote may be skipped."""
+        monkeypatch.setattr(results, "PAGE_CHARACTERS", 300)
+        pages = collect_pages(session, large_poll)
+
+        voter = session.query(User).get(pages[0].last_cursor[2])
+        name = voter.name
+        session.delete(voter)
+        session.commit()
+
+        remaining = [get_results_page(session, large_poll, pages[0].last_cursor)]
+        while remaining[-1].has_next:
+            cursor = remaining[-1].last_cursor
+            remaining.append(get_results_page(session, large_poll, cursor))
+
+        shown = {line for page in remaining for line in page.lines}
+        expected = {line for page in pages[1:] for line in page.lines}
+        assert {line for line in expected if name not in line} <= shown
+        assert not any(name in line for line in shown)
@@ -0,0 +1,115 @@
+from pollbot.enums import ReferenceType
+from pollbot.poll import search
+from pollbot.poll.search import get_search_generation, search_polls, search_results
+from tests.factories import poll_factory, reference_factory
+
+
+def create_polls(session, user, names):
+    polls = []
+    for name in names:
+        poll = poll_factory(session, user)
+        poll.name = name
+        polls.append(poll)
+    session.commit()
+
+    return polls
+
+
+class TestSearch:
+    def test_newest_polls_without_query(self, session, monkeypatch, user):
+        monkeypatch.setattr(search, "SEARCH_PAGE_SIZE", 2)
+        polls = create_polls(session, user, ["a", "b", "c"])
+
+        page, offset = search_polls(session, user, "", False, "")
+        assert page == [polls[2], polls[1]]
+
+        page, offset = search_polls(session, user, "", False, offset)
+        assert page == [polls[0]]
+        assert offset == ""
+
+    def test_ranked_by_similarity(self, session, user):
+        polls = create_polls(
+            session, user, ["Dinner on friday", "Dinner", "Lunch", "Pizza dinner?"]
+        )
+
+        page, _ = search_polls(session, user, "dinner", False, "")
+        assert page[0] == polls[1]
+        assert set(page) == {polls[0], polls[1], polls[3]}
+
+    def test_keyset_pages(self, session, monkeypatch, user):
+        monkeypatch.setattr(search, "SEARCH_PAGE_SIZE", 2)
+        create_polls(session, user, [f"Dinner {i}" for i in range(5)] + ["Lunch"])
+
+        found = []
+        offset = ""
+        while True:
+            page, offset = search_polls(session, user, "dinner", False, offset)
+            found += page
+            if offset == "":
+                break
+
+        assert len(found) == 5
+        assert len(set(found)) == 5
+
+    def test_wildcards_are_escaped(self, session, user):
+        polls = create_polls(session, user, ["100% sure", "100 percent"])
+
+        page, _ = search_polls(session, user, "100%", False, "")
+        assert page == [polls[0]]
+
+    def test_results_are_cached(self, session, user):
+        polls = create_polls(session, user, ["Dinner"])
+        search_polls(session, user, "dinner", False, "")
+        assert len(search_results) == 1
+
+        # Unrelated changes don't invalidate the cache
+        polls[0].show_percentage = not polls[0].show_percentage
+        session.commit()
+        search_polls(session, user, "dinner", False, "")
+        assert len(search_results) == 1
+
+    def test_new_poll_increases_generation(self, session, user):
+        generation = get_search_generation(user)
+        create_polls(session, user, ["Dinner"])
+        assert get_search_generation(user) > generation
+
+        page, _ = search_polls(session, user, "dinner", False, "")
+        create_polls(session, user, ["Dinner 2"])
+        page, _ = search_polls(session, user, "dinner", False, "")
+        assert len(page) == 2
+
+    def test_rename_increases_generation(self, session, user):
+        polls = create_polls(session, user, ["Dinner"])
+        generation = get_search_generation(user)
+
+        polls[0].name = "Lunch"
+        session.commit()
+
+        assert get_search_generation(user) > generation
+        page, _ = search_polls(session, user, "dinner", False, "")
+        assert page == []
+
+    def test_inline_share_keeps_generation(self, session, user):
+        """Shares don't change the found polls and mustn't lock the owner."""
+        polls = create_polls(session, user, ["Dinner"])
+        generation = get_search_generation(user)
+
+        reference_factory(
+            session, polls[0], ReferenceType.inline.name, inline_message_id="inline"
+        )
+        polls[0].allow_sharing = not polls[0].allow_sharing
+        session.commit()
+
+        assert get_search_generation(user) == generation
+
+    def test_rollback_keeps_generation(self, session, user):
+        polls = create_polls(session, user, ["Dinner"])
+        generation = get_search_generation(user)
+
+        savepoint = session.begin_nested()
+        polls[0].name = "Lunch"
+        session.flush()
+        savepoint.rollback()
+        session.commit()
+
+        assert get_search_generation(user) == generation
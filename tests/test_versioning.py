@@ -0,0 +1,88 @@
+from pollbot.display.poll.compilation import compile_poll_text
+from pollbot.display.poll.render_cache import render_cache
+from pollbot.display.poll.snapshot import option_snapshots
+from tests.factories import option_factory, user_factory, vote_factory
+from tests.helper import count_queries
+
+
+class TestVersioning:
+    def test_vote_increases_versions(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        other_option = option_factory(session, poll, "option 1")
+        poll_version = poll.version
+        other_version = other_option.version
+
+        vote_factory(session, user, option)
+
+        assert poll.version == poll_version + 1
+        assert option.version == 1
+        assert other_option.version == other_version
+
+    def test_vote_change_increases_versions(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote = vote_factory(session, user, option)
+        poll_version = poll.version
+        option_version = option.version
+
+        vote.vote_count = 2
+        session.commit()
+
+        assert poll.version == poll_version + 1
+        assert option.version == option_version + 1
+
+    def test_chat_state_keeps_version(self, session, poll):
+        poll_version = poll.version
+
+        poll.in_settings = True
+        session.commit()
+        assert poll.version == poll_version
+
+        poll.anonymous = True
+        session.commit()
+        assert poll.version == poll_version + 1
+
+    def test_renamed_voter_increases_versions(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+        option_version = option.version
+
+        user.name = "Renamed"
+        session.commit()
+
+        assert option.version == option_version + 1
+
+
+class TestSnapshots:
+    def test_snapshot_is_reused(self, session, connection, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+
+        lines = compile_poll_text(session, poll)
+        with count_queries(connection) as counter:
+            assert compile_poll_text(session, poll) == lines
+        assert counter.count == 0
+
+    def test_vote_invalidates_snapshot(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+        compile_poll_text(session, poll)
+
+        voter = user_factory(session, 3, "Another voter")
+        vote_factory(session, voter, option)
+
+        assert any("Another voter" in line for line in compile_poll_text(session, poll))
+
+    def test_rollback_discards_snapshot(self, session, user, poll):
+        option = option_factory(session, poll, "option 0")
+        vote_factory(session, user, option)
+        compile_poll_text(session, poll)
+        snapshot_count = len(option_snapshots)
+        cache_count = len(render_cache.cache)
+
+        savepoint = session.begin_nested()
+        option.name = "Renamed option"
+        compile_poll_text(session, poll)
+        savepoint.rollback()
+
+        assert len(option_snapshots) == snapshot_count
+        assert len(render_cache.cache) == cache_count